@@ -0,0 +1,264 @@
+"""
+admission.py — Per-client rate limits and per-provider concurrency caps.
+
+RateLimiter keeps a token bucket per key (client id, hashed API key):
+each request takes tokens in proportion to the upstream work it will cause,
+and a request that finds its bucket empty is told how long to wait instead
+of being run. Buckets for keys not seen recently are dropped oldest-first.
+
+ConcurrencyGate caps the calls in flight to one upstream provider across
+the whole process. Calls beyond the cap wait in a FIFO queue for at most
+a deadline; a full queue or an expired deadline raises Overloaded, which
+callers turn into a 429 with Retry-After rather than letting work pile up
+until it times out. The same gate is used from executor threads
+(lx.extract) and from the event loop (embedContent), so waiters are woken
+through a threading.Event or the loop's call_soon_threadsafe respectively.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, Optional
+
+
+class Overloaded(Exception):
+    """A provider's concurrency cap and queue are full, or the queue wait expired."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def retry_after_header(seconds: float) -> str:
+    """Retry-After value: whole seconds, at least 1."""
+    return str(max(1, int(math.ceil(seconds))))
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """Token buckets keyed by client: rate_per_minute refill, burst capacity."""
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        burst: float,
+        max_keys: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = max(1e-9, rate_per_minute / 60.0)
+        self.burst = max(1.0, burst)
+        self.max_keys = max(1, max_keys)
+        self.clock = clock
+        self.allowed = 0
+        self.limited = 0
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, key: str, now: float) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(self.burst, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+        return bucket
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        """Take cost tokens for key; 0.0 if admitted, else seconds until it would be."""
+        cost = min(max(cost, 0.0), self.burst)
+        with self._lock:
+            bucket = self._bucket(key, self.clock())
+            if bucket.tokens >= cost:
+                bucket.tokens -= cost
+                self.allowed += 1
+                return 0.0
+            self.limited += 1
+            return (cost - bucket.tokens) / self.rate
+
+    def refund(self, key: str, cost: float = 1.0) -> None:
+        """Give back tokens taken by acquire (e.g. another limit rejected the request)."""
+        cost = min(max(cost, 0.0), self.burst)
+        with self._lock:
+            bucket = self._bucket(key, self.clock())
+            bucket.tokens = min(self.burst, bucket.tokens + cost)
+            self.allowed -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ratePerMinute": round(self.rate * 60.0, 3),
+            "burst": self.burst,
+            "keys": len(self._buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+
+class _Waiter:
+    __slots__ = ("granted", "wake")
+
+    def __init__(self, wake: Callable[[], None]) -> None:
+        self.granted = False
+        self.wake = wake
+
+
+class ConcurrencyGate:
+    """At most limit holders; up to max_queue FIFO waiters, each for at most timeout seconds."""
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        max_queue: int = 64,
+        timeout: float = 20.0,
+    ) -> None:
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self.admitted = 0
+        self.waited = 0
+        self.shed = 0
+        self.timed_out = 0
+        self._active = 0
+        self._hold: Optional[float] = None  # moving average of seconds a slot is held
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    # -- load --------------------------------------------------------------
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> float:
+        """Estimated seconds until a newly queued call would get a slot."""
+        hold = self._hold if self._hold is not None else 1.0
+        return max(1.0, hold * (len(self._waiters) + 1) / self.limit)
+
+    def saturated(self) -> bool:
+        """True when a new call would be shed immediately (all slots busy, queue full)."""
+        return self._active >= self.limit and len(self._waiters) >= self.max_queue
+
+    def _overloaded(self, reason: str) -> Overloaded:
+        return Overloaded(
+            f"{self.name} is at capacity ({self._active} calls in flight, {len(self._waiters)} queued); {reason}",
+            self.retry_after(),
+        )
+
+    # -- acquire / release -------------------------------------------------
+    def _enter_or_queue(self, wake: Callable[[], None]) -> Optional[_Waiter]:
+        """Take a free slot (None) or join the queue (the waiter); raise when the queue is full."""
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                self.admitted += 1
+                return None
+            if len(self._waiters) >= self.max_queue:
+                self.shed += 1
+                raise self._overloaded("try again later")
+            waiter = _Waiter(wake)
+            self._waiters.append(waiter)
+            self.waited += 1
+            return waiter
+
+    def _abandon(self, waiter: _Waiter, timed_out: bool) -> bool:
+        """Leave the queue after a timeout or cancellation; True if the slot was granted meanwhile."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            self.timed_out += int(timed_out)
+            return False
+
+    def release(self, held_seconds: Optional[float] = None) -> None:
+        """Free a slot, handing it straight to the oldest waiter if there is one."""
+        waiter: Optional[_Waiter] = None
+        with self._lock:
+            if held_seconds is not None:
+                self._hold = held_seconds if self._hold is None else 0.8 * self._hold + 0.2 * held_seconds
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                self.admitted += 1
+            else:
+                self._active -= 1
+        if waiter is not None:
+            waiter.wake()
+
+    def acquire(self) -> None:
+        """Blocking acquire for worker threads."""
+        event = threading.Event()
+        waiter = self._enter_or_queue(event.set)
+        if waiter is None or event.wait(self.timeout) or self._abandon(waiter, timed_out=True):
+            return
+        raise self._overloaded(f"waited {self.timeout:g}s for a slot")
+
+    async def acquire_async(self) -> None:
+        """Acquire on the event loop without blocking it."""
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[None]" = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = self._enter_or_queue(wake)
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(future, timeout=self.timeout)
+            return
+        except asyncio.TimeoutError:
+            if self._abandon(waiter, timed_out=True):
+                return
+            raise self._overloaded(f"waited {self.timeout:g}s for a slot") from None
+        except BaseException:
+            # Cancelled while queued: give back a slot that was handed over meanwhile.
+            if self._abandon(waiter, timed_out=False):
+                self.release()
+            raise
+
+    @contextlib.contextmanager
+    def slot(self) -> Iterator[None]:
+        self.acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - started)
+
+    @contextlib.asynccontextmanager
+    async def slot_async(self) -> AsyncIterator[None]:
+        await self.acquire_async()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self._active,
+            "queued": len(self._waiters),
+            "maxQueue": self.max_queue,
+            "queueTimeoutSeconds": self.timeout,
+            "avgHoldMs": round(self._hold * 1000, 1) if self._hold is not None else None,
+            "admitted": self.admitted,
+            "waited": self.waited,
+            "shed": self.shed,
+            "timedOut": self.timed_out,
+        }
@@ -0,0 +1,184 @@
+"""
+cache.py — Small persistent key/value cache on SQLite.
+
+Used to remember expensive upstream results (LangExtract lanes, embeddings)
+across requests and restarts. Values are stored as raw bytes; JSON helpers
+are provided for the common case. Entries are evicted by age and by total
+entry count / byte size, least recently used first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def content_key(*parts: Any) -> str:
+    """Stable SHA-256 key for a tuple of parts (strings, numbers, None)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def text_fingerprint(text: str) -> str:
+    """Hash of text with line endings and trailing whitespace normalized."""
+    lines = str(text or "").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    normalized = "\n".join(line.rstrip() for line in lines).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class SqliteCache:
+    """Thread-safe SQLite cache with TTL and size-bounded LRU eviction.
+
+    Several caches can share one database file by using different tables.
+    """
+
+    # Run eviction every N writes rather than on every put.
+    EVICT_EVERY = 64
+
+    def __init__(
+        self,
+        path: Path,
+        table: str,
+        max_entries: int = 20_000,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: float = 30 * 24 * 3600,
+    ) -> None:
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table!r}")
+        self.path = Path(path)
+        self.table = table
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table}(accessed)")
+
+    # -- bytes API ---------------------------------------------------------
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        wanted = list(dict.fromkeys(keys))
+        if not wanted:
+            return {}
+        now = time.time()
+        oldest = now - self.ttl_seconds
+        found: Dict[str, bytes] = {}
+        with self._lock:
+            # SQLite limits bound parameters per statement; query in slices.
+            for i in range(0, len(wanted), 500):
+                chunk = wanted[i: i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM {self.table} WHERE key IN ({marks}) AND created >= ?",
+                    (*chunk, oldest),
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = bytes(value)
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE {self.table} SET accessed = ? WHERE key IN ({','.join('?' * len(rows))})",
+                        (now, *[r[0] for r in rows]),
+                    )
+            self.hits += len(found)
+            self.misses += len(wanted) - len(found)
+        return found
+
+    def put(self, key: str, value: bytes) -> None:
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, bytes]]) -> None:
+        now = time.time()
+        rows = [(key, sqlite3.Binary(value), len(value), now, now) for key, value in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._writes += len(rows)
+            if self._writes >= self.EVICT_EVERY:
+                self._writes = 0
+                self._evict_locked(now)
+
+    # -- JSON helpers ------------------------------------------------------
+    def get_json(self, key: str) -> Optional[Any]:
+        raw = self.get(key)
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw.decode("utf-8"))
+        except ValueError:
+            return None
+
+    def put_json(self, key: str, value: Any) -> None:
+        self.put(key, json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+    # -- maintenance -------------------------------------------------------
+    def evict(self) -> None:
+        with self._lock:
+            self._evict_locked(time.time())
+
+    def _evict_locked(self, now: float) -> None:
+        self._conn.execute(f"DELETE FROM {self.table} WHERE created < ?", (now - self.ttl_seconds,))
+        count, total = self._conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # Walk from least recently used and drop until both limits hold.
+        doomed: List[str] = []
+        for key, size in self._conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed ASC"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append(key)
+            count -= 1
+            total -= size
+        for i in range(0, len(doomed), 500):
+            chunk = doomed[i: i + 500]
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+        return {
+            "entries": count,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxEntries": self.max_entries,
+            "maxBytes": self.max_bytes,
+            "ttlSeconds": self.ttl_seconds,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,69 @@
+"""
+codec.py — Compact binary encodings for embedding vectors.
+
+Layout of a packed block (all little-endian):
+
+  offset  size  field
+  0       4     magic b"AIEM"
+  4       1     format version (1)
+  5       1     dtype code (1 = float32, 2 = float16)
+  6       2     reserved (0)
+  8       4     row count
+  12      4     dimension
+  16      ...   row-major vector data
+
+The raw application/octet-stream response is exactly this block; the
+base64 encodings carry the same bytes without the header, since the JSON
+envelope already states count and dimension.
+"""
+
+from __future__ import annotations
+
+import base64
+import struct
+import sys
+from array import array
+from itertools import chain
+from typing import Dict, List, Sequence
+
+MAGIC = b"AIEM"
+VERSION = 1
+DTYPE_CODES: Dict[str, int] = {"f32": 1, "f16": 2}
+_HEADER = struct.Struct("<4sBBHII")
+HEADER_SIZE = _HEADER.size
+
+
+def pack_vectors(vectors: Sequence[Sequence[float]], dtype: str = "f32") -> bytes:
+    """Row-major little-endian bytes for equal-length vectors."""
+    flat = chain.from_iterable(vectors)
+    if dtype == "f32":
+        packed = array("f", flat)
+        if sys.byteorder != "little":
+            packed.byteswap()
+        return packed.tobytes()
+    if dtype == "f16":
+        values = list(flat)
+        return struct.pack(f"<{len(values)}e", *values)
+    raise ValueError(f"Unsupported dtype: {dtype!r}")
+
+
+def pack_block(vectors: Sequence[Sequence[float]], dim: int, dtype: str = "f32") -> bytes:
+    """Header + packed vectors, for application/octet-stream responses."""
+    header = _HEADER.pack(MAGIC, VERSION, DTYPE_CODES[dtype], 0, len(vectors), dim)
+    return header + pack_vectors(vectors, dtype)
+
+
+def encode_base64(vectors: Sequence[Sequence[float]], dtype: str = "f32") -> str:
+    return base64.b64encode(pack_vectors(vectors, dtype)).decode("ascii")
+
+
+def unpack_block(blob: bytes) -> List[List[float]]:
+    """Inverse of pack_block (used by tooling and clients written in Python)."""
+    magic, version, code, _, count, dim = _HEADER.unpack_from(blob)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not an AIEM vector block")
+    fmt = {1: "f", 2: "e"}.get(code)
+    if fmt is None:
+        raise ValueError(f"Unknown dtype code {code}")
+    values = struct.unpack_from(f"<{count * dim}{fmt}", blob, HEADER_SIZE)
+    return [list(values[i * dim: (i + 1) * dim]) for i in range(count)]
@@ -0,0 +1,339 @@
+"""
+cv_parser.py — Streaming heuristic parser for structured CV facts.
+
+FactParser turns CV text into fact bullets ("Project: ...", "Experience:
+...", "Education: ...") without a model call. Text can be fed in any
+pieces: whole documents, PDF pages as they are extracted, or network
+chunks. Lines are produced lazily by normalize.LineStream, each entry is
+emitted as soon as the next header closes it, and near-duplicates are
+dropped on the way out, so memory stays bounded by one open entry plus the
+dedup index instead of growing with the whole document.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .dedup import NearDuplicateIndex
+from .normalize import (
+    DATE_RANGE_RE,
+    PHONE_RE,
+    Line,
+    LineStream,
+    has_date_token,
+    key_tokens,
+    make_line,
+    shorten,
+    strip_dates_for_key,
+)
+
+ROLE_KEYWORDS = (
+    "engineer",
+    "researcher",
+    "intern",
+    "assistant",
+    "lead",
+    "developer",
+    "manager",
+    "analyst",
+    "designer",
+    "captain",
+    "founder",
+)
+
+
+def section_from_line(line: str) -> Tuple[Optional[str], str]:
+    value = str(line or "").strip()
+    lowered = value.lower().strip(":")
+    mapping = [
+        ("technical projects", "projects"),
+        ("projects", "projects"),
+        ("work experience", "experience"),
+        ("professional experience", "experience"),
+        ("experience", "experience"),
+        ("education", "education"),
+        ("technical skills", "skills"),
+        ("skills", "skills"),
+    ]
+
+    for key, section in mapping:
+        if lowered == key:
+            return section, ""
+        if lowered.startswith(key + " "):
+            remainder = value[len(key):].strip(" :-")
+            return section, remainder
+
+    return None, value
+
+
+def _looks_like_project_header(line: str) -> bool:
+    value = str(line or "").strip()
+    if "|" not in value or len(value) < 12:
+        return False
+    lowered = value.lower()
+    if lowered.startswith("languages"):
+        return False
+    if ("@" in lowered) or ("linkedin.com" in lowered) or ("github.com" in lowered):
+        return False
+    if PHONE_RE.search(value):
+        return False
+    left, right = value.split("|", 1)
+    if len(left.strip()) < 4 or len(right.strip()) < 4:
+        return False
+    if not ("," in right or DATE_RANGE_RE.search(right)):
+        return False
+    return True
+
+
+def _parse_project_header(line: str) -> Dict[str, str]:
+    value = str(line or "").strip()
+    left, right = value.split("|", 1)
+    title = left.strip(" :-")
+    right_part = right.strip()
+
+    date_match = DATE_RANGE_RE.search(right_part)
+    dates = date_match.group(1).strip() if date_match else ""
+    tools = right_part.replace(dates, "").strip(" |-")
+
+    return {
+        "kind": "project",
+        "title": title,
+        "dates": dates,
+        "tools": tools,
+        "details": [],
+    }
+
+
+def _looks_like_experience_header(line: Line) -> bool:
+    value = line.text
+    if len(value) < 8:
+        return False
+    if value.endswith(".") and len(value.split()) > 14:
+        return False
+    lowered = value.lower()
+    has_role_word = any(word in lowered for word in ROLE_KEYWORDS)
+    has_separator = (" - " in value) or (" â€“ " in value)
+    if has_role_word or has_separator:
+        return True
+    if line.has_date and ("team" in lowered or "lab" in lowered or "society" in lowered):
+        return True
+    return False
+
+
+def _build_project_bullet(entry: Dict[str, Any]) -> str:
+    title = shorten(entry.get("title", ""), 140)
+    tools = shorten(entry.get("tools", ""), 170)
+    dates = shorten(entry.get("dates", ""), 60)
+    details = [d for d in entry.get("details", []) if d]
+    highlights = details[:3]
+
+    parts = [f"Project: {title}"]
+    if dates:
+        parts.append(f"Dates: {dates}")
+    if tools:
+        parts.append(f"Tools: {tools}")
+    if highlights:
+        parts.append("Highlights: " + " | ".join(shorten(x, 170, normalized=True) for x in highlights))
+    return "; ".join(parts)
+
+
+def _build_experience_bullet(entry: Dict[str, Any]) -> str:
+    title = shorten(entry.get("title", ""), 180)
+    details = [d for d in entry.get("details", []) if d]
+    highlights = details[:3]
+
+    parts = [f"Experience: {title}"]
+    if highlights:
+        parts.append("Highlights: " + " | ".join(shorten(x, 170, normalized=True) for x in highlights))
+    return "; ".join(parts)
+
+
+def _build_education_bullet(entry: Dict[str, Any]) -> str:
+    title = shorten(entry.get("title", ""), 180)
+    details = [d for d in entry.get("details", []) if d]
+    highlights = details[:2]
+
+    parts = [f"Education: {title}"]
+    if highlights:
+        parts.append("Details: " + " | ".join(shorten(x, 170, normalized=True) for x in highlights))
+    return "; ".join(parts)
+
+
+_SECTION_WORDS = {"experience", "projects", "technical projects", "education", "skills", "technical skills"}
+# Coverage scoring: a CV with these sections, ~2 dated entries each, scores 1.0.
+_CONTENT_SECTIONS = ("experience", "education", "projects")
+_TARGET_ENTRIES_PER_SECTION = 2.0
+_CONFIDENCE_WEIGHTS = {"sections": 0.4, "entries": 0.3, "dates": 0.3}
+
+
+class FactParser:
+    """Push-style structured CV parser; feed() text pieces, close() at the end.
+
+    Both return the fact bullets finished by that call, already
+    deduplicated against everything emitted before.
+    """
+
+    def __init__(self) -> None:
+        self.parsed_entries = 0
+        self.duplicates_dropped = 0
+        self.date_hits = 0
+        self.sections_found: Dict[str, int] = {}
+        self._lines = LineStream()
+        self._seen = NearDuplicateIndex()
+        self._pending: Optional[Line] = None
+        self._skip_next = False
+        self._section: Optional[str] = None
+        self._current: Optional[Dict[str, Any]] = None
+
+    def feed(self, text: str) -> List[str]:
+        out: List[str] = []
+        for line in self._lines.feed(text):
+            self._push(line, out)
+        return out
+
+    def close(self) -> List[str]:
+        out: List[str] = []
+        for line in self._lines.close():
+            self._push(line, out)
+        if self._pending is not None:
+            self._step(self._pending, None, out)
+            self._pending = None
+        self._flush(out)
+        return out
+
+    def bullets(self, chunks: Iterable[str]) -> Iterator[str]:
+        for chunk in chunks:
+            yield from self.feed(chunk)
+        yield from self.close()
+
+    def confidence(self) -> float:
+        """How well the heuristics covered the CV, in [0, 1].
+
+        Blends the share of content sections found, entries per found
+        section and the share of entries whose header carries a date.
+        """
+        if not self.parsed_entries:
+            return 0.0
+        found = [name for name in _CONTENT_SECTIONS if self.sections_found.get(name)]
+        entries = sum(self.sections_found.get(name, 0) for name in found)
+        scores = {
+            "sections": len(found) / len(_CONTENT_SECTIONS),
+            "entries": min(1.0, entries / max(1, len(found)) / _TARGET_ENTRIES_PER_SECTION),
+            "dates": self.date_hits / self.parsed_entries,
+        }
+        return round(sum(_CONFIDENCE_WEIGHTS[name] * score for name, score in scores.items()), 3)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "duplicatesDropped": self.duplicates_dropped,
+            "parsedEntries": self.parsed_entries,
+            "sections": dict(self.sections_found),
+            "dateHits": self.date_hits,
+            "confidence": self.confidence(),
+        }
+
+    # -- internals ---------------------------------------------------------
+    def _push(self, line: Line, out: List[str]) -> None:
+        # One line of lookahead: experience headers may absorb a date line.
+        pending, self._pending = self._pending, line
+        if pending is not None:
+            self._step(pending, line, out)
+
+    def _flush(self, out: List[str]) -> None:
+        current, self._current = self._current, None
+        if not current:
+            return
+
+        details = []
+        for detail in current.get("details", []):
+            if detail.clean and detail.clean.lower() not in _SECTION_WORDS:
+                details.append(detail.clean)
+        current["details"] = details
+
+        if current.get("kind") == "project":
+            bullet = _build_project_bullet(current)
+            dedup_key = strip_dates_for_key(current.get("title", "") + " " + current.get("tools", ""))
+        elif current.get("kind") == "education":
+            bullet = _build_education_bullet(current)
+            dedup_key = strip_dates_for_key(current.get("title", ""))
+        else:
+            bullet = _build_experience_bullet(current)
+            dedup_key = strip_dates_for_key(current.get("title", ""))
+
+        if not bullet or len(bullet) < 22:
+            return
+        self.parsed_entries += 1
+        section = "projects" if current.get("kind") == "project" else current.get("kind", "experience")
+        self.sections_found[section] = self.sections_found.get(section, 0) + 1
+        if current.get("dates") or has_date_token(current.get("title", "")):
+            self.date_hits += 1
+
+        key, tokens = key_tokens(dedup_key)
+        if not key:
+            key, tokens = key_tokens(bullet)
+        if not key:
+            return
+        if not self._seen.add(key, tokens):
+            self.duplicates_dropped += 1
+            return
+        out.append(bullet)
+
+    def _start(self, entry: Dict[str, Any], out: List[str]) -> None:
+        self._flush(out)
+        self._current = entry
+
+    def _detail(self, line: Line) -> None:
+        if self._current is not None:
+            self._current.setdefault("details", []).append(line)
+
+    def _step(self, line: Line, nxt: Optional[Line], out: List[str]) -> None:
+        if self._skip_next:
+            self._skip_next = False
+            return
+
+        is_bullet = line.is_bullet
+        section_candidate, remainder = section_from_line(line.text)
+        if section_candidate:
+            self._flush(out)
+            self._section = section_candidate
+            if not remainder:
+                return
+            line = make_line(remainder)
+            is_bullet = False
+
+        section = self._section
+        if section == "projects":
+            if _looks_like_project_header(line.text):
+                self._start(_parse_project_header(line.text), out)
+            else:
+                self._detail(line)
+        elif section == "education":
+            if not is_bullet and line.has_date and not _looks_like_project_header(line.text):
+                self._start({"kind": "education", "title": line.text, "details": []}, out)
+            else:
+                self._detail(line)
+        elif section == "experience":
+            if not is_bullet and _looks_like_experience_header(line):
+                header = line.text
+                if nxt is not None and (not nxt.is_bullet) and nxt.has_date and not line.has_date:
+                    header = header + " | " + nxt.text
+                    self._skip_next = True
+                self._start({"kind": "experience", "title": header, "details": []}, out)
+            else:
+                self._detail(line)
+        elif section is None:
+            if _looks_like_project_header(line.text):
+                self._start(_parse_project_header(line.text), out)
+                self._section = "projects"
+            elif not is_bullet and _looks_like_experience_header(line):
+                self._start({"kind": "experience", "title": line.text, "details": []}, out)
+                self._section = "experience"
+            else:
+                self._detail(line)
+
+
+def extract_fact_entries(text: str) -> Tuple[List[str], Dict[str, Any]]:
+    """One-shot parse: (deduplicated fact bullets, FactParser.stats())."""
+    parser = FactParser()
+    bullets = list(parser.bullets([str(text or "")]))
+    return bullets, parser.stats()
@@ -0,0 +1,156 @@
+"""
+hedging.py — Hedged calls across model candidates.
+
+A Hedger walks a candidate list like the plain sequential loop, except that
+when the model in flight has not answered within a hedge delay, the same
+request is also sent to the next candidate. Whichever call returns a result
+first wins; the others are cancelled if they have not started yet, and
+otherwise abandoned: lx.extract is a blocking call that cannot be
+interrupted, so an abandoned call finishes in the background and only its
+outcome (latency, error) is reported to the router.
+
+The hedge delay is a percentile of the in-flight model's recent latency as
+tracked by the ModelRouter, clamped to [min_delay, max_delay]; without
+samples, default_delay is used. Each request may fire at most max_hedges
+hedges; a failed call still falls through to the next candidate
+immediately, as in the sequential loop, and that is not counted as a hedge.
+Counter changes (requests, hedges_fired, hedge_wins, abandoned) are also
+passed to on_count, e.g. to export them as metrics.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class Hedger:
+    """Runs attempt(model_id) over candidates with latency-triggered hedges."""
+
+    def __init__(
+        self,
+        router: Optional[Any] = None,
+        percentile: float = 95.0,
+        default_delay: float = 20.0,
+        min_delay: float = 1.0,
+        max_delay: float = 60.0,
+        max_hedges: int = 1,
+        workers: int = 32,
+        on_count: Optional[Callable[[str, int], None]] = None,
+    ) -> None:
+        self.router = router
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max(min_delay, max_delay)
+        self.max_hedges = max(0, max_hedges)
+        self.workers = max(1, workers)
+        self.on_count = on_count
+        self.requests = 0
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+        self.abandoned = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hedge")
+
+    def delay_for(self, model_id: str) -> float:
+        """Seconds to wait on model_id before hedging to the next candidate."""
+        observed = self.router.latency_percentile(model_id, self.percentile) if self.router is not None else None
+        if observed is None:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, observed))
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+        if self.on_count is not None:
+            for name, delta in deltas.items():
+                self.on_count(name, delta)
+
+    def _submit(self, attempt: Callable[[str], Any], model_id: str) -> Future:
+        def timed() -> Any:
+            started = time.perf_counter()
+            try:
+                result = attempt(model_id)
+            except Exception as exc:  # noqa: BLE001
+                if self.router is not None:
+                    self.router.record(model_id, time.perf_counter() - started, exc)
+                raise
+            if self.router is not None:
+                self.router.record(model_id, time.perf_counter() - started)
+            return result
+
+        # Run in the caller's context so per-request state (e.g. timings) follows the call.
+        return self._pool.submit(contextvars.copy_context().run, timed)
+
+    def run(
+        self,
+        candidates: Sequence[str],
+        attempt: Callable[[str], Any],
+        passthrough: Tuple[type, ...] = (),
+    ) -> Tuple[Any, Optional[str], Optional[str]]:
+        """Return (result | None, model, last_error); attempt raises on failure.
+
+        An error of a passthrough type is raised instead of trying the next
+        candidate; calls still in flight are abandoned.
+        """
+        queue: List[str] = self.router.order(candidates) if self.router is not None else list(candidates)
+        self._count(requests=1)
+        in_flight: Dict[Future, Tuple[str, bool]] = {}
+        last_error: Optional[str] = None
+        hedges = 0
+
+        def launch(hedge: bool) -> None:
+            model_id = queue.pop(0)
+            in_flight[self._submit(attempt, model_id)] = (model_id, hedge)
+
+        try:
+            if queue:
+                launch(False)
+            while in_flight:
+                # Hedge only while under budget and there is another model to try.
+                newest = next(reversed(in_flight))
+                timeout = self.delay_for(in_flight[newest][0]) if queue and hedges < self.max_hedges else None
+                done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    hedges += 1
+                    self._count(hedges_fired=1)
+                    launch(True)
+                    continue
+                for future in done:
+                    model_id, hedge = in_flight.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        if hedge:
+                            self._count(hedge_wins=1)
+                        return future.result(), model_id, None
+                    if isinstance(error, passthrough):
+                        raise error
+                    last_error = str(error)
+                if not in_flight and queue:
+                    launch(False)
+            return None, None, last_error
+        finally:
+            for future in in_flight:
+                if not future.cancel():
+                    self._count(abandoned=1)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "percentile": self.percentile,
+            "defaultDelaySeconds": self.default_delay,
+            "minDelaySeconds": self.min_delay,
+            "maxDelaySeconds": self.max_delay,
+            "maxHedgesPerRequest": self.max_hedges,
+            "requests": self.requests,
+            "hedgesFired": self.hedges_fired,
+            "hedgeWins": self.hedge_wins,
+            "abandoned": self.abandoned,
+        }
@@ -0,0 +1,216 @@
+"""
+jobs.py — Background extraction jobs with persisted results.
+
+Long extractions can outlive the HTTP request that started them (the
+extension's service worker may be suspended mid-request). JobQueue takes a
+job id plus a coroutine factory, runs it on a fixed number of worker tasks
+in priority order, and writes every state change to a SqliteCache, so a
+client can come back later and poll for the record or follow it as a stream.
+Store reads and writes run in a thread (asyncio.to_thread) so SQLite I/O
+never blocks the event loop.
+
+Job ids are derived from the request content by the caller: submitting the
+same work again while it is queued, running or done attaches to the existing
+job instead of starting another one; a failed job is run again. A factory
+whose work completed without succeeding (a provider error, a timed-out
+lane) raises JobFailed, so the job is recorded as failed, keeping the
+partial result, rather than serving that result for the job TTL. Inputs
+(e.g. uploaded PDF bytes) live only in memory until the job starts, so jobs
+left queued or running by a previous process are reported as failed.
+Records of queued and running jobs are also kept in memory until they
+finish, so the store evicting one early cannot lose the job.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+TERMINAL = (DONE, FAILED)
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+class QueueFullError(Exception):
+    """The queue already holds max_queued jobs."""
+
+
+class JobFailed(Exception):
+    """Raised by a job factory whose result is not a success; the result is
+    kept on the failed record."""
+
+    def __init__(self, message: str, result: Any = None) -> None:
+        super().__init__(message)
+        self.result = result
+
+
+class JobQueue:
+    """Priority job queue on asyncio worker tasks, records kept in a SqliteCache."""
+
+    def __init__(self, store: Any, workers: int = 2, max_queued: int = 1000) -> None:
+        self.store = store
+        self.workers = max(1, workers)
+        self.max_queued = max(1, max_queued)
+        self.submitted = 0
+        self.attached = 0
+        self.completed = 0
+        self.failed = 0
+        # Records written by an earlier process carry a different instance id.
+        self._instance = uuid.uuid4().hex
+        self._seq = itertools.count()
+        self._queue: Optional["asyncio.PriorityQueue[Tuple[int, int, str]]"] = None
+        self._factories: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        # Queued and running records; the store is an LRU cache and may drop them.
+        self._live: Dict[str, Dict[str, Any]] = {}
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._running = 0
+        # Serializes submit's read-then-write now that both await the store.
+        self._submit_lock: Optional[asyncio.Lock] = None
+
+    # -- lifecycle ---------------------------------------------------------
+    def start(self) -> None:
+        self._queue = asyncio.PriorityQueue()
+        self._submit_lock = asyncio.Lock()
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # -- records -----------------------------------------------------------
+    async def _save(self, record: Dict[str, Any]) -> None:
+        if record["status"] in TERMINAL:
+            self._live.pop(record["id"], None)
+        else:
+            self._live[record["id"]] = record
+        await asyncio.to_thread(self.store.put_json, record["id"], record)
+        event = self._changed.pop(record["id"], None)
+        if event is not None:
+            event.set()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job record, or None if unknown or expired from the store."""
+        live = self._live.get(job_id)
+        if live is not None:
+            record = dict(live)
+            record.pop("instance", None)
+            return record
+        record = await asyncio.to_thread(self.store.get_json, job_id)
+        if not isinstance(record, dict):
+            return None
+        if record.get("status") not in TERMINAL and record.get("instance") != self._instance:
+            record.update(status=FAILED, error="Interrupted by a server restart; submit again")
+        record.pop("instance", None)
+        return record
+
+    # -- submission --------------------------------------------------------
+    async def submit(
+        self,
+        job_id: str,
+        kind: str,
+        factory: Callable[[], Awaitable[Any]],
+        priority: int = PRIORITIES["normal"],
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Queue factory() as job_id; returns (record, attached to an existing job)."""
+        if self._queue is None or self._submit_lock is None:
+            raise RuntimeError("JobQueue.start() has not been called")
+        async with self._submit_lock:
+            existing = await self.get(job_id)
+            if existing is not None and existing["status"] != FAILED:
+                self.attached += 1
+                return existing, True
+            if self._queue.qsize() >= self.max_queued:
+                raise QueueFullError(f"Job queue is full ({self.max_queued} jobs waiting)")
+
+            record: Dict[str, Any] = {
+                "id": job_id,
+                "kind": kind,
+                "status": QUEUED,
+                "priority": priority,
+                "createdAt": time.time(),
+                "startedAt": None,
+                "finishedAt": None,
+                "result": None,
+                "error": None,
+                "instance": self._instance,
+            }
+            await self._save(record)
+            self._factories[job_id] = factory
+            self._queue.put_nowait((priority, next(self._seq), job_id))
+            self.submitted += 1
+        record = dict(record)
+        record.pop("instance")
+        return record, False
+
+    async def watch(self, job_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield the record on every state change until it is terminal.
+
+        None is yielded when heartbeat seconds pass without a change, so
+        streaming callers can keep the connection alive. Stops early if the
+        record disappears from the store.
+        """
+        while True:
+            event = self._changed.setdefault(job_id, asyncio.Event())
+            record = await self.get(job_id)
+            if record is None:
+                return
+            yield record
+            if record["status"] in TERMINAL:
+                return
+            try:
+                await asyncio.wait_for(event.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+
+    # -- workers -----------------------------------------------------------
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            _, _, job_id = await self._queue.get()
+            factory = self._factories.pop(job_id, None)
+            record = self._live.get(job_id)
+            if factory is None or record is None:
+                continue
+            record.update(status=RUNNING, startedAt=time.time())
+            await self._save(record)
+            self._running += 1
+            try:
+                result = await factory()
+            except asyncio.CancelledError:
+                record.update(status=FAILED, error="Cancelled", finishedAt=time.time())
+                await self._save(record)
+                raise
+            except JobFailed as exc:
+                record.update(status=FAILED, error=str(exc), result=exc.result, finishedAt=time.time())
+                self.failed += 1
+            except Exception as exc:  # noqa: BLE001
+                # HTTPException carries its message in .detail.
+                record.update(status=FAILED, error=str(getattr(exc, "detail", "") or exc), finishedAt=time.time())
+                self.failed += 1
+            else:
+                record.update(status=DONE, result=result, finishedAt=time.time())
+                self.completed += 1
+            finally:
+                self._running -= 1
+            await self._save(record)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "maxQueued": self.max_queued,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "submitted": self.submitted,
+            "attached": self.attached,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
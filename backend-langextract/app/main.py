@@ -1,15 +1,27 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import contextvars
+import functools
+import hashlib
 import io
+import json
 import os
-import re
+import random
+import sqlite3
 import sys
+import time
+import zipfile
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
 # ---------------------------------------------------------------------------
@@ -22,6 +34,28 @@ LANGEXTRACT_API_KEY: str = os.environ.get("LANGEXTRACT_API_KEY", "").strip()
 sys.path.insert(0, str(_BACKEND_ROOT))
 import extract_resume  # vendor module  # noqa: E402
 
+from . import codec  # noqa: E402
+from .admission import ConcurrencyGate, Overloaded, RateLimiter, retry_after_header  # noqa: E402
+from .cache import SqliteCache, content_key, text_fingerprint  # noqa: E402
+from .cv_parser import FactParser, extract_fact_entries, section_from_line  # noqa: E402
+from .dedup import NearDuplicateIndex  # noqa: E402
+from .normalize import (  # noqa: E402
+    key_tokens,
+    normalize_text,
+    preprocess_cv_text,
+    split_lines,
+    split_sentences,
+)
+from .hedging import Hedger  # noqa: E402
+from .jobs import PRIORITIES, JobFailed, JobQueue, QueueFullError  # noqa: E402
+from .metrics import COUNT_BUCKETS, SIZE_BUCKETS, Metrics, ServerTimingMiddleware  # noqa: E402
+from .pdf_text import _HAS_PYPDF, PdfTextPool  # noqa: E402
+from .profiling import Profiler, ProfilingMiddleware, stage_hook  # noqa: E402
+from .providers import ProviderPool  # noqa: E402
+from .router import ModelRouter, is_rate_limited  # noqa: E402
+from .singleflight import SingleFlight  # noqa: E402
+from .vector_index import _HAS_NUMPY, IndexRegistry, valid_name  # noqa: E402
+
 try:
     import langextract as lx
     _HAS_LX = True
@@ -29,12 +63,6 @@ except ImportError:
     lx = None  # type: ignore
     _HAS_LX = False
 
-try:
-    import pypdf
-    _HAS_PYPDF = True
-except ImportError:
-    _HAS_PYPDF = False
-
 # Gemini model candidates — verified available for this key (run /health to confirm)
 _GEMINI_CANDIDATES: List[str] = [
     "gemini-2.5-flash",
@@ -48,32 +76,90 @@ _ANTHROPIC_CANDIDATES: List[str] = [
     "anthropic-claude-3-5-sonnet-20241022",
 ]
 MAX_INPUT_CHARS = 36000
-ROLE_KEYWORDS = (
-    "engineer",
-    "researcher",
-    "intern",
-    "assistant",
-    "lead",
-    "developer",
-    "manager",
-    "analyst",
-    "designer",
-    "captain",
-    "founder",
-)
-MONTH_PATTERN = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?"
-DATE_RANGE_RE = re.compile(
-    rf"({MONTH_PATTERN}\s*\d{{4}}(?:\s*-\s*(?:{MONTH_PATTERN}\s*\d{{4}}|Present))?)",
-    re.IGNORECASE,
-)
-# Matches CV section headers that appear mid-line (not at line start)
-_CV_SECTION_RE = re.compile(
-    r"(?<=[^\n])\s+"
-    r"(Technical\s+Projects|Technical\s+Skills|Work\s+Experience|Professional\s+Experience"
-    r"|Education|Experience|Projects|Skills)"
-    r"(?=\s+[A-Za-z0-9])",
-    re.IGNORECASE,
-)
+# Longer lane inputs are chunked (with overlap) and extracted in parallel.
+LANE_CHUNK_OVERLAP_CHARS = int(os.environ.get("LANE_CHUNK_OVERLAP_CHARS", "1000"))
+LANE_MAX_CHUNKS = int(os.environ.get("LANE_MAX_CHUNKS", "12"))
+LANE_CHUNK_WORKERS = int(os.environ.get("LANE_CHUNK_WORKERS", "8"))
+# Lanes run concurrently on a bounded pool; each lane gets its own deadline.
+LANE_TIMEOUT_SECONDS = float(os.environ.get("LANE_TIMEOUT_SECONDS", "120"))
+LANE_MAX_WORKERS = int(os.environ.get("LANE_MAX_WORKERS", "6"))
+# Fact lane: parse heuristically first, call a model only below this confidence.
+FACTS_HEURISTIC_FIRST = os.environ.get("FACTS_HEURISTIC_FIRST", "0").strip() not in ("0", "false", "no")
+FACTS_MIN_CONFIDENCE = float(os.environ.get("FACTS_MIN_CONFIDENCE", "0.75"))
+# Model candidates are ordered by live health; failing models trip a circuit breaker.
+ROUTER_ENABLED = os.environ.get("ROUTER_ENABLED", "1").strip() not in ("0", "false", "no")
+ROUTER_FAILURE_THRESHOLD = int(os.environ.get("ROUTER_FAILURE_THRESHOLD", "3"))
+ROUTER_COOLDOWN_SECONDS = float(os.environ.get("ROUTER_COOLDOWN_SECONDS", "30"))
+ROUTER_MAX_COOLDOWN_SECONDS = float(os.environ.get("ROUTER_MAX_COOLDOWN_SECONDS", "600"))
+ROUTER_WINDOW = int(os.environ.get("ROUTER_WINDOW", "100"))
+ROUTER_MIN_SUCCESS_RATE = float(os.environ.get("ROUTER_MIN_SUCCESS_RATE", "0.5"))
+ROUTER_SLOW_FACTOR = float(os.environ.get("ROUTER_SLOW_FACTOR", "2"))
+ROUTER_RATE_LIMIT_BACKOFF_SECONDS = float(os.environ.get("ROUTER_RATE_LIMIT_BACKOFF_SECONDS", "5"))
+# Hedging: re-send a slow extraction to the next candidate after a latency percentile.
+HEDGE_ENABLED = os.environ.get("HEDGE_ENABLED", "0").strip() not in ("0", "false", "no")
+HEDGE_PERCENTILE = float(os.environ.get("HEDGE_PERCENTILE", "95"))
+HEDGE_DEFAULT_DELAY_SECONDS = float(os.environ.get("HEDGE_DEFAULT_DELAY_SECONDS", "20"))
+HEDGE_MIN_DELAY_SECONDS = float(os.environ.get("HEDGE_MIN_DELAY_SECONDS", "1"))
+HEDGE_MAX_DELAY_SECONDS = float(os.environ.get("HEDGE_MAX_DELAY_SECONDS", "60"))
+HEDGE_MAX_PER_REQUEST = int(os.environ.get("HEDGE_MAX_PER_REQUEST", "1"))
+HEDGE_WORKERS = int(os.environ.get("HEDGE_WORKERS", "32"))
+
+# PDF text extraction runs in worker processes, pages of long CVs in parallel.
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", str(max(1, min(4, os.cpu_count() or 1)))))
+PDF_TIMEOUT_SECONDS = float(os.environ.get("PDF_TIMEOUT_SECONDS", "30"))
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", "40"))
+PDF_PAGES_PER_TASK = int(os.environ.get("PDF_PAGES_PER_TASK", "8"))
+
+# Resume re-uploads only re-extract sections whose text changed.
+RESUME_INCREMENTAL = os.environ.get("RESUME_INCREMENTAL", "0").strip() not in ("0", "false", "no")
+RESUME_SECTION_WORKERS = int(os.environ.get("RESUME_SECTION_WORKERS", "4"))
+RESUME_SECTION_CACHE_MAX_ENTRIES = int(os.environ.get("RESUME_SECTION_CACHE_MAX_ENTRIES", "20000"))
+RESUME_SECTION_CACHE_TTL_SECONDS = float(os.environ.get("RESUME_SECTION_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# Batch resume ingestion: LLM calls bounded, PDF parsing shares the PDF pool.
+BATCH_EXTRACT_CONCURRENCY = int(os.environ.get("BATCH_EXTRACT_CONCURRENCY", "4"))
+BATCH_MAX_FILES = int(os.environ.get("BATCH_MAX_FILES", "500"))
+BATCH_MAX_FILE_MB = int(os.environ.get("BATCH_MAX_FILE_MB", "20"))
+BATCH_MAX_TOTAL_MB = int(os.environ.get("BATCH_MAX_TOTAL_MB", "200"))
+
+# Identical concurrent lane / embed / resume requests share one upstream call.
+COALESCE_ENABLED = os.environ.get("COALESCE_ENABLED", "1").strip() not in ("0", "false", "no")
+
+# Admission control: token buckets per client and per API key in front of the extraction
+# and embed endpoints, and a process-wide cap on calls in flight per upstream provider.
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "1").strip() not in ("0", "false", "no")
+CLIENT_RATE_PER_MINUTE = float(os.environ.get("CLIENT_RATE_PER_MINUTE", "120"))
+CLIENT_BURST = float(os.environ.get("CLIENT_BURST", "60"))
+API_KEY_RATE_PER_MINUTE = float(os.environ.get("API_KEY_RATE_PER_MINUTE", "240"))
+API_KEY_BURST = float(os.environ.get("API_KEY_BURST", "120"))
+GEMINI_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "16"))
+ANTHROPIC_MAX_CONCURRENCY = int(os.environ.get("ANTHROPIC_MAX_CONCURRENCY", "8"))
+PROVIDER_MAX_QUEUE = int(os.environ.get("PROVIDER_MAX_QUEUE", "64"))
+PROVIDER_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("PROVIDER_QUEUE_TIMEOUT_SECONDS", "20"))
+
+# Opt-in request profiling: "X-Profile: 1" or a random sample; speedscope files in PROFILE_DIR.
+PROFILE_ENABLED = os.environ.get("PROFILE_ENABLED", "0").strip() not in ("0", "false", "no")
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", "1000"))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", "50"))
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", str(_BACKEND_ROOT / ".cache" / "profiles")))
+
+# Background jobs: submit, then poll or stream; records persist in the SQLite cache file.
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_MAX_QUEUED = int(os.environ.get("JOB_MAX_QUEUED", "1000"))
+JOB_MAX_ENTRIES = int(os.environ.get("JOB_MAX_ENTRIES", "5000"))
+JOB_MAX_MB = int(os.environ.get("JOB_MAX_MB", "128"))
+JOB_TTL_SECONDS = float(os.environ.get("JOB_TTL_SECONDS", str(24 * 3600)))
+
+# Persistent result cache (SQLite) shared by the lane and embedding caches.
+CACHE_PATH = Path(os.environ.get("CACHE_PATH", str(_BACKEND_ROOT / ".cache" / "backend.sqlite3")))
+LANE_CACHE_ENABLED = os.environ.get("LANE_CACHE_ENABLED", "1").strip() not in ("0", "false", "no")
+LANE_CACHE_MAX_ENTRIES = int(os.environ.get("LANE_CACHE_MAX_ENTRIES", "5000"))
+LANE_CACHE_MAX_MB = int(os.environ.get("LANE_CACHE_MAX_MB", "64"))
+LANE_CACHE_TTL_SECONDS = float(os.environ.get("LANE_CACHE_TTL_SECONDS", str(14 * 24 * 3600)))
+# Bump when bullet composition / dedup changes so stale cached lanes are ignored.
+_LANE_CACHE_VERSION = "1"
 
 
 try:
@@ -88,48 +174,263 @@ except ImportError:
 _EMBED_MODEL = "gemini-embedding-001"
 _EMBED_DIM   = 768
 _EMBED_BATCH = 50  # max texts per embedContent call
+# Batches are sent concurrently on the async client, each retried with backoff.
+EMBED_MAX_IN_FLIGHT = int(os.environ.get("EMBED_MAX_IN_FLIGHT", "8"))
+EMBED_MAX_RETRIES = int(os.environ.get("EMBED_MAX_RETRIES", "3"))
+EMBED_RETRY_BASE_SECONDS = float(os.environ.get("EMBED_RETRY_BASE_SECONDS", "0.5"))
+_RETRYABLE_STATUS = (408, 429, 500, 502, 503, 504)
+_EMBED_ENCODINGS = ("json", "base64-f32", "base64-f16", "binary-f32", "binary-f16")
+_EMBED_TASK_TYPES = ("RETRIEVAL_DOCUMENT", "RETRIEVAL_QUERY", "SEMANTIC_SIMILARITY", "CLASSIFICATION", "CLUSTERING")
+
+# Upstream HTTP keep-alive pool shared by /embed and every lx.extract call.
+PROVIDER_MAX_CONNECTIONS = int(os.environ.get("PROVIDER_MAX_CONNECTIONS", "32"))
+PROVIDER_MAX_KEEPALIVE = int(os.environ.get("PROVIDER_MAX_KEEPALIVE", "16"))
+PROVIDER_KEEPALIVE_SECONDS = float(os.environ.get("PROVIDER_KEEPALIVE_SECONDS", "60"))
+PROVIDER_TIMEOUT_SECONDS = float(os.environ.get("PROVIDER_TIMEOUT_SECONDS", "120"))
+
+# Embeddings are cached per text as float32 blobs, keyed on model/task/dimension.
+EMBED_CACHE_ENABLED = os.environ.get("EMBED_CACHE_ENABLED", "1").strip() not in ("0", "false", "no")
+EMBED_CACHE_MAX_ENTRIES = int(os.environ.get("EMBED_CACHE_MAX_ENTRIES", "200000"))
+EMBED_CACHE_MAX_MB = int(os.environ.get("EMBED_CACHE_MAX_MB", "768"))
+EMBED_CACHE_TTL_SECONDS = float(os.environ.get("EMBED_CACHE_TTL_SECONDS", str(90 * 24 * 3600)))
+
+# Server-side vector indexes (one per user + bank)
+INDEX_MAX_K = int(os.environ.get("INDEX_MAX_K", "200"))
+# Indexes persist as memory-mapped .npy matrices + JSON sidecars under INDEX_DIR.
+INDEX_PERSIST = os.environ.get("INDEX_PERSIST", "1").strip() not in ("0", "false", "no")
+INDEX_DIR = Path(os.environ.get("INDEX_DIR", str(_BACKEND_ROOT / ".cache" / "indexes")))
+INDEX_STORAGE_DTYPE = os.environ.get("INDEX_STORAGE_DTYPE", "float32").strip().lower()
 
 
 class EmbedRequest(BaseModel):
     texts: List[str]
     task_type: str = "RETRIEVAL_DOCUMENT"
+    # json | base64-f32 | base64-f16 | binary-f32 | binary-f16
+    encoding: str = "json"
+
+
+class IndexItem(BaseModel):
+    id: str
+    vector: Optional[List[float]] = None
+    text: Optional[str] = None
+    metadata: Dict[str, Any] = {}
+
+
+class IndexUpsertRequest(BaseModel):
+    items: List[IndexItem]
+    task_type: str = "RETRIEVAL_DOCUMENT"
+
+
+class IndexDeleteRequest(BaseModel):
+    ids: List[str]
+
+
+class IndexQuery(BaseModel):
+    banks: List[str]
+    vector: Optional[List[float]] = None
+    text: Optional[str] = None
+    k: int = 8
+
+
+class IndexQueryRequest(BaseModel):
+    queries: List[IndexQuery]
 
 
 class StructuredLaneRequest(BaseModel):
     # apiKey is now optional — backend reads key from .env
     # Kept so existing extension payloads don't extend.
+    # When sent, it is also the key for the per-API-key rate limit.
     apiKey: Optional[str] = None
     factText: str = ""
     voiceText: str = ""
     companyText: str = ""
 
 
-app = FastAPI(title="AIIA LangExtract Backend", version="2.0.0")
+_LANE_EXECUTOR = ThreadPoolExecutor(max_workers=LANE_MAX_WORKERS, thread_name_prefix="lane")
+# Chunks of long lane inputs; lane threads wait on it, chunk threads never submit to it.
+_LANE_CHUNK_EXECUTOR = ThreadPoolExecutor(max_workers=LANE_CHUNK_WORKERS, thread_name_prefix="lane-chunk")
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=False,
-    allow_methods=["*"],
-    allow_headers=["*"],
+_PDF_POOL = PdfTextPool(
+    workers=PDF_WORKERS,
+    timeout_seconds=PDF_TIMEOUT_SECONDS,
+    max_pages=PDF_MAX_PAGES,
+    pages_per_task=PDF_PAGES_PER_TASK,
 )
 
+_PROVIDERS = ProviderPool(
+    LANGEXTRACT_API_KEY,
+    max_connections=PROVIDER_MAX_CONNECTIONS,
+    max_keepalive=PROVIDER_MAX_KEEPALIVE,
+    keepalive_expiry=PROVIDER_KEEPALIVE_SECONDS,
+    timeout=PROVIDER_TIMEOUT_SECONDS,
+)
 
-def _normalize_text(text: str) -> str:
-    value = str(text or "")
-    value = value.replace("\u2013", "-").replace("\u2014", "-").replace("\ufffd", " ")
-    return re.sub(r"\s+", " ", value).strip()
+_ROUTER: Optional[ModelRouter] = None
+if ROUTER_ENABLED:
+    _ROUTER = ModelRouter(
+        failure_threshold=ROUTER_FAILURE_THRESHOLD,
+        cooldown_seconds=ROUTER_COOLDOWN_SECONDS,
+        max_cooldown_seconds=ROUTER_MAX_COOLDOWN_SECONDS,
+        window=ROUTER_WINDOW,
+        min_success_rate=ROUTER_MIN_SUCCESS_RATE,
+        slow_factor=ROUTER_SLOW_FACTOR,
+        rate_limit_backoff=ROUTER_RATE_LIMIT_BACKOFF_SECONDS,
+    )
 
+_HEDGER: Optional[Hedger] = None
+if HEDGE_ENABLED:
+    _HEDGER = Hedger(
+        router=_ROUTER,
+        percentile=HEDGE_PERCENTILE,
+        default_delay=HEDGE_DEFAULT_DELAY_SECONDS,
+        min_delay=HEDGE_MIN_DELAY_SECONDS,
+        max_delay=HEDGE_MAX_DELAY_SECONDS,
+        max_hedges=HEDGE_MAX_PER_REQUEST,
+        workers=HEDGE_WORKERS,
+        on_count=lambda event, delta: _METRICS.inc("hedge_events_total", delta, event=event),
+    )
 
-def _canonical_key(text: str) -> str:
-    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9\s]", " ", text.lower())).strip()
+_LANE_FLIGHTS: Optional[SingleFlight] = SingleFlight() if COALESCE_ENABLED else None
+_EMBED_FLIGHTS: Optional[SingleFlight] = SingleFlight() if COALESCE_ENABLED else None
+_RESUME_FLIGHTS: Optional[SingleFlight] = SingleFlight() if COALESCE_ENABLED else None
+
+_CLIENT_LIMITER: Optional[RateLimiter] = None
+_KEY_LIMITER: Optional[RateLimiter] = None
+_GATES: Dict[str, ConcurrencyGate] = {}
+if ADMISSION_ENABLED:
+    _CLIENT_LIMITER = RateLimiter(CLIENT_RATE_PER_MINUTE, CLIENT_BURST)
+    _KEY_LIMITER = RateLimiter(API_KEY_RATE_PER_MINUTE, API_KEY_BURST)
+    # Gemini extraction and embedding calls share one quota, hence one gate.
+    _GATES = {
+        name: ConcurrencyGate(name, limit, PROVIDER_MAX_QUEUE, PROVIDER_QUEUE_TIMEOUT_SECONDS)
+        for name, limit in (("gemini", GEMINI_MAX_CONCURRENCY), ("anthropic", ANTHROPIC_MAX_CONCURRENCY))
+    }
 
+_INDEXES = IndexRegistry(INDEX_DIR if INDEX_PERSIST else None, storage_dtype=INDEX_STORAGE_DTYPE)
 
-def _truncate_text(text: str) -> str:
-    source = str(text or "").strip()
-    if len(source) <= MAX_INPUT_CHARS:
-        return source
-    return source[:MAX_INPUT_CHARS]
+_LANE_CACHE: Optional[SqliteCache] = None
+if LANE_CACHE_ENABLED:
+    _LANE_CACHE = SqliteCache(
+        CACHE_PATH,
+        table="lane_results",
+        max_entries=LANE_CACHE_MAX_ENTRIES,
+        max_bytes=LANE_CACHE_MAX_MB * 1024 * 1024,
+        ttl_seconds=LANE_CACHE_TTL_SECONDS,
+    )
+
+_SECTION_CACHE: Optional[SqliteCache] = None
+if RESUME_INCREMENTAL:
+    _SECTION_CACHE = SqliteCache(
+        CACHE_PATH,
+        table="resume_sections",
+        max_entries=RESUME_SECTION_CACHE_MAX_ENTRIES,
+        ttl_seconds=RESUME_SECTION_CACHE_TTL_SECONDS,
+    )
+
+_EMBED_CACHE: Optional[SqliteCache] = None
+if EMBED_CACHE_ENABLED:
+    _EMBED_CACHE = SqliteCache(
+        CACHE_PATH,
+        table="embeddings",
+        max_entries=EMBED_CACHE_MAX_ENTRIES,
+        max_bytes=EMBED_CACHE_MAX_MB * 1024 * 1024,
+        ttl_seconds=EMBED_CACHE_TTL_SECONDS,
+    )
+
+
+_METRICS = Metrics("aiia")
+_METRICS.histogram("http_request_seconds", "HTTP request duration by route template and status")
+_METRICS.histogram("stage_seconds", "Duration of pipeline stages (pdf_parse, preprocess, heuristic, extract, dedup, ...)")
+_METRICS.histogram("input_size", "Input sizes by kind (lane_chars, resume_chars, pdf_bytes, embed_texts)", SIZE_BUCKETS)
+_METRICS.histogram("embed_batch_size", "Texts per embedContent call", COUNT_BUCKETS)
+_METRICS.counter("extract_attempts_total", "lx.extract attempts by model and outcome (ok, error, rate_limited)")
+_METRICS.counter("lane_path_total", "Lane results by what served them (heuristic, llm, cache, *-fallback, timeout, error, shed)")
+_METRICS.counter("cache_requests_total", "Result cache lookups by cache and result (hit, miss)")
+_METRICS.counter("errors_total", "Failures by stage")
+_METRICS.counter("hedge_events_total", "Hedger activity by event (requests, hedges_fired, hedge_wins, abandoned)")
+_METRICS.counter("admission_rejections_total", "Requests shed with 429 by reason (client_rate, key_rate, provider_queue)")
+
+
+def _provider_gate(model_id: Optional[str]) -> Optional[ConcurrencyGate]:
+    provider = "anthropic" if str(model_id or "").lower().startswith("anthropic") else "gemini"
+    return _GATES.get(provider)
+
+
+class _ObservedProvider:
+    """_PROVIDERS.extract behind the provider's concurrency gate, with per-attempt
+    metrics; also handed to extract_resume."""
+
+    def extract(self, **kwargs: Any) -> Any:
+        model_id = kwargs.get("model_id")
+        gate = _provider_gate(model_id)
+        try:
+            with gate.slot() if gate is not None else contextlib.nullcontext():
+                with _METRICS.stage("extract", model=model_id):
+                    result = _PROVIDERS.extract(**kwargs)
+        except Overloaded:
+            _METRICS.inc("extract_attempts_total", model=model_id, outcome="shed")
+            raise
+        except Exception as err:
+            outcome = "rate_limited" if is_rate_limited(err) else "error"
+            _METRICS.inc("extract_attempts_total", model=model_id, outcome=outcome)
+            raise
+        _METRICS.inc("extract_attempts_total", model=model_id, outcome="ok")
+        return result
+
+
+_EXTRACT_PROVIDER = _ObservedProvider()
+
+_PROFILER: Optional[Profiler] = None
+if PROFILE_ENABLED:
+    _PROFILER = Profiler(
+        PROFILE_DIR,
+        sample_rate=PROFILE_SAMPLE_RATE,
+        interval_ms=PROFILE_INTERVAL_MS,
+        slow_ms=PROFILE_SLOW_MS,
+        keep=PROFILE_KEEP,
+    )
+    _METRICS.stage_hooks.append(stage_hook)
+
+_JOBS = JobQueue(
+    SqliteCache(
+        CACHE_PATH,
+        table="jobs",
+        max_entries=JOB_MAX_ENTRIES,
+        max_bytes=JOB_MAX_MB * 1024 * 1024,
+        ttl_seconds=JOB_TTL_SECONDS,
+    ),
+    workers=JOB_WORKERS,
+    max_queued=JOB_MAX_QUEUED,
+)
+
+
+@contextlib.asynccontextmanager
+async def _lifespan(_app: FastAPI) -> Any:
+    _PROVIDERS.start()
+    _JOBS.start()
+    try:
+        yield
+    finally:
+        await _JOBS.stop()
+        await _PROVIDERS.aclose()
+        _PDF_POOL.shutdown()
+        if _HEDGER is not None:
+            _HEDGER.shutdown()
+
+
+app = FastAPI(title="AIIA LangExtract Backend", version="2.0.0", lifespan=_lifespan)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=False,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Profile-Id", "Retry-After"],
+)
+app.add_middleware(ServerTimingMiddleware, metrics=_METRICS)
+if _PROFILER is not None:
+    app.add_middleware(ProfilingMiddleware, profiler=_PROFILER)
 
 
 def _lane_prompt(lane: str) -> str:
@@ -208,6 +509,50 @@ def _lane_examples(lane: str) -> List[Any]:
     return extract_resume.RESUME_EXAMPLES
 
 
+@functools.lru_cache(maxsize=None)
+def _lane_version(lane: str) -> str:
+    """Fingerprint of everything besides the input that shapes a lane's output."""
+    examples = []
+    for example in _lane_examples(lane):
+        examples.append({
+            "text": _safe_get(example, "text", ""),
+            "extractions": [
+                [
+                    _safe_get(ex, "extraction_class", ""),
+                    _safe_get(ex, "extraction_text", ""),
+                    _safe_get(ex, "attributes", {}) or {},
+                ]
+                for ex in (_safe_get(example, "extractions", []) or [])
+            ],
+        })
+    return content_key(_LANE_CACHE_VERSION, _lane_prompt(lane), json.dumps(examples, sort_keys=True))
+
+
+def _lane_cache_key(source: str, lane: str, candidates: List[str]) -> str:
+    return content_key("lane", lane, text_fingerprint(source), _lane_version(lane), ",".join(candidates))
+
+
+def _lane_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    if _LANE_CACHE is None:
+        return None
+    try:
+        cached = _LANE_CACHE.get_json(key)
+    except sqlite3.Error:
+        return None
+    hit = isinstance(cached, dict)
+    _METRICS.inc("cache_requests_total", cache="lane", result="hit" if hit else "miss")
+    return cached if hit else None
+
+
+def _lane_cache_put(key: str, items: List[str], model_id: str) -> None:
+    if _LANE_CACHE is None:
+        return
+    try:
+        _LANE_CACHE.put_json(key, {"items": items, "model": model_id})
+    except sqlite3.Error:
+        pass
+
+
 def _safe_get(obj: Any, name: str, default: Any = None) -> Any:
     if isinstance(obj, dict):
         return obj.get(name, default)
@@ -215,26 +560,26 @@ def _safe_get(obj: Any, name: str, default: Any = None) -> Any:
 
 
 def _compose_bullet(lane: str, extraction_text: str, extraction_class: str, attributes: Dict[str, Any]) -> str:
-    text = _normalize_text(extraction_text)
+    text = normalize_text(extraction_text)
     if not text:
         return ""
 
     parts = [text]
 
     if lane == "voice":
-        cue = _normalize_text(attributes.get("style_cue") or attributes.get("signal") or "")
+        cue = normalize_text(attributes.get("style_cue") or attributes.get("signal") or "")
         if cue:
             parts.append("Style cue: " + cue)
     elif lane == "company":
-        signal = _normalize_text(attributes.get("signal") or attributes.get("priority") or "")
+        signal = normalize_text(attributes.get("signal") or attributes.get("priority") or "")
         if signal:
             parts.append("Relevance: " + signal)
     else:
-        project = _normalize_text(attributes.get("project") or "")
-        description = _normalize_text(attributes.get("description") or "")
-        tools = _normalize_text(attributes.get("tools") or attributes.get("tool") or "")
-        impact = _normalize_text(attributes.get("impact") or attributes.get("outcome") or "")
-        skill = _normalize_text(attributes.get("skill") or attributes.get("tool") or "")
+        project = normalize_text(attributes.get("project") or "")
+        description = normalize_text(attributes.get("description") or "")
+        tools = normalize_text(attributes.get("tools") or attributes.get("tool") or "")
+        impact = normalize_text(attributes.get("impact") or attributes.get("outcome") or "")
+        skill = normalize_text(attributes.get("skill") or attributes.get("tool") or "")
         if project:
             parts.append("Project: " + project)
         if description:
@@ -253,23 +598,26 @@ def _compose_bullet(lane: str, extraction_text: str, extraction_class: str, attr
 
 
 def _dedup_items(items: List[str], max_items: int) -> List[str]:
-    seen_keys: List[str] = []
+    with _METRICS.stage("dedup"):
+        return _dedup_items_indexed(items, max_items)
+
+
+def _dedup_items_indexed(items: List[str], max_items: int) -> List[str]:
+    seen_keys = NearDuplicateIndex()
     output: List[str] = []
 
     for item in items:
-        cleaned = _normalize_text(item).lstrip("- ").strip()
+        cleaned = normalize_text(item).lstrip("- ").strip()
         if len(cleaned) < 18:
             continue
 
-        key = _canonical_key(cleaned)
+        key, tokens = key_tokens(cleaned)
         if not key:
             continue
 
-        is_dup = any(key == k or _is_near_duplicate(key, k) for k in seen_keys)
-        if is_dup:
+        if not seen_keys.add(key, tokens):
             continue
 
-        seen_keys.append(key)
         output.append(cleaned)
         if len(output) >= max_items:
             break
@@ -277,428 +625,377 @@ def _dedup_items(items: List[str], max_items: int) -> List[str]:
     return output
 
 
-def _to_lines_with_flags(text: str) -> List[Dict[str, Any]]:
-    source = str(text or "").replace("\r", "\n")
-    source = source.replace("â€¢", "\nâ€¢ ")
-    source = source.replace("â—", "\nâ€¢ ")
-    source = re.sub(r"\s{2,}", " ", source)
-    rows: List[Dict[str, Any]] = []
+def _heuristic_fallback(text: str, lane: str, max_items: int = 60) -> List[str]:
+    source = str(text or "").replace("\r", "\n").strip()
+    if not source:
+        return []
 
-    for raw in source.split("\n"):
-        if not raw or not raw.strip():
-            continue
-        stripped = raw.strip()
-        is_bullet = bool(re.match(r"^[\-\*â€¢]\s+", stripped))
-        cleaned = re.sub(r"^[\-\*â€¢â—Â·\?]+\s*", "", stripped).strip()
-        if not cleaned:
-            continue
-        rows.append({"text": cleaned, "is_bullet": is_bullet})
-
-    return rows
-
-
-def _section_from_line(line: str) -> Tuple[Optional[str], str]:
-    value = str(line or "").strip()
-    lowered = value.lower().strip(":")
-    mapping = [
-        ("technical projects", "projects"),
-        ("projects", "projects"),
-        ("work experience", "experience"),
-        ("professional experience", "experience"),
-        ("experience", "experience"),
-        ("education", "education"),
-        ("technical skills", "skills"),
-        ("skills", "skills"),
-    ]
+    with _METRICS.stage("heuristic"):
+        lines = split_lines(source)
+        if len(lines) < 8:
+            lines = split_sentences(source)
 
-    for key, section in mapping:
-        if lowered == key:
-            return section, ""
-        if lowered.startswith(key + " "):
-            remainder = value[len(key):].strip(" :-")
-            return section, remainder
-
-    return None, value
-
-
-def _has_date_token(text: str) -> bool:
-    source = str(text or "")
-    return bool(DATE_RANGE_RE.search(source) or re.search(r"\b(19|20)\d{2}\b", source))
-
-
-def _looks_like_project_header(line: str) -> bool:
-    value = str(line or "").strip()
-    if "|" not in value or len(value) < 12:
-        return False
-    lowered = value.lower()
-    if lowered.startswith("languages"):
-        return False
-    if ("@" in lowered) or ("linkedin.com" in lowered) or ("github.com" in lowered):
-        return False
-    if re.search(r"\+\d{7,}", value):
-        return False
-    left, right = value.split("|", 1)
-    if len(left.strip()) < 4 or len(right.strip()) < 4:
-        return False
-    if not ("," in right or DATE_RANGE_RE.search(right)):
-        return False
-    return True
-
-
-def _parse_project_header(line: str) -> Dict[str, str]:
-    value = str(line or "").strip()
-    left, right = value.split("|", 1)
-    title = left.strip(" :-")
-    right_part = right.strip()
-
-    date_match = DATE_RANGE_RE.search(right_part)
-    dates = date_match.group(1).strip() if date_match else ""
-    tools = right_part.replace(dates, "").strip(" |-")
+    if lane == "voice":
+        lines = ["Voice sample: " + x for x in lines]
+    elif lane == "company":
+        lines = ["Company signal: " + x for x in lines]
+    else:
+        lines = ["Experience: " + x for x in lines]
 
-    return {
-        "kind": "project",
-        "title": title,
-        "dates": dates,
-        "tools": tools,
-        "details": [],
-    }
+    return _dedup_items(lines, max_items)
 
 
-def _looks_like_experience_header(line: str) -> bool:
-    value = str(line or "").strip()
-    if len(value) < 8:
-        return False
-    if value.endswith(".") and len(value.split()) > 14:
-        return False
-    lowered = value.lower()
-    has_role_word = any(word in lowered for word in ROLE_KEYWORDS)
-    has_separator = (" - " in value) or (" â€“ " in value)
-    if has_role_word or has_separator:
-        return True
-    if _has_date_token(value) and ("team" in lowered or "lab" in lowered or "society" in lowered):
-        return True
-    return False
-
-
-def _strip_dates_for_key(text: str) -> str:
-    value = DATE_RANGE_RE.sub(" ", str(text or ""))
-    value = re.sub(r"\b(19|20)\d{2}\b", " ", value)
-    return re.sub(r"\s+", " ", value).strip()
-
-
-def _shorten(text: str, max_chars: int = 220) -> str:
-    value = _normalize_text(text)
-    if len(value) <= max_chars:
-        return value
-    return value[: max_chars - 3].rstrip() + "..."
-
-
-def _build_project_bullet(entry: Dict[str, Any]) -> str:
-    title = _shorten(entry.get("title", ""), 140)
-    tools = _shorten(entry.get("tools", ""), 170)
-    dates = _shorten(entry.get("dates", ""), 60)
-    details = [d for d in entry.get("details", []) if d]
-    highlights = details[:3]
-
-    parts = [f"Project: {title}"]
-    if dates:
-        parts.append(f"Dates: {dates}")
-    if tools:
-        parts.append(f"Tools: {tools}")
-    if highlights:
-        parts.append("Highlights: " + " | ".join(_shorten(x, 170) for x in highlights))
-    return "; ".join(parts)
+def _walk_candidates(candidates: List[str], attempt: Any) -> Tuple[Any, Optional[str], Optional[str]]:
+    """Call attempt(model_id) until one succeeds; return (result | None, model, last_error)."""
+    return extract_resume.walk_candidates(candidates, attempt, _ROUTER, _HEDGER, passthrough=(Overloaded,))
 
 
-def _build_experience_bullet(entry: Dict[str, Any]) -> str:
-    title = _shorten(entry.get("title", ""), 180)
-    details = [d for d in entry.get("details", []) if d]
-    highlights = details[:3]
+def _extract_chunk_with_models(
+    source: str,
+    lane: str,
+    candidates: List[str],
+) -> Tuple[Optional[List[str]], Optional[str], Optional[str]]:
+    """Walk the model candidates for one chunk; return (bullets | None, model, last_error).
 
-    parts = [f"Experience: {title}"]
-    if highlights:
-        parts.append("Highlights: " + " | ".join(_shorten(x, 170) for x in highlights))
-    return "; ".join(parts)
+    The router (when enabled) puts healthy models first, skips models whose
+    circuit breaker is open, and is told the outcome and latency of each call.
+    With HEDGE_ENABLED a slow call is also sent to the next candidate and the
+    first answer wins.
+    """
+    prompt_description = _lane_prompt(lane)
+    examples = _lane_examples(lane)
 
+    def attempt(model_id: str) -> Any:
+        return _EXTRACT_PROVIDER.extract(
+            text_or_documents=source,
+            prompt_description=prompt_description,
+            examples=examples,
+            model_id=model_id,
+            api_key=LANGEXTRACT_API_KEY,
+            fence_output=True,
+        )
 
-def _build_education_bullet(entry: Dict[str, Any]) -> str:
-    title = _shorten(entry.get("title", ""), 180)
-    details = [d for d in entry.get("details", []) if d]
-    highlights = details[:2]
+    result, model_id, last_error = _walk_candidates(candidates, attempt)
+    if model_id is None:
+        return None, None, last_error
 
-    parts = [f"Education: {title}"]
-    if highlights:
-        parts.append("Details: " + " | ".join(_shorten(x, 170) for x in highlights))
-    return "; ".join(parts)
+    raw_extractions = _safe_get(result, "extractions", []) or []
+    bullets: List[str] = []
 
+    for item in raw_extractions:
+        extraction_text = _safe_get(item, "extraction_text", "")
+        extraction_class = _safe_get(item, "extraction_class", "")
+        attributes = _safe_get(item, "attributes", {}) or {}
+        if not isinstance(attributes, dict):
+            attributes = {}
 
-def _token_set(text: str) -> set:
-    lowered = _canonical_key(text)
-    return {t for t in lowered.split(" ") if len(t) > 2}
+        bullet = _compose_bullet(lane, extraction_text, extraction_class, attributes)
+        if bullet:
+            bullets.append(bullet)
 
+    return bullets, model_id, None
 
-def _is_near_duplicate(a: str, b: str) -> bool:
-    a_set = _token_set(a)
-    b_set = _token_set(b)
-    if not a_set or not b_set:
-        return False
-    overlap = len(a_set & b_set)
-    union = len(a_set | b_set)
-    if not union:
-        return False
-    score = overlap / union
-    return score >= 0.86
 
+def _extract_with_langextract(text: str, lane: str) -> Tuple[List[str], Dict[str, Any]]:
+    """Call LangExtract using LANGEXTRACT_API_KEY from .env. Tries Gemini first.
 
-def _dedup_fact_entries(items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
-    kept: List[Dict[str, Any]] = []
-    dropped = 0
+    Inputs longer than MAX_INPUT_CHARS are split into overlapping chunks on
+    paragraph/line boundaries and extracted in parallel; bullets repeated
+    across chunk seams are removed by the usual near-duplicate pass. The
+    cache key and the heuristic paths use the whole input, not the chunks.
 
-    for item in items:
-        key = _canonical_key(item.get("dedup_key", ""))
-        if not key:
-            key = _canonical_key(item.get("bullet", ""))
-        if not key:
-            continue
+    With FACTS_HEURISTIC_FIRST the fact lane runs the structured CV parser
+    first and only escalates to the models when its coverage confidence is
+    below FACTS_MIN_CONFIDENCE. meta["path"] records what served the lane.
+    """
+    source = str(text or "").strip()
+    if not source:
+        return [], {"fromModel": False, "model": None, "error": None, "path": None}
+
+    _METRICS.observe("input_size", len(source), kind="lane_chars")
+    with _METRICS.stage("preprocess"):
+        chunks = extract_resume.split_into_chunks(source, MAX_INPUT_CHARS, LANE_CHUNK_OVERLAP_CHARS)
+    # Chunks past the cap are not sent to a model; droppedChunks in the stats says so.
+    dropped = max(0, len(chunks) - LANE_MAX_CHUNKS)
+    chunks = chunks[:LANE_MAX_CHUNKS]
+    max_items = (90 if lane == "voice" else 72) * len(chunks)
+
+    struct_bullets: Optional[List[str]] = None
+    confidence: Optional[float] = None
+    if lane == "facts" and FACTS_HEURISTIC_FIRST:
+        with _METRICS.stage("heuristic"):
+            struct_bullets, struct_stats = extract_fact_entries(source)
+        confidence = struct_stats["confidence"]
+        if struct_bullets and confidence >= FACTS_MIN_CONFIDENCE:
+            return _dedup_items(struct_bullets, max_items), {
+                "fromModel": False, "model": None, "error": None, "chunks": len(chunks),
+                "droppedChunks": 0, "path": "heuristic", "confidence": confidence,
+            }
 
-        is_duplicate = False
-        for existing in kept:
-            existing_key = _canonical_key(existing.get("dedup_key", existing.get("bullet", "")))
-            if key == existing_key or _is_near_duplicate(key, existing_key):
-                is_duplicate = True
-                break
+    if not LANGEXTRACT_API_KEY:
+        items = _heuristic_fallback(source, lane)
+        return items, {
+            "fromModel": False, "model": None, "error": "No LANGEXTRACT_API_KEY in .env",
+            "chunks": len(chunks), "droppedChunks": 0, "path": "heuristic-fallback",
+            "confidence": confidence,
+        }
 
-        if is_duplicate:
-            dropped += 1
-            continue
+    candidates = _GEMINI_CANDIDATES[:] + _ANTHROPIC_CANDIDATES
+    cache_key = _lane_cache_key(source, lane, candidates)
+    cached = _lane_cache_get(cache_key)
+    if cached is not None:
+        return list(cached.get("items") or []), {
+            "fromModel": True, "model": cached.get("model"), "error": None, "cacheHit": True,
+            "chunks": len(chunks), "droppedChunks": dropped, "path": "cache", "confidence": confidence,
+        }
+
+    if len(chunks) == 1:
+        outcomes = [_extract_chunk_with_models(chunks[0], lane, candidates)]
+    else:
+        # Each chunk runs in a copy of this context so its stages reach Server-Timing.
+        outcomes = list(_LANE_CHUNK_EXECUTOR.map(
+            lambda chunk, ctx: ctx.run(_extract_chunk_with_models, chunk, lane, candidates),
+            chunks,
+            [contextvars.copy_context() for _ in chunks],
+        ))
+
+    models = [model_id for bullets, model_id, _ in outcomes if bullets is not None]
+    errors = [error for bullets, _, error in outcomes if bullets is None and error]
+    last_error = errors[-1] if errors else None
+
+    if models:
+        merged = [bullet for bullets, _, _ in outcomes if bullets for bullet in bullets]
+        deduped = _dedup_items(merged, max_items)
+        if not errors:
+            _lane_cache_put(cache_key, deduped, models[0])
+        error = f"{len(errors)} of {len(chunks)} chunks failed: {last_error}" if errors else None
+        return deduped, {
+            "fromModel": True, "model": models[0], "error": error, "chunks": len(chunks),
+            "droppedChunks": dropped, "path": "llm", "confidence": confidence,
+        }
 
-        kept.append(item)
+    if lane not in ("voice", "company"):
+        if struct_bullets is None:
+            with _METRICS.stage("heuristic"):
+                struct_bullets, _ = extract_fact_entries(source)
+        deduped_struct = _dedup_items(struct_bullets, max_items)
+        if deduped_struct:
+            return deduped_struct, {
+                "fromModel": False, "model": None, "error": last_error, "chunks": len(chunks),
+                "droppedChunks": 0, "path": "structured-fallback", "confidence": confidence,
+            }
+
+    fallback = _heuristic_fallback(source, lane, max_items)
+    return fallback, {
+        "fromModel": False, "model": None, "error": last_error, "chunks": len(chunks),
+        "droppedChunks": 0, "path": "heuristic-fallback", "confidence": confidence,
+    }
 
-    return kept, dropped
 
+async def _extract_pdf_text(pdf_bytes: bytes) -> Tuple[str, Dict[str, Any]]:
+    """Extract plain text from PDF bytes using pypdf on the PDF process pool."""
+    if not _HAS_PYPDF:
+        raise HTTPException(
+            status_code=500,
+            detail="pypdf is not installed. Run: pip install pypdf",
+        )
+    _METRICS.observe("input_size", len(pdf_bytes), kind="pdf_bytes")
+    try:
+        with _METRICS.stage("pdf_parse"):
+            return await _PDF_POOL.extract(pdf_bytes)
+    except Exception as exc:
+        _METRICS.inc("errors_total", stage="pdf_parse")
+        raise HTTPException(status_code=422, detail=f"Failed to read PDF: {exc}") from exc
 
-def _preprocess_cv_text(text: str) -> str:
-    # Inject newlines before section headers embedded mid-line
-    # e.g. "...Control 2. Education University College London..." → split at "Education"
-    result = _CV_SECTION_RE.sub(r"\n\1", text)
-    # Merge dates broken across lines: "Oct.\n2025 - Present" → "Oct. 2025 - Present"
-    result = re.sub(r"(?<=\w)\.\n(\d{4})", r". \1", result)
-    result = re.sub(
-        r"\n(" + MONTH_PATTERN + r"\s*\d{4})",
-        r" \1",
-        result,
-        flags=re.IGNORECASE,
-    )
-    return result
-
-
-def _extract_structured_fact_entries(text: str) -> Tuple[List[str], Dict[str, Any]]:
-    lines = _to_lines_with_flags(_preprocess_cv_text(text))
-    if not lines:
-        return [], {"duplicatesDropped": 0, "parsedEntries": 0}
-
-    section: Optional[str] = None
-    current: Optional[Dict[str, Any]] = None
-    entries: List[Dict[str, Any]] = []
-
-    def flush_current() -> None:
-        nonlocal current
-        if not current:
-            return
-
-        details = [_normalize_text(d) for d in current.get("details", []) if _normalize_text(d)]
-        cleaned_details = []
-        for detail in details:
-            lowered = detail.lower()
-            if lowered in {"experience", "projects", "technical projects", "education", "skills", "technical skills"}:
-                continue
-            cleaned_details.append(detail)
-        current["details"] = cleaned_details
-
-        if current.get("kind") == "project":
-            bullet = _build_project_bullet(current)
-            dedup_key = _strip_dates_for_key(current.get("title", "") + " " + current.get("tools", ""))
-        elif current.get("kind") == "education":
-            bullet = _build_education_bullet(current)
-            dedup_key = _strip_dates_for_key(current.get("title", ""))
-        else:
-            bullet = _build_experience_bullet(current)
-            dedup_key = _strip_dates_for_key(current.get("title", ""))
-
-        if bullet and len(bullet) >= 22:
-            entries.append({"bullet": bullet, "dedup_key": dedup_key})
-
-        current = None
-
-    i = 0
-    while i < len(lines):
-        row = lines[i]
-        line = row["text"]
-        is_bullet = bool(row["is_bullet"])
-        section_candidate, remainder = _section_from_line(line)
-        if section_candidate:
-            flush_current()
-            section = section_candidate
-            line = remainder
-            is_bullet = False
-            if not line:
-                i += 1
-                continue
-
-        if section == "projects":
-            if _looks_like_project_header(line):
-                flush_current()
-                current = _parse_project_header(line)
-            elif current is not None:
-                current.setdefault("details", []).append(line)
-        elif section == "education":
-            if not is_bullet and _has_date_token(line) and not _looks_like_project_header(line):
-                flush_current()
-                current = {"kind": "education", "title": line, "details": []}
-            elif current is not None:
-                current.setdefault("details", []).append(line)
-        elif section == "experience":
-            if not is_bullet and _looks_like_experience_header(line):
-                flush_current()
-                header = line
-                if i + 1 < len(lines):
-                    nxt = lines[i + 1]
-                    nxt_text = nxt["text"]
-                    if (not nxt["is_bullet"]) and _has_date_token(nxt_text) and not _has_date_token(header):
-                        header = header + " | " + nxt_text
-                        i += 1
-                current = {"kind": "experience", "title": header, "details": []}
-            elif current is not None:
-                current.setdefault("details", []).append(line)
-        elif section is None:
-            if _looks_like_project_header(line):
-                flush_current()
-                current = _parse_project_header(line)
-                section = "projects"
-            elif not is_bullet and _looks_like_experience_header(line):
-                flush_current()
-                current = {"kind": "experience", "title": line, "details": []}
-                section = "experience"
-            elif current is not None:
-                current.setdefault("details", []).append(line)
-
-        i += 1
-
-    flush_current()
-    deduped_entries, dropped = _dedup_fact_entries(entries)
-    bullets = [item["bullet"] for item in deduped_entries]
-    return bullets, {"duplicatesDropped": dropped, "parsedEntries": len(entries)}
 
+def _lane_stats(items: List[str], meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "items": len(items),
+        "sourceRefs": 0,
+        "fromModel": bool(meta.get("fromModel")),
+        "provider": "langextract",
+        "model": meta.get("model"),
+        "error": meta.get("error"),
+        "duplicatesDropped": 0,
+        "parsedEntries": len(items),
+        "timedOut": bool(meta.get("timedOut")),
+        "cacheHit": bool(meta.get("cacheHit")),
+        "chunks": int(meta.get("chunks") or 0),
+        # Input past LANE_MAX_CHUNKS chunks was not extracted.
+        "truncated": bool(meta.get("droppedChunks")),
+        "droppedChunks": int(meta.get("droppedChunks") or 0),
+        # heuristic | llm | cache | structured-fallback | heuristic-fallback
+        "path": meta.get("path"),
+        "heuristicConfidence": meta.get("confidence"),
+    }
 
-def _heuristic_fallback(text: str, lane: str, max_items: int = 60) -> List[str]:
-    source = str(text or "").replace("\r", "\n").strip()
-    if not source:
-        return []
 
-    lines = [line.strip() for line in re.split(r"\n+", source) if line.strip()]
-    if len(lines) < 8:
-        lines = [s.strip() for s in re.split(r"(?<=[.!?])\s+", source) if s.strip()]
+def _lane_response(text: str, lane: str) -> Dict[str, Any]:
+    with _METRICS.stage("lane", lane=lane):
+        items, meta = _extract_with_langextract(text, lane)
+    _METRICS.inc("lane_path_total", lane=lane, path=meta.get("path") or "empty")
+    return {
+        "text": "\n".join("- " + item for item in items),
+        "stats": _lane_stats(items, meta),
+    }
 
-    if lane == "voice":
-        lines = ["Voice sample: " + x for x in lines]
-    elif lane == "company":
-        lines = ["Company signal: " + x for x in lines]
-    else:
-        lines = ["Experience: " + x for x in lines]
 
-    return _dedup_items(lines, max_items)
+async def _run_lane(text: str, lane: str) -> Dict[str, Any]:
+    """Run one lane on the lane pool, bounded by LANE_TIMEOUT_SECONDS.
 
+    A lane that times out or raises comes back empty with the reason in its
+    stats; it never fails the other lanes. Overloaded (the provider gate shed
+    the call) is raised so the endpoint can answer 429. The worker thread of a timed-out
+    lane is not interrupted, it finishes in the background and is discarded.
+    Identical lane text already being extracted for a concurrent request is
+    awaited instead of extracted twice.
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
 
-def _extract_with_langextract(text: str, lane: str) -> Tuple[List[str], Dict[str, Any]]:
-    """Call LangExtract using LANGEXTRACT_API_KEY from .env. Tries Gemini first."""
-    source = _truncate_text(text)
-    if not source:
-        return [], {"fromModel": False, "model": None, "error": None}
+    def work() -> Any:
+        ctx = contextvars.copy_context()
+        return loop.run_in_executor(_LANE_EXECUTOR, ctx.run, _lane_response, text, lane)
 
-    if not LANGEXTRACT_API_KEY:
-        items = _heuristic_fallback(source, lane)
-        return items, {"fromModel": False, "model": None, "error": "No LANGEXTRACT_API_KEY in .env"}
+    try:
+        if _LANE_FLIGHTS is not None:
+            shared = _LANE_FLIGHTS.do(content_key("lane", lane, text_fingerprint(text)), work)
+        else:
+            shared = work()
+        response = await asyncio.wait_for(shared, timeout=LANE_TIMEOUT_SECONDS)
+        # Coalesced callers share one response; each gets its own stats.
+        response = {"text": response["text"], "stats": dict(response["stats"])}
+    except Overloaded:
+        # Shed by the provider gate: the whole request gets 429, not an empty lane.
+        _METRICS.inc("lane_path_total", lane=lane, path="shed")
+        raise
+    except asyncio.TimeoutError:
+        error = f"Lane '{lane}' timed out after {LANE_TIMEOUT_SECONDS:g}s"
+        response = {"text": "", "stats": _lane_stats([], {"error": error, "timedOut": True})}
+        _METRICS.inc("lane_path_total", lane=lane, path="timeout")
+    except Exception as err:  # noqa: BLE001
+        response = {"text": "", "stats": _lane_stats([], {"error": str(err)})}
+        _METRICS.inc("lane_path_total", lane=lane, path="error")
 
-    prompt_description = _lane_prompt(lane)
-    examples = _lane_examples(lane)
-    last_error: Optional[str] = None
-    candidates = _GEMINI_CANDIDATES[:] + _ANTHROPIC_CANDIDATES
+    response["stats"]["elapsedMs"] = round((time.perf_counter() - started) * 1000)
+    return response
 
-    for model_id in candidates:
-        try:
-            result = lx.extract(
-                text_or_documents=source,
-                prompt_description=prompt_description,
-                examples=examples,
-                model_id=model_id,
-                api_key=LANGEXTRACT_API_KEY,
-                fence_output=True,
-            )
 
-            raw_extractions = _safe_get(result, "extractions", []) or []
-            bullets: List[str] = []
+def _pack_vector(values: Any) -> bytes:
+    return array("f", values).tobytes()
 
-            for item in raw_extractions:
-                extraction_text = _safe_get(item, "extraction_text", "")
-                extraction_class = _safe_get(item, "extraction_class", "")
-                attributes = _safe_get(item, "attributes", {}) or {}
-                if not isinstance(attributes, dict):
-                    attributes = {}
 
-                bullet = _compose_bullet(lane, extraction_text, extraction_class, attributes)
-                if bullet:
-                    bullets.append(bullet)
+def _unpack_vector(blob: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
 
-            deduped = _dedup_items(bullets, 90 if lane == "voice" else 72)
-            return deduped, {"fromModel": True, "model": model_id, "error": None}
-        except Exception as err:  # noqa: BLE001
-            last_error = str(err)
-            continue
 
-    if lane not in ("voice", "company"):
-        struct_bullets, _ = _extract_structured_fact_entries(source)
-        deduped_struct = _dedup_items(struct_bullets, 72)
-        if deduped_struct:
-            return deduped_struct, {"fromModel": False, "model": None, "error": last_error}
+def _embed_cache_key(text: str, task: str) -> str:
+    return content_key("embed", _EMBED_MODEL, task, _EMBED_DIM, text)
 
-    fallback = _heuristic_fallback(source, lane, 90 if lane == "voice" else 72)
-    return fallback, {"fromModel": False, "model": None, "error": last_error}
 
+def _embed_cache_get_many(keys: List[str]) -> Dict[str, bytes]:
+    if _EMBED_CACHE is None:
+        return {}
+    try:
+        return _EMBED_CACHE.get_many(keys)
+    except sqlite3.Error:
+        return {}
 
-def _extract_pdf_text(pdf_bytes: bytes) -> str:
-    """Extract plain text from PDF bytes using pypdf."""
-    if not _HAS_PYPDF:
+
+def _embed_cache_put_many(items: List[Tuple[str, bytes]]) -> None:
+    if _EMBED_CACHE is None:
+        return
+    try:
+        _EMBED_CACHE.put_many(items)
+    except sqlite3.Error:
+        pass
+
+
+def _is_retryable(err: Exception) -> bool:
+    # genai APIError carries the HTTP status in .code; transport errors have none.
+    code = getattr(err, "code", None)
+    return code is None or code in _RETRYABLE_STATUS
+
+
+async def _embed_batch(client: Any, batch: List[str], task: str, gate: asyncio.Semaphore) -> List[Any]:
+    """Embed one batch on the async client, retrying transient failures."""
+    config = _genai_types.EmbedContentConfig(task_type=task, output_dimensionality=_EMBED_DIM)
+    provider = _GATES.get("gemini")
+    _METRICS.observe("embed_batch_size", len(batch))
+    attempt = 0
+    while True:
+        async with gate:
+            try:
+                async with provider.slot_async() if provider is not None else contextlib.nullcontext():
+                    with _METRICS.stage("embed_batch"):
+                        result = await client.aio.models.embed_content(
+                            model=_EMBED_MODEL, contents=batch, config=config
+                        )
+                return [e.values for e in result.embeddings]
+            except Overloaded:
+                raise
+            except Exception as err:  # noqa: BLE001
+                _METRICS.inc("errors_total", stage="embed_batch")
+                if attempt >= EMBED_MAX_RETRIES or not _is_retryable(err):
+                    raise
+        # Back off outside the semaphore so other batches keep flowing.
+        delay = EMBED_RETRY_BASE_SECONDS * (2 ** attempt)
+        await asyncio.sleep(delay + random.uniform(0, delay))
+        attempt += 1
+
+
+def _shed(exc: Overloaded) -> HTTPException:
+    """429 + Retry-After for a call the provider gate turned away."""
+    return HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": retry_after_header(exc.retry_after)})
+
+
+def _admit(request: Request, cost: float = 1.0, api_key: Optional[str] = None, shed_when_busy: bool = True) -> None:
+    """Reject the request with 429 + Retry-After before any work is done.
+
+    cost is in tokens: one per lane, resume or batch file, one per 50 texts
+    to embed. Clients are identified by the peer address only, never by a
+    header the caller chooses; behind a proxy uvicorn must run with
+    --proxy-headers and FORWARDED_ALLOW_IPS limited to the proxy, so the
+    address is the proxy's view of the caller and X-Forwarded-For from
+    anyone else is ignored. Without a peer address the per-client limit is
+    skipped rather than sharing one bucket among everyone. API keys are
+    identified by the body's apiKey or X-Api-Key; that bucket only tightens
+    the client limit, since a caller can send any key.
+    With shed_when_busy the request is also turned away while the Gemini
+    gate's queue is full.
+    """
+    if _CLIENT_LIMITER is None or _KEY_LIMITER is None:
+        return
+    gate = _GATES.get("gemini")
+    if shed_when_busy and gate is not None and gate.saturated():
+        _METRICS.inc("admission_rejections_total", reason="provider_queue")
         raise HTTPException(
-            status_code=500,
-            detail="pypdf is not installed. Run: pip install pypdf",
+            status_code=429,
+            detail="The model provider is at capacity; try again shortly.",
+            headers={"Retry-After": retry_after_header(gate.retry_after())},
         )
-    try:
-        reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
-        pages_text = []
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                pages_text.append(page_text)
-        return "\n\n".join(pages_text)
-    except Exception as exc:
-        raise HTTPException(status_code=422, detail=f"Failed to read PDF: {exc}") from exc
 
-
-def _lane_response(text: str, lane: str) -> Dict[str, Any]:
-    items, meta = _extract_with_langextract(text, lane)
-    return {
-        "text": "\n".join("- " + item for item in items),
-        "stats": {
-            "items": len(items),
-            "sourceRefs": 0,
-            "fromModel": bool(meta.get("fromModel")),
-            "provider": "langextract",
-            "model": meta.get("model"),
-            "error": meta.get("error"),
-            "duplicatesDropped": 0,
-            "parsedEntries": len(items),
-        },
-    }
+    client = request.client.host if request.client else ""
+    client_key = "client:" + client if client else None
+    wait = _CLIENT_LIMITER.acquire(client_key, cost) if client_key else 0.0
+    reason, subject = "client_rate", "client"
+    api_key = api_key or request.headers.get("x-api-key")
+    if not wait and api_key:
+        key = "key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:24]
+        wait = _KEY_LIMITER.acquire(key, cost)
+        if wait:
+            if client_key:
+                _CLIENT_LIMITER.refund(client_key, cost)
+            reason, subject = "key_rate", "API key"
+    if wait:
+        _METRICS.inc("admission_rejections_total", reason=reason)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded for this {subject}; retry in {retry_after_header(wait)}s.",
+            headers={"Retry-After": retry_after_header(wait)},
+        )
 
 
 @app.get("/health")
@@ -709,60 +1006,448 @@ def health() -> Dict[str, Any]:
         "version": "2.0.0",
         "has_api_key": bool(LANGEXTRACT_API_KEY),
         "has_pypdf": _HAS_PYPDF,
+        "pdf_pool": _PDF_POOL.stats(),
         "has_langextract": _HAS_LX,
+        "lane_cache": _LANE_CACHE.stats() if _LANE_CACHE is not None else None,
+        "embed_cache": _EMBED_CACHE.stats() if _EMBED_CACHE is not None else None,
+        "resume_section_cache": _SECTION_CACHE.stats() if _SECTION_CACHE is not None else None,
+        "providers": _PROVIDERS.stats(),
+        "model_router": _ROUTER.stats() if _ROUTER is not None else None,
+        "hedging": _HEDGER.stats() if _HEDGER is not None else None,
+        "coalescing": {
+            "lanes": _LANE_FLIGHTS.stats(),
+            "embed": _EMBED_FLIGHTS.stats(),
+            "resumes": _RESUME_FLIGHTS.stats(),
+        } if COALESCE_ENABLED else None,
+        "has_numpy": _HAS_NUMPY,
+        "indexes": _INDEXES.stats(),
+        "jobs": _JOBS.stats(),
+        "profiling": _PROFILER.stats() if _PROFILER is not None else None,
+        "admission": {
+            "clients": _CLIENT_LIMITER.stats(),
+            "apiKeys": _KEY_LIMITER.stats(),
+            "providers": {name: gate.stats() for name, gate in _GATES.items()},
+        } if _CLIENT_LIMITER is not None and _KEY_LIMITER is not None else None,
+    }
+
+
+@app.get("/metrics")
+def metrics() -> Response:
+    """Counters and histograms in the Prometheus text exposition format."""
+    return Response(content=_METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _require_profiler() -> Profiler:
+    if _PROFILER is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (set PROFILE_ENABLED=1)")
+    return _PROFILER
+
+
+@app.get("/profiles")
+def list_profiles() -> Dict[str, Any]:
+    """Recently profiled requests, slowest first, with their profile ids."""
+    profiler = _require_profiler()
+    return {"ok": True, "profiles": profiler.recent(), "stats": profiler.stats()}
+
+
+@app.get("/profiles/{profile_id}")
+def get_profile(profile_id: str) -> Response:
+    """One profile as speedscope JSON (open it at https://www.speedscope.app)."""
+    path = _require_profiler().path_for(profile_id)
+    if path is None or not path.is_file():
+        raise HTTPException(status_code=404, detail="Unknown or expired profile")
+    return Response(content=path.read_bytes(), media_type="application/json")
+
+
+@app.get("/models/router")
+def model_router() -> Dict[str, Any]:
+    """Per-model health as seen by the candidate router: breaker state,
+    success rate, rate-limit count and latency percentiles; plus hedge
+    counters when HEDGE_ENABLED."""
+    if _ROUTER is None:
+        raise HTTPException(status_code=404, detail="Model router is disabled (ROUTER_ENABLED=0)")
+    return {"ok": True, "router": _ROUTER.stats(), "hedging": _HEDGER.stats() if _HEDGER is not None else None}
+
+
+async def _embed_many(texts: List[str], task: str) -> Tuple[List[List[float]], int]:
+    """Embed cleaned texts, serving cache hits locally and deduplicating repeats.
+
+    Texts already being embedded for a concurrent request are awaited rather
+    than sent again. Returns the vectors in input order and the number of
+    texts not served from the cache.
+    """
+    if not LANGEXTRACT_API_KEY:
+        raise HTTPException(status_code=500, detail="LANGEXTRACT_API_KEY not set in .env")
+    if not _HAS_GENAI:
+        raise HTTPException(status_code=500, detail="google-genai package not installed")
+
+    unique_texts = list(dict.fromkeys(texts))
+    keys = {text: _embed_cache_key(text, task) for text in unique_texts}
+    cached = _embed_cache_get_many(list(keys.values()))
+    vectors: Dict[str, List[float]] = {
+        text: _unpack_vector(cached[key]) for text, key in keys.items() if key in cached
     }
+    misses = [text for text in unique_texts if text not in vectors]
+    _METRICS.observe("input_size", len(texts), kind="embed_texts")
+    _METRICS.inc("cache_requests_total", len(vectors), cache="embed", result="hit")
+    _METRICS.inc("cache_requests_total", len(misses), cache="embed", result="miss")
+
+    # Texts a concurrent request is already embedding are awaited, not re-sent.
+    shared: Dict[str, Any] = {}
+    if _EMBED_FLIGHTS is not None:
+        for text in misses:
+            future = _EMBED_FLIGHTS.join(keys[text])
+            if future is not None:
+                shared[text] = future
+    owned = [text for text in misses if text not in shared]
+
+    if owned:
+        flights = {text: _EMBED_FLIGHTS.lead(keys[text]) for text in owned} if _EMBED_FLIGHTS is not None else {}
+        client = _PROVIDERS.genai
+        gate = asyncio.Semaphore(max(1, EMBED_MAX_IN_FLIGHT))
+        batches = [owned[i: i + _EMBED_BATCH] for i in range(0, len(owned), _EMBED_BATCH)]
+        fresh: List[Tuple[str, bytes]] = []
+        failures: List[str] = []
+        try:
+            results = await asyncio.gather(
+                *(_embed_batch(client, batch, task, gate) for batch in batches),
+                return_exceptions=True,
+            )
+            for batch, result in zip(batches, results):
+                if isinstance(result, BaseException):
+                    failures.append(str(result))
+                    for text in batch:
+                        if text in flights:
+                            flights[text].set_exception(RuntimeError(str(result)))
+                    continue
+                for text, values in zip(batch, result):
+                    # Round-trip through float32 so fresh and cached vectors match exactly.
+                    blob = _pack_vector(values)
+                    vectors[text] = _unpack_vector(blob)
+                    fresh.append((keys[text], blob))
+                    if text in flights:
+                        flights[text].set_result(vectors[text])
+        finally:
+            for future in flights.values():
+                if not future.done():
+                    future.cancel()
+
+        # Keep whatever succeeded so a retry of this request only resends the failures.
+        _embed_cache_put_many(fresh)
+        shed = next((r for r in results if isinstance(r, Overloaded)), None)
+        if shed is not None:
+            raise _shed(shed)
+        if failures:
+            raise HTTPException(
+                status_code=502,
+                detail=f"Embedding failed for {len(failures)} of {len(batches)} batches: {failures[0]}",
+            )
+
+    if shared:
+        results = await asyncio.gather(*(asyncio.shield(f) for f in shared.values()), return_exceptions=True)
+        shared_failures = [str(r) or "cancelled" for r in results if isinstance(r, BaseException)]
+        if shared_failures:
+            raise HTTPException(
+                status_code=502,
+                detail=f"Embedding failed for {len(shared_failures)} texts shared with a concurrent request: "
+                f"{shared_failures[0]}",
+            )
+        vectors.update(zip(shared, results))
 
+    return [vectors[text] for text in texts], len(misses)
 
-@app.post("/embed")
-async def embed_texts(payload: EmbedRequest) -> Dict[str, Any]:
+
+@app.post("/embed", response_model=None)
+async def embed_texts(payload: EmbedRequest, request: Request) -> Any:
     """Embed a list of texts using gemini-embedding-001 (768-dim Matryoshka).
     task_type: RETRIEVAL_DOCUMENT (for chunks) or RETRIEVAL_QUERY (for queries).
+    Cached texts are served locally; duplicates within a request are embedded once.
+
+    encoding: "json" (default) returns nested float lists. "base64-f32" /
+    "base64-f16" return one little-endian base64 blob in ``embeddingsB64``.
+    "binary-f32" / "binary-f16", or ``Accept: application/octet-stream``,
+    return a raw codec block (16-byte header + vectors) with metadata in
+    X-Embed-* headers.
     """
     if not LANGEXTRACT_API_KEY:
         raise HTTPException(status_code=500, detail="LANGEXTRACT_API_KEY not set in .env")
     if not _HAS_GENAI:
         raise HTTPException(status_code=500, detail="google-genai package not installed")
 
+    encoding = payload.encoding if payload.encoding in _EMBED_ENCODINGS else "json"
+    if encoding == "json" and "application/octet-stream" in request.headers.get("accept", ""):
+        encoding = "binary-f32"
+
     clean_texts = [str(t).strip() for t in (payload.texts or []) if str(t).strip()]
     if not clean_texts:
         raise HTTPException(status_code=400, detail="No texts provided")
 
-    task = payload.task_type if payload.task_type in (
-        "RETRIEVAL_DOCUMENT", "RETRIEVAL_QUERY", "SEMANTIC_SIMILARITY", "CLASSIFICATION", "CLUSTERING"
-    ) else "RETRIEVAL_DOCUMENT"
-
-    client = _genai.Client(api_key=LANGEXTRACT_API_KEY)
-    all_embeddings: List[List[float]] = []
-
-    for i in range(0, len(clean_texts), _EMBED_BATCH):
-        batch = clean_texts[i: i + _EMBED_BATCH]
-        result = client.models.embed_content(
-            model=_EMBED_MODEL,
-            contents=batch,
-            config=_genai_types.EmbedContentConfig(
-                task_type=task,
-                output_dimensionality=_EMBED_DIM,
-            ),
+    _admit(request, cost=-(-len(clean_texts) // _EMBED_BATCH))
+    task = payload.task_type if payload.task_type in _EMBED_TASK_TYPES else "RETRIEVAL_DOCUMENT"
+    all_embeddings, upstream = await _embed_many(clean_texts, task)
+    cache_hits = len(set(clean_texts)) - upstream
+
+    if encoding.startswith("binary-"):
+        return Response(
+            content=codec.pack_block(all_embeddings, _EMBED_DIM, encoding.split("-", 1)[1]),
+            media_type="application/octet-stream",
+            headers={
+                "X-Embed-Model": _EMBED_MODEL,
+                "X-Embed-Count": str(len(all_embeddings)),
+                "X-Embed-Dimension": str(_EMBED_DIM),
+                "X-Embed-Cache-Hits": str(cache_hits),
+                "X-Embed-Upstream-Texts": str(upstream),
+            },
         )
-        all_embeddings.extend([list(e.values) for e in result.embeddings])
 
-    return {
+    response: Dict[str, Any] = {
         "ok": True,
         "model": _EMBED_MODEL,
         "dimension": _EMBED_DIM,
         "count": len(all_embeddings),
-        "embeddings": all_embeddings,
+        "cacheHits": cache_hits,
+        "upstreamTexts": upstream,
+    }
+    if encoding.startswith("base64-"):
+        dtype = encoding.split("-", 1)[1]
+        response["encoding"] = encoding
+        response["embeddingsB64"] = codec.encode_base64(all_embeddings, dtype)
+    else:
+        response["embeddings"] = all_embeddings
+    return response
+
+
+def _require_vector_index() -> None:
+    if not _HAS_NUMPY:
+        raise HTTPException(status_code=500, detail="numpy is not installed. Run: pip install numpy")
+
+
+def _check_index_name(*names: str) -> None:
+    for name in names:
+        if not valid_name(name):
+            raise HTTPException(status_code=400, detail=f"Invalid index name: {name!r}")
+
+
+@app.post("/indexes/{user}/{bank}/upsert")
+async def index_upsert(request: Request, user: str, bank: str, payload: IndexUpsertRequest) -> Dict[str, Any]:
+    """Insert or replace chunks in a user's bank.
+    Items carry either a precomputed vector or a text to embed server-side.
+    """
+    _require_vector_index()
+    _check_index_name(user, bank)
+    if not payload.items:
+        raise HTTPException(status_code=400, detail="No items provided")
+
+    task = payload.task_type if payload.task_type in _EMBED_TASK_TYPES else "RETRIEVAL_DOCUMENT"
+    to_embed = [
+        str(item.text).strip() for item in payload.items
+        if item.vector is None and str(item.text or "").strip()
+    ]
+    if to_embed:
+        _admit(request, cost=-(-len(to_embed) // _EMBED_BATCH))
+    embedded = iter((await _embed_many(to_embed, task))[0] if to_embed else [])
+
+    ids: List[str] = []
+    vectors: List[List[float]] = []
+    metadata: List[Dict[str, Any]] = []
+    for item in payload.items:
+        meta = dict(item.metadata or {})
+        if item.vector is not None:
+            vector = item.vector
+        elif str(item.text or "").strip():
+            vector = next(embedded)
+        else:
+            raise HTTPException(status_code=400, detail=f"Item {item.id!r} has neither vector nor text")
+        if item.text:
+            meta.setdefault("text", item.text)
+        ids.append(item.id)
+        vectors.append(vector)
+        metadata.append(meta)
+
+    def apply() -> Tuple[Any, int, int]:
+        index = _INDEXES.get_or_create(user, bank, len(vectors[0]))
+        inserted, updated = index.upsert(ids, vectors, metadata)
+        _INDEXES.persist(user, bank)
+        return index, inserted, updated
+
+    try:
+        # Normalizing, copying and saving the matrix is O(n); keep it off the event loop.
+        index, inserted, updated = await asyncio.to_thread(apply)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return {"ok": True, "user": user, "bank": bank, "inserted": inserted, "updated": updated, "count": len(index)}
+
+
+@app.post("/indexes/{user}/{bank}/delete")
+def index_delete(user: str, bank: str, payload: IndexDeleteRequest) -> Dict[str, Any]:
+    """Remove chunks from a bank by id."""
+    _require_vector_index()
+    _check_index_name(user, bank)
+    index = _INDEXES.get(user, bank)
+    if index is None:
+        raise HTTPException(status_code=404, detail=f"No index {user}/{bank}")
+    removed = index.delete(payload.ids)
+    if removed:
+        _INDEXES.persist(user, bank)
+    return {"ok": True, "user": user, "bank": bank, "removed": removed, "count": len(index)}
+
+
+@app.delete("/indexes/{user}/{bank}")
+def index_drop(user: str, bank: str) -> Dict[str, Any]:
+    """Drop a whole bank."""
+    _require_vector_index()
+    _check_index_name(user, bank)
+    if not _INDEXES.drop(user, bank):
+        raise HTTPException(status_code=404, detail=f"No index {user}/{bank}")
+    return {"ok": True, "user": user, "bank": bank}
+
+
+@app.get("/indexes/{user}")
+def index_list(user: str) -> Dict[str, Any]:
+    """List a user's banks with their sizes."""
+    _require_vector_index()
+    _check_index_name(user)
+    return {"ok": True, "user": user, "banks": _INDEXES.banks(user)}
+
+
+@app.post("/indexes/{user}/query")
+async def index_query(request: Request, user: str, payload: IndexQueryRequest) -> Dict[str, Any]:
+    """Batched top-k search across several of a user's banks in one round trip.
+
+    Query texts are embedded together (RETRIEVAL_QUERY); each bank is then
+    searched once with all the queries that target it.
+    """
+    _require_vector_index()
+    _check_index_name(user)
+    if not payload.queries:
+        raise HTTPException(status_code=400, detail="No queries provided")
+
+    texts = [
+        str(q.text).strip() for q in payload.queries
+        if q.vector is None and str(q.text or "").strip()
+    ]
+    if texts:
+        _admit(request, cost=-(-len(texts) // _EMBED_BATCH))
+    embedded = iter((await _embed_many(texts, "RETRIEVAL_QUERY"))[0] if texts else [])
+
+    query_vectors: List[List[float]] = []
+    for position, query in enumerate(payload.queries):
+        if query.vector is not None:
+            query_vectors.append(query.vector)
+        elif str(query.text or "").strip():
+            query_vectors.append(next(embedded))
+        else:
+            raise HTTPException(status_code=400, detail=f"Query {position} has neither vector nor text")
+        _check_index_name(*query.banks)
+
+    results: List[Dict[str, List[Dict[str, Any]]]] = [{} for _ in payload.queries]
+    by_bank: Dict[str, List[int]] = {}
+    for position, query in enumerate(payload.queries):
+        for bank in dict.fromkeys(query.banks):
+            by_bank.setdefault(bank, []).append(position)
+
+    for bank, positions in by_bank.items():
+        index = _INDEXES.get(user, bank)
+        if index is None:
+            for position in positions:
+                results[position][bank] = []
+            continue
+        k = min(max(payload.queries[p].k for p in positions), INDEX_MAX_K)
+        try:
+            hits = index.search([query_vectors[p] for p in positions], k)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f"{bank}: {exc}") from exc
+        for position, bank_hits in zip(positions, hits):
+            results[position][bank] = bank_hits[: max(0, min(payload.queries[position].k, INDEX_MAX_K))]
+
+    return {"ok": True, "user": user, "results": results}
+
+
+def _split_cv_sections(text: str) -> List[Tuple[str, str]]:
+    """Split CV text into (section, text) blocks at recognised section headers.
+
+    Lines before the first header form a "header" block (name, contact).
+    Each header line stays with its block so the model keeps the context.
+    """
+    blocks: List[Tuple[str, List[str]]] = [("header", [])]
+    for raw in preprocess_cv_text(str(text or "")).replace("\r", "\n").split("\n"):
+        section, _ = section_from_line(raw.strip())
+        if section:
+            blocks.append((section, []))
+        blocks[-1][1].append(raw)
+
+    sections = [(name, "\n".join(lines).strip()) for name, lines in blocks]
+    return [(name, body) for name, body in sections if body]
+
+
+def _extract_resume_text(text: str) -> Dict[str, Any]:
+    """Run resume extraction, section-incrementally when the section cache is on."""
+    _METRICS.observe("input_size", len(text), kind="resume_chars")
+    with _METRICS.stage("resume_extract"):
+        if _SECTION_CACHE is not None:
+            with _METRICS.stage("preprocess"):
+                sections = _split_cv_sections(text)
+            return extract_resume.extract_sections_incremental(
+                sections,
+                LANGEXTRACT_API_KEY,
+                _SECTION_CACHE,
+                provider=_EXTRACT_PROVIDER,
+                max_workers=RESUME_SECTION_WORKERS,
+                router=_ROUTER,
+                hedger=_HEDGER,
+                passthrough=(Overloaded,),
+            )
+        return extract_resume.extract_from_text(
+            text,
+            LANGEXTRACT_API_KEY,
+            provider=_EXTRACT_PROVIDER,
+            router=_ROUTER,
+            hedger=_HEDGER,
+            passthrough=(Overloaded,),
+        )
+
+
+async def _extract_resume_shared(text: str) -> Dict[str, Any]:
+    """_extract_resume_text off the event loop, shared by concurrent identical resumes."""
+    if _RESUME_FLIGHTS is None:
+        return await asyncio.to_thread(_extract_resume_text, text)
+    return await _RESUME_FLIGHTS.do(
+        content_key("resume", text_fingerprint(text)),
+        lambda: asyncio.to_thread(_extract_resume_text, text),
+    )
+
+
+def _resume_response(
+    filename: str, text: str, result: Dict[str, Any], pdf_info: Dict[str, Any]
+) -> Dict[str, Any]:
+    return {
+        "ok": result["ok"],
+        "filename": filename,
+        "charCount": len(text),
+        "model": result.get("model"),
+        "error": result.get("error"),
+        "rawCount": result.get("raw_count", 0),
+        "grouped": result.get("grouped", {}),
+        "textPreview": text[:800].strip(),
+        "pages": pdf_info.get("pages"),
+        "pagesTruncated": bool(pdf_info.get("truncated")),
+        "sections": result.get("sections"),
+        "chunks": result.get("chunks"),
+        "chunksTruncated": bool(result.get("truncated")),
+        "droppedChunks": result.get("dropped_chunks", 0),
     }
 
 
 @app.post("/extract-resume-pdf")
-async def extract_resume_pdf(file: UploadFile = File(...)) -> Dict[str, Any]:
+async def extract_resume_pdf(request: Request, file: UploadFile = File(...)) -> Dict[str, Any]:
     """Accept a PDF upload and return structured grouped JSON extraction."""
     if not LANGEXTRACT_API_KEY:
         raise HTTPException(
             status_code=500,
             detail="LANGEXTRACT_API_KEY is not set in backend/.env",
         )
+    _admit(request)
 
     filename = file.filename or ""
     if not filename.lower().endswith(".pdf"):
@@ -772,51 +1457,497 @@ async def extract_resume_pdf(file: UploadFile = File(...)) -> Dict[str, Any]:
     if not pdf_bytes:
         raise HTTPException(status_code=400, detail="Uploaded file is empty.")
 
-    text = _extract_pdf_text(pdf_bytes)
+    try:
+        return await _resume_pdf_response(filename, pdf_bytes)
+    except Overloaded as exc:
+        raise _shed(exc) from exc
+
+
+async def _resume_pdf_response(filename: str, pdf_bytes: bytes) -> Dict[str, Any]:
+    """PDF bytes -> text -> resume extraction, as returned by /extract-resume-pdf."""
+    if _RESUME_FLIGHTS is not None:
+        # The same upload in flight elsewhere: share its text extraction too.
+        text, pdf_info = await _RESUME_FLIGHTS.do(
+            content_key("pdf-text", hashlib.sha256(pdf_bytes).hexdigest()), lambda: _extract_pdf_text(pdf_bytes)
+        )
+    else:
+        text, pdf_info = await _extract_pdf_text(pdf_bytes)
     if len(text.strip()) < 50:
         raise HTTPException(
             status_code=422,
             detail="Could not extract readable text from the PDF. Ensure it is a text-based (not scanned) PDF.",
         )
 
-    result = extract_resume.extract_from_text(text, LANGEXTRACT_API_KEY)
+    result = await _extract_resume_shared(text)
+    return _resume_response(filename, text, result, pdf_info)
+
+
+@app.post("/extract-resume-pdf/facts")
+async def extract_resume_pdf_facts(file: UploadFile = File(...)) -> Dict[str, Any]:
+    """Heuristic fact bullets from a PDF resume, without a model call.
+
+    Pages are fed to the streaming CV parser as the PDF pool finishes them,
+    so parsing overlaps extraction and the full text is never assembled.
+    """
+    if not _HAS_PYPDF:
+        raise HTTPException(status_code=500, detail="pypdf is not installed. Run: pip install pypdf")
+
+    filename = file.filename or ""
+    if not filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
+
+    pdf_bytes = await file.read()
+    if not pdf_bytes:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+
+    parser = FactParser()
+    facts: List[str] = []
+    pdf_info: Dict[str, Any] = {}
+    separator = ""
+    _METRICS.observe("input_size", len(pdf_bytes), kind="pdf_bytes")
+    try:
+        # Parsing is interleaved with page extraction, so one stage covers both.
+        with _METRICS.stage("pdf_facts"):
+            async for page in _PDF_POOL.iter_pages(pdf_bytes, pdf_info):
+                facts.extend(parser.feed(separator + page.strip()))
+                separator = "\n"
+    except Exception as exc:
+        _METRICS.inc("errors_total", stage="pdf_parse")
+        raise HTTPException(status_code=422, detail=f"Failed to read PDF: {exc}") from exc
+    facts.extend(parser.close())
+
     return {
-        "ok": result["ok"],
+        "ok": True,
         "filename": filename,
-        "charCount": len(text),
-        "model": result.get("model"),
-        "error": result.get("error"),
-        "rawCount": result.get("raw_count", 0),
-        "grouped": result.get("grouped", {}),
-        "textPreview": text[:800].strip(),
+        "facts": facts,
+        "stats": parser.stats(),
+        "pages": pdf_info.get("pages"),
+        "pagesTruncated": bool(pdf_info.get("truncated")),
     }
 
 
+def _count_batch_files(uploads: List[Tuple[str, Optional[bytes]]]) -> int:
+    """Resumes in a batch, counting each PDF inside a zip, from the zip
+    directories alone (nothing is decompressed)."""
+    count = 0
+    for name, data in uploads:
+        if not name.lower().endswith(".zip") or not data:
+            count += 1
+            continue
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                count += max(1, sum(
+                    1 for info in archive.infolist()
+                    if not info.is_dir() and info.filename.lower().endswith(".pdf")
+                ))
+        except zipfile.BadZipFile:
+            count += 1
+    return count
+
+
+def _expand_batch_uploads(
+    uploads: List[Tuple[str, Optional[bytes]]],
+) -> List[Tuple[str, Optional[bytes], Optional[str]]]:
+    """Flatten PDFs and zip archives into (name, pdf bytes, error) entries.
+
+    Uploads already rejected for size come in with data None. Zip members are
+    only decompressed while the batch stays under BATCH_MAX_TOTAL_MB.
+    """
+    max_bytes = BATCH_MAX_FILE_MB * 1024 * 1024
+    budget = BATCH_MAX_TOTAL_MB * 1024 * 1024
+    entries: List[Tuple[str, Optional[bytes], Optional[str]]] = []
+
+    def add(name: str, data: Optional[bytes], error: Optional[str] = None) -> None:
+        if data is not None and len(data) > max_bytes:
+            data, error = None, f"File exceeds {BATCH_MAX_FILE_MB} MB"
+        elif data is not None and not data:
+            data, error = None, "File is empty"
+        entries.append((name, data, error))
+
+    for name, data in uploads:
+        lowered = name.lower()
+        if data is None:
+            add(name, None, f"File exceeds {BATCH_MAX_FILE_MB} MB")
+        elif lowered.endswith(".pdf"):
+            add(name, data)
+        elif lowered.endswith(".zip"):
+            try:
+                with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                    for info in archive.infolist():
+                        if info.is_dir() or not info.filename.lower().endswith(".pdf"):
+                            continue
+                        member = f"{name}/{info.filename}"
+                        if info.file_size > max_bytes:
+                            add(member, None, f"File exceeds {BATCH_MAX_FILE_MB} MB")
+                        elif info.file_size > budget:
+                            add(member, None, f"Batch exceeds {BATCH_MAX_TOTAL_MB} MB uncompressed")
+                        else:
+                            budget -= info.file_size
+                            add(member, archive.read(info))
+            except zipfile.BadZipFile as exc:
+                add(name, None, f"Invalid zip archive: {exc}")
+        else:
+            add(name, None, "Only PDF files or zip archives of PDFs are accepted.")
+
+    return entries
+
+
+@app.post("/extract-resume-pdf/batch")
+async def extract_resume_pdf_batch(request: Request, files: List[UploadFile] = File(...)) -> StreamingResponse:
+    """Ingest many resumes at once (PDFs and/or zip archives of PDFs).
+
+    PDF parsing runs at most PDF_WORKERS files at a time on the PDF process
+    pool and LLM extraction at most BATCH_EXTRACT_CONCURRENCY. The file count
+    and total size are checked before any upload is read, and each PDF inside
+    a zip counts as one file for the limits and the rate limit. Results stream
+    back as NDJSON: one ``file`` event per resume as it completes (same fields
+    as /extract-resume-pdf plus ``status`` and ``elapsedMs``; a file that
+    fails, for whatever reason, comes back with ``status: "error"`` and the
+    batch goes on), then a ``done`` event with totals and throughput.
+    """
+    if not LANGEXTRACT_API_KEY:
+        raise HTTPException(
+            status_code=500,
+            detail="LANGEXTRACT_API_KEY is not set in backend/.env",
+        )
+    if not _HAS_PYPDF:
+        raise HTTPException(status_code=500, detail="pypdf is not installed. Run: pip install pypdf")
+    if len(files) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_FILES} files")
+    # Uploads are already spooled to disk by the form parser; only size them here.
+    if sum(f.size or 0 for f in files) > BATCH_MAX_TOTAL_MB * 1024 * 1024:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_TOTAL_MB} MB")
+
+    max_bytes = BATCH_MAX_FILE_MB * 1024 * 1024
+    uploads: List[Tuple[str, Optional[bytes]]] = []
+    total = 0
+    for i, f in enumerate(files):
+        name = f.filename or f"upload-{i}"
+        # A PDF over the per-file limit is reported without being read.
+        if name.lower().endswith(".pdf") and (f.size or 0) > max_bytes:
+            uploads.append((name, None))
+            continue
+        data = await f.read()
+        total += len(data)
+        if total > BATCH_MAX_TOTAL_MB * 1024 * 1024:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_TOTAL_MB} MB")
+        uploads.append((name, data))
+
+    count = _count_batch_files(uploads)
+    if not count:
+        raise HTTPException(status_code=400, detail="No files provided")
+    if count > BATCH_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_FILES} files")
+    _admit(request, cost=count)
+    entries = _expand_batch_uploads(uploads)
+    if not entries:
+        raise HTTPException(status_code=400, detail="No files provided")
+
+    gate = asyncio.Semaphore(max(1, BATCH_EXTRACT_CONCURRENCY))
+    # At most one file per PDF worker in the pool, so queued files do not
+    # use up their parse timeout waiting behind the rest of the batch.
+    parse_gate = asyncio.Semaphore(max(1, PDF_WORKERS))
+
+    async def process(name: str, data: Optional[bytes], error: Optional[str]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        failed: Dict[str, Any] = {"ok": False, "filename": name, "status": "error", "error": error}
+        if data is not None:
+            try:
+                _METRICS.observe("input_size", len(data), kind="pdf_bytes")
+                async with parse_gate:
+                    with _METRICS.stage("pdf_parse"):
+                        text, pdf_info = await _PDF_POOL.extract(data)
+            except Exception as exc:  # noqa: BLE001
+                _METRICS.inc("errors_total", stage="pdf_parse")
+                failed["error"] = f"Failed to read PDF: {exc}"
+            else:
+                if len(text.strip()) < 50:
+                    failed["error"] = "Could not extract readable text from the PDF."
+                else:
+                    try:
+                        async with gate:
+                            result = await _extract_resume_shared(text)
+                    except Exception as exc:  # noqa: BLE001
+                        # Shed by the provider gate, or an unexpected failure: this file only.
+                        _METRICS.inc("errors_total", stage="batch_extract")
+                        failed["error"] = f"Extraction failed: {exc}"
+                    else:
+                        response = _resume_response(name, text, result, pdf_info)
+                        response["status"] = "ok" if result["ok"] else "error"
+                        failed = response
+        failed["elapsedMs"] = round((time.perf_counter() - started) * 1000)
+        return failed
+
+    async def events() -> Any:
+        started = time.perf_counter()
+        tasks = [asyncio.ensure_future(process(*entry)) for entry in entries]
+        succeeded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                succeeded += 1 if item.get("status") == "ok" else 0
+                yield json.dumps({"event": "file", **item}, separators=(",", ":")) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+        elapsed = time.perf_counter() - started
+        yield json.dumps({
+            "event": "done",
+            "files": len(entries),
+            "succeeded": succeeded,
+            "failed": len(entries) - succeeded,
+            "elapsedSeconds": round(elapsed, 3),
+            "filesPerMinute": round(len(entries) / elapsed * 60, 2) if elapsed > 0 else None,
+        }, separators=(",", ":")) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"})
+
+
+# (stats key, request/response field, extraction lane)
+_LANES: Tuple[Tuple[str, str, str], ...] = (
+    ("fact", "factText", "facts"),
+    ("voice", "voiceText", "voice"),
+    ("company", "companyText", "company"),
+)
+
+
+def _structured_payload(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    structured: Dict[str, Any] = {field: results[key]["text"] for key, field, _ in _LANES}
+    structured["stats"] = {key: results[key]["stats"] for key, _, _ in _LANES}
+    return structured
+
+
+def _stream_event(event: Dict[str, Any], sse: bool) -> str:
+    data = json.dumps(event, separators=(",", ":"))
+    if sse:
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
 @app.post("/extract-structured-lanes")
-def extract_structured_lanes(payload: StructuredLaneRequest) -> Dict[str, Any]:
+async def extract_structured_lanes(payload: StructuredLaneRequest, request: Request) -> Dict[str, Any]:
     """Extract structured bullets for fact / voice / company lanes.
-    API key is read from .env — the apiKey field in the request body is ignored.
+    API key is read from .env — the apiKey field in the request body only
+    identifies the caller for rate limiting.
+    The three lanes run concurrently, each with its own timeout.
     """
     if not LANGEXTRACT_API_KEY:
         raise HTTPException(
             status_code=500,
             detail="LANGEXTRACT_API_KEY is not set in backend/.env",
         )
+    _admit(request, cost=_lane_cost(payload), api_key=payload.apiKey)
+
+    try:
+        return await _structured_lanes_response(payload)
+    except Overloaded as exc:
+        raise _shed(exc) from exc
+
 
-    fact = _lane_response(payload.factText, "facts")
-    voice = _lane_response(payload.voiceText, "voice")
-    company = _lane_response(payload.companyText, "company")
+def _lane_cost(payload: StructuredLaneRequest) -> int:
+    return max(1, sum(1 for _, field, _ in _LANES if str(getattr(payload, field) or "").strip()))
+
+
+async def _structured_lanes_response(payload: StructuredLaneRequest) -> Dict[str, Any]:
+    responses = await asyncio.gather(
+        *(_run_lane(getattr(payload, field), lane) for _, field, lane in _LANES)
+    )
+    results = {key: response for (key, _, _), response in zip(_LANES, responses)}
 
     return {
         "ok": True,
-        "structured": {
-            "factText": fact["text"],
-            "voiceText": voice["text"],
-            "companyText": company["text"],
-            "stats": {
-                "fact": fact["stats"],
-                "voice": voice["stats"],
-                "company": company["stats"],
-            },
-        },
+        "structured": _structured_payload(results),
     }
+
+
+@app.post("/extract-structured-lanes/stream")
+async def extract_structured_lanes_stream(payload: StructuredLaneRequest, request: Request) -> StreamingResponse:
+    """Streaming variant of /extract-structured-lanes.
+
+    Emits one ``lane`` event per lane as soon as it finishes (with the same
+    text/stats as the batch endpoint), then a ``done`` event carrying the full
+    ``structured`` object. Newline-delimited JSON by default; server-sent
+    events when the client sends ``Accept: text/event-stream`` or ``?format=sse``.
+    If the provider gate sheds a lane once the stream has started, an
+    ``error`` event with ``status`` 429 and ``retryAfter`` ends it instead.
+    """
+    if not LANGEXTRACT_API_KEY:
+        raise HTTPException(
+            status_code=500,
+            detail="LANGEXTRACT_API_KEY is not set in backend/.env",
+        )
+    _admit(request, cost=_lane_cost(payload), api_key=payload.apiKey)
+
+    sse = (
+        request.query_params.get("format") == "sse"
+        or "text/event-stream" in request.headers.get("accept", "")
+    )
+
+    async def events() -> Any:
+        pending = {
+            asyncio.ensure_future(_run_lane(getattr(payload, field), lane)): (key, field)
+            for key, field, lane in _LANES
+        }
+        results: Dict[str, Dict[str, Any]] = {}
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    key, field = pending.pop(task)
+                    try:
+                        results[key] = task.result()
+                    except Overloaded as exc:
+                        yield _stream_event({
+                            "event": "error",
+                            "status": 429,
+                            "detail": str(exc),
+                            "retryAfter": int(retry_after_header(exc.retry_after)),
+                        }, sse)
+                        return
+                    yield _stream_event({
+                        "event": "lane",
+                        "lane": key,
+                        "field": field,
+                        "text": results[key]["text"],
+                        "stats": results[key]["stats"],
+                    }, sse)
+            yield _stream_event({"event": "done", "ok": True, "structured": _structured_payload(results)}, sse)
+        finally:
+            # Client went away: stop waiting on lanes nobody will read.
+            for task in pending:
+                task.cancel()
+
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return StreamingResponse(
+        events(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ---------------------------------------------------------------------------
+# Background jobs — submit, then poll GET /jobs/{id} or stream its events
+# ---------------------------------------------------------------------------
+def _job_priority(priority: str) -> int:
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"priority must be one of: {', '.join(PRIORITIES)}")
+    return PRIORITIES[priority]
+
+
+async def _submit_job(job_id: str, kind: str, factory: Any, priority: str) -> Dict[str, Any]:
+    try:
+        record, attached = await _JOBS.submit(job_id, kind, factory, _job_priority(priority))
+    except QueueFullError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    return {"ok": True, "jobId": record["id"], "status": record["status"], "attached": attached}
+
+
+async def _lanes_job(payload: StructuredLaneRequest) -> Dict[str, Any]:
+    response = await _structured_lanes_response(payload)
+    stats = response["structured"]["stats"]
+    failed = [
+        key for key, _, _ in _LANES
+        if stats[key]["timedOut"] or (stats[key]["error"] and not stats[key]["fromModel"])
+    ]
+    if failed:
+        raise JobFailed(f"Lanes did not complete: {', '.join(failed)}", response)
+    return response
+
+
+async def _resume_pdf_job(filename: str, pdf_bytes: bytes) -> Dict[str, Any]:
+    response = await _resume_pdf_response(filename, pdf_bytes)
+    if not response["ok"]:
+        raise JobFailed(response.get("error") or "Extraction failed", response)
+    return response
+
+
+@app.post("/jobs/extract-structured-lanes", status_code=202)
+async def submit_structured_lanes_job(
+    payload: StructuredLaneRequest, request: Request, priority: str = Query("normal")
+) -> Dict[str, Any]:
+    """Queue /extract-structured-lanes as a background job and return its id.
+
+    Resubmitting the same lane texts attaches to the job already queued,
+    running or done. Rate limits apply as for the direct endpoint, but a
+    busy provider does not turn the job away: it waits in the job queue.
+    """
+    if not LANGEXTRACT_API_KEY:
+        raise HTTPException(
+            status_code=500,
+            detail="LANGEXTRACT_API_KEY is not set in backend/.env",
+        )
+    _admit(request, cost=_lane_cost(payload), api_key=payload.apiKey, shed_when_busy=False)
+
+    job_id = content_key(
+        "job", "lanes", *(text_fingerprint(getattr(payload, field)) for _, field, _ in _LANES)
+    )[:32]
+    return await _submit_job(job_id, "extract-structured-lanes", lambda: _lanes_job(payload), priority)
+
+
+@app.post("/jobs/extract-resume-pdf", status_code=202)
+async def submit_resume_pdf_job(
+    request: Request, file: UploadFile = File(...), priority: str = Query("normal")
+) -> Dict[str, Any]:
+    """Queue /extract-resume-pdf as a background job and return its id.
+
+    The job id is derived from the PDF bytes, so re-uploading the same file
+    attaches to the existing job.
+    """
+    if not LANGEXTRACT_API_KEY:
+        raise HTTPException(
+            status_code=500,
+            detail="LANGEXTRACT_API_KEY is not set in backend/.env",
+        )
+    _admit(request, shed_when_busy=False)
+
+    filename = file.filename or ""
+    if not filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are accepted.")
+
+    pdf_bytes = await file.read()
+    if not pdf_bytes:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+
+    job_id = content_key("job", "resume-pdf", hashlib.sha256(pdf_bytes).hexdigest())[:32]
+    return await _submit_job(job_id, "extract-resume-pdf", lambda: _resume_pdf_job(filename, pdf_bytes), priority)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> Dict[str, Any]:
+    """Job record: status (queued | running | done | failed), timestamps, and
+    the endpoint's usual response in ``result`` once done. A job whose
+    extraction errored or timed out is failed, with the partial response in
+    ``result``, and runs again when resubmitted."""
+    record = await _JOBS.get(job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return record
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request) -> StreamingResponse:
+    """Follow a job: one ``status`` event per state change, the last one
+    carrying the result. NDJSON by default, SSE with ``Accept:
+    text/event-stream`` or ``?format=sse``; idle connections get a
+    ``heartbeat`` event every 15 seconds."""
+    if await _JOBS.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+
+    sse = (
+        request.query_params.get("format") == "sse"
+        or "text/event-stream" in request.headers.get("accept", "")
+    )
+
+    async def events() -> Any:
+        async for record in _JOBS.watch(job_id):
+            if record is None:
+                yield _stream_event({"event": "heartbeat"}, sse)
+            else:
+                yield _stream_event({"event": "status", **record}, sse)
+
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return StreamingResponse(
+        events(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
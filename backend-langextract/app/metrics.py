@@ -0,0 +1,212 @@
+"""
+metrics.py — In-process counters and histograms in Prometheus text format.
+
+Metrics holds labelled counters and histograms, rendered for a /metrics
+scrape in the Prometheus exposition format (no client library needed).
+stage() times a block into the shared ``stage_seconds`` histogram and also
+into the current request's timing record, which ServerTimingMiddleware turns
+into a ``Server-Timing`` response header so the extension's network panel
+shows where a request spent its time.
+
+The timing record travels in a ContextVar: work handed to executor threads
+must run inside contextvars.copy_context() (asyncio.to_thread already does)
+for its stages to show up in the header; the histograms see it regardless.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds: 5ms .. 2min, covering PDF parsing through multi-model extraction.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0,
+)
+# Characters / bytes / items: powers of four from 64 to 16M.
+SIZE_BUCKETS: Tuple[float, ...] = tuple(float(4 ** n) for n in range(3, 13))
+COUNT_BUCKETS: Tuple[float, ...] = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+_timings: "contextvars.ContextVar[Optional[Dict[str, List[float]]]]" = contextvars.ContextVar(
+    "server_timings", default=None
+)
+
+
+def _label_key(labels: Dict[str, Any]) -> _LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: _LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        name + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+
+class Metrics:
+    """Thread-safe registry of labelled counters and histograms."""
+
+    def __init__(self, namespace: str = "") -> None:
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._kinds: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._counters: Dict[str, Dict[_LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[_LabelKey, _Histogram]] = {}
+        # Context managers entered around every stage, e.g. the request profiler's.
+        self.stage_hooks: List[Callable[[str], ContextManager[None]]] = []
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._kinds[name] = "counter"
+        self._help[name] = help_text
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self._kinds[name] = "histogram"
+        self._help[name] = help_text
+        self._buckets[name] = tuple(buckets)
+        self._histograms.setdefault(name, {})
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self._buckets[name])
+            histogram.observe(value)
+
+    @contextlib.contextmanager
+    def stage(self, stage: str, **labels: Any) -> Iterator[None]:
+        """Time the block into stage_seconds{stage=...} and the Server-Timing header."""
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            with contextlib.ExitStack() as hooks:
+                for hook in self.stage_hooks:
+                    hooks.enter_context(hook(stage))
+                yield
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe("stage_seconds", elapsed, stage=stage, outcome=outcome, **labels)
+            record_timing(stage, elapsed)
+
+    def render(self) -> str:
+        prefix = f"{self.namespace}_" if self.namespace else ""
+        lines: List[str] = []
+        with self._lock:
+            for name, kind in self._kinds.items():
+                full = prefix + name
+                lines.append(f"# HELP {full} {self._help[name]}")
+                lines.append(f"# TYPE {full} {kind}")
+                if kind == "counter":
+                    for key, value in sorted(self._counters[name].items()):
+                        lines.append(f"{full}{_format_labels(key)} {_format_value(value)}")
+                    continue
+                for key, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (math.inf,), histogram.counts):
+                        cumulative += count
+                        le = (("le", _format_value(bound)),)
+                        lines.append(f"{full}_bucket{_format_labels(key, le)} {cumulative}")
+                    lines.append(f"{full}_sum{_format_labels(key)} {_format_value(histogram.total)}")
+                    lines.append(f"{full}_count{_format_labels(key)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def record_timing(stage: str, seconds: float) -> None:
+    """Add seconds to the current request's Server-Timing entry for stage."""
+    timings = _timings.get()
+    if timings is not None:
+        timings.setdefault(stage, []).append(seconds)
+
+
+def server_timing_header(timings: Dict[str, List[float]]) -> str:
+    """Server-Timing value: total duration per stage, with a count when repeated.
+
+    Stages that ran in parallel (chunks, lanes, batches) are summed, so
+    their total can exceed the request's wall time.
+    """
+    entries = []
+    for stage, durations in timings.items():
+        entry = f"{stage};dur={sum(durations) * 1000:.1f}"
+        if len(durations) > 1:
+            entry += f';desc="{len(durations)}x"'
+        entries.append(entry)
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware: per-request timing record, Server-Timing header and
+    an http_request_seconds observation labelled by route template."""
+
+    def __init__(self, app: Any, metrics: Metrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, List[float]] = {}
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                timings.setdefault("total", []).append(time.perf_counter() - started)
+                header = server_timing_header(timings).encode("latin-1")
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"server-timing", header)])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.metrics.observe(
+                "http_request_seconds",
+                time.perf_counter() - started,
+                method=scope.get("method", ""),
+                route=route,
+                status=status["code"],
+            )
@@ -0,0 +1,202 @@
+"""
+normalize.py — Precompiled text normalization for the heuristic CV path.
+
+Every pattern the heuristic parser needs is compiled once at import. CV text
+is split into Line records in a single pass; each record carries the line's
+normalized text, canonical key, token set and date flag, so the parser and
+dedup stages reuse them instead of re-running the same substitutions per
+call. Per-line analysis is memoized, which also makes repeated lines (page
+footers, re-uploads of the same CV) free after the first time.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import FrozenSet, List, NamedTuple, Tuple
+
+MONTH_PATTERN = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?"
+DATE_RANGE_RE = re.compile(
+    rf"({MONTH_PATTERN}\s*\d{{4}}(?:\s*-\s*(?:{MONTH_PATTERN}\s*\d{{4}}|Present))?)",
+    re.IGNORECASE,
+)
+# Matches CV section headers that appear mid-line (not at line start)
+CV_SECTION_RE = re.compile(
+    r"(?<=[^\n])\s+"
+    r"(Technical\s+Projects|Technical\s+Skills|Work\s+Experience|Professional\s+Experience"
+    r"|Education|Experience|Projects|Skills)"
+    r"(?=\s+[A-Za-z0-9])",
+    re.IGNORECASE,
+)
+YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+PHONE_RE = re.compile(r"\+\d{7,}")
+
+_MULTI_WS_RE = re.compile(r"\s{2,}")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+_BULLET_RE = re.compile(r"^[\-\*\xe2\u20ac\xa2]\s+")
+_BULLET_PREFIX_RE = re.compile(r"^[\-\*\xe2\u20ac\xa2\xe2\u2014\x8f\xc2\xb7\?]+\s*")
+_BROKEN_YEAR_RE = re.compile(r"(?<=\w)\.\n(\d{4})")
+_BROKEN_MONTH_RE = re.compile(r"\n(" + MONTH_PATTERN + r"\s*\d{4})", re.IGNORECASE)
+_LINE_SPLIT_RE = re.compile(r"\n+")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+# A line break is only a safe streaming boundary when none of the patterns
+# above could match across it; these catch the cases that could.
+_MONTH_START_RE = re.compile(r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)", re.IGNORECASE)
+_SECTION_TAIL_RE = re.compile(r"(?:Projects|Skills|Experience|Education)\Z", re.IGNORECASE)
+# First three letters of every CV_SECTION_RE alternative.
+_SECTION_HEADS = frozenset(("tec", "wor", "pro", "edu", "exp", "ski"))
+_CUT_LOOKBACK = 8
+
+# PDF text arrives with bullet glyphs mis-decoded; both forms start a new line.
+_BULLET_GLYPHS = ("\xe2\u20ac\xa2", "\xe2\u2014\x8f")
+_BULLET_LINE = "\n\xe2\u20ac\xa2 "
+_BULLET_CHARS = frozenset("-*?\xe2\u20ac\xa2\u2014\x8f\xc2\xb7")
+
+
+class Line(NamedTuple):
+    text: str
+    clean: str
+    is_bullet: bool
+    has_date: bool
+
+    # Key and tokens are only needed for lines that reach dedup; both are memoized.
+    @property
+    def key(self) -> str:
+        return key_tokens(self.clean)[0]
+
+    @property
+    def tokens(self) -> FrozenSet[str]:
+        return key_tokens(self.clean)[1]
+
+
+def normalize_text(text: str) -> str:
+    value = str(text or "")
+    value = value.replace("\u2013", "-").replace("\u2014", "-").replace("\ufffd", " ")
+    # str.split() and \s agree on what counts as whitespace; join/split is the faster collapse.
+    return " ".join(value.split())
+
+
+@lru_cache(maxsize=16384)
+def canonical_key(text: str) -> str:
+    return " ".join(_NON_ALNUM_RE.sub(" ", text.lower()).split())
+
+
+def token_set(key: str) -> FrozenSet[str]:
+    return frozenset(t for t in key.split(" ") if len(t) > 2)
+
+
+@lru_cache(maxsize=16384)
+def key_tokens(text: str) -> Tuple[str, FrozenSet[str]]:
+    """Canonical key and its token set (memoized)."""
+    key = canonical_key(text)
+    return key, token_set(key)
+
+
+def has_date_token(text: str) -> bool:
+    source = str(text or "")
+    return bool(DATE_RANGE_RE.search(source) or YEAR_RE.search(source))
+
+
+def strip_dates_for_key(text: str) -> str:
+    value = DATE_RANGE_RE.sub(" ", str(text or ""))
+    value = YEAR_RE.sub(" ", value)
+    return " ".join(value.split())
+
+
+def shorten(text: str, max_chars: int = 220, normalized: bool = False) -> str:
+    """Trim to max_chars with an ellipsis; pass normalized=True for already-clean text."""
+    value = text if normalized else normalize_text(text)
+    if len(value) <= max_chars:
+        return value
+    return value[: max_chars - 3].rstrip() + "..."
+
+
+def preprocess_cv_text(text: str) -> str:
+    # Inject newlines before section headers embedded mid-line
+    # e.g. "...Control 2. Education University College London..." → split at "Education"
+    result = CV_SECTION_RE.sub(r"\n\1", text)
+    # Merge dates broken across lines: "Oct.\n2025 - Present" → "Oct. 2025 - Present"
+    result = _BROKEN_YEAR_RE.sub(r". \1", result)
+    return _BROKEN_MONTH_RE.sub(r" \1", result)
+
+
+@lru_cache(maxsize=16384)
+def _analyze(text: str) -> Tuple[str, bool]:
+    return normalize_text(text), has_date_token(text)
+
+
+def make_line(text: str, is_bullet: bool = False) -> Line:
+    clean, has_date = _analyze(text)
+    return Line(text, clean, is_bullet, has_date)
+
+
+def to_lines(text: str) -> List[Line]:
+    """Split raw CV text into Line records (bullet markers stripped, flags set)."""
+    source = str(text or "").replace("\r", "\n")
+    for glyph in _BULLET_GLYPHS:
+        source = source.replace(glyph, _BULLET_LINE)
+    source = _MULTI_WS_RE.sub(" ", source)
+    rows: List[Line] = []
+
+    for raw in source.split("\n"):
+        stripped = raw.strip()
+        if not stripped:
+            continue
+        if stripped[0] in _BULLET_CHARS:
+            is_bullet = _BULLET_RE.match(stripped) is not None
+            stripped = _BULLET_PREFIX_RE.sub("", stripped).strip()
+            if not stripped:
+                continue
+        else:
+            is_bullet = False
+        rows.append(make_line(stripped, is_bullet))
+
+    return rows
+
+
+def split_lines(text: str) -> List[str]:
+    return [line.strip() for line in _LINE_SPLIT_RE.split(text) if line.strip()]
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT_RE.split(text) if s.strip()]
+
+
+def _is_safe_cut(text: str, pos: int) -> bool:
+    """True when text[:pos] and text[pos + 1:] normalize the same apart as together."""
+    before, after = text[pos - 1], text[pos + 1:pos + 4]
+    if len(after) < 3 or before.isspace() or before in _BULLET_CHARS:
+        return False
+    if after[0].isspace() or after[0].isdigit() or after[0] in _BULLET_CHARS:
+        return False
+    if _MONTH_START_RE.match(after) or after.lower() in _SECTION_HEADS:
+        return False
+    return _SECTION_TAIL_RE.search(text, max(0, pos - 12), pos) is None
+
+
+class LineStream:
+    """Incremental to_lines(preprocess_cv_text(text)) for text arriving in pieces.
+
+    Text is buffered up to the latest line break that no pattern can match
+    across; everything before it is emitted, so the concatenation of all
+    feed()/close() results equals the one-shot result on the joined text.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[Line]:
+        self._buffer += str(text or "")
+        pos = self._buffer.rfind("\n")
+        for _ in range(_CUT_LOOKBACK):
+            if pos <= 0:
+                return []
+            if _is_safe_cut(self._buffer, pos):
+                head, self._buffer = self._buffer[:pos], self._buffer[pos + 1:]
+                return to_lines(preprocess_cv_text(head))
+            pos = self._buffer.rfind("\n", 0, pos)
+        return []
+
+    def close(self) -> List[Line]:
+        head, self._buffer = self._buffer, ""
+        return to_lines(preprocess_cv_text(head)) if head else []
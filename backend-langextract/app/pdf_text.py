@@ -0,0 +1,240 @@
+"""
+pdf_text.py — PDF text extraction that can run in worker processes.
+
+Kept free of FastAPI and app state so ProcessPoolExecutor workers can import
+it cheaply; callers translate exceptions into HTTP errors.
+
+PdfTextPool runs pypdf off the request path: the first task reads the
+page count together with the first pages_per_task pages, then the
+remaining page ranges of large documents are spread across workers and
+stitched back in order, or handed to the caller page by page as each range
+finishes (iter_pages).
+
+At most one task per worker is handed to the process pool at a time; the
+others wait for a free worker, so a task's timeout only counts the time it
+actually runs. A task that waits timeout_seconds for a worker fails with
+PdfTimeoutError and leaves the pool alone. A task that runs for
+timeout_seconds means its worker is stuck, so the pool is recycled and
+later requests are not starved. Tasks of other documents that were running
+on the recycled pool fail with BrokenProcessPool and are retried once on the
+fresh pool. Submitted tasks are never cancelled: a caller that gives up
+stops waiting, and the worker slot frees itself when the task ends.
+
+Every task is sent the whole PDF and parses its cross-reference table and
+page tree again before reading its pages. pypdf cannot load a page range on
+its own, and splitting the file in the parent would cost more than the
+re-parse. This is why a document is split into at most `workers` ranges of
+at least pages_per_task pages.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+try:
+    import pypdf
+    _HAS_PYPDF = True
+except ImportError:
+    pypdf = None  # type: ignore
+    _HAS_PYPDF = False
+
+
+def _reader(pdf_bytes: bytes) -> Any:
+    if not _HAS_PYPDF:
+        raise RuntimeError("pypdf is not installed. Run: pip install pypdf")
+    return pypdf.PdfReader(io.BytesIO(pdf_bytes))
+
+
+def read_pdf_text(pdf_bytes: bytes) -> str:
+    """Extract plain text from PDF bytes, pages joined by blank lines."""
+    reader = _reader(pdf_bytes)
+    pages_text = []
+    for page in reader.pages:
+        page_text = page.extract_text()
+        if page_text:
+            pages_text.append(page_text)
+    return "\n\n".join(pages_text)
+
+
+def read_pdf_pages(pdf_bytes: bytes, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop); empty pages come back as ""."""
+    reader = _reader(pdf_bytes)
+    return [reader.pages[i].extract_text() or "" for i in range(start, min(stop, len(reader.pages)))]
+
+
+def read_pdf_head(pdf_bytes: bytes, stop: int) -> Tuple[int, List[str]]:
+    """(page count, text of pages [0, stop)) from a single parse."""
+    reader = _reader(pdf_bytes)
+    pages = len(reader.pages)
+    return pages, [reader.pages[i].extract_text() or "" for i in range(min(stop, pages))]
+
+
+class PdfTimeoutError(Exception):
+    """A PDF task waited or ran longer than the pool's timeout."""
+
+
+class PdfTextPool:
+    """Process pool for PDF text extraction with page-level parallelism."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        timeout_seconds: float = 30.0,
+        max_pages: int = 40,
+        pages_per_task: int = 8,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.timeout_seconds = timeout_seconds
+        self.max_pages = max(1, max_pages)
+        self.pages_per_task = max(1, pages_per_task)
+        self.documents = 0
+        self.timeouts = 0
+        self.busy = 0
+        self.recycles = 0
+        self.retries = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # One slot per worker, bound to the event loop that created it.
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: workers import only this module, not the app's threads and clients.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _recycle(self, pool: ProcessPoolExecutor) -> None:
+        """Kill a pool whose workers may be stuck and start fresh on next use.
+
+        Its tasks fail with BrokenProcessPool, which tells other documents
+        on this pool to retry (see _run).
+        """
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+            self.recycles += 1
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False)
+
+    def _ranges(self, start: int, limit: int) -> List[Tuple[int, int]]:
+        # Pages after the first task's are split evenly across workers.
+        span = max(self.pages_per_task, -(-(limit - start) // self.workers))
+        return [(first, min(first + span, limit)) for first in range(start, limit, span)]
+
+    async def _run_once(self, call: Tuple[Any, ...]) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots, self._slots_loop = asyncio.Semaphore(self.workers), loop
+        slots = self._slots
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError as exc:
+            self.busy += 1
+            raise PdfTimeoutError(f"PDF workers stayed busy for {self.timeout_seconds:g}s") from exc
+
+        pool = self._executor()
+        try:
+            future = pool.submit(*call)
+        except (BrokenProcessPool, RuntimeError) as exc:
+            # Recycled between _executor() and submit: fail like its running tasks.
+            slots.release()
+            raise BrokenProcessPool(str(exc)) from exc
+
+        def release(_: Any) -> None:
+            try:
+                loop.call_soon_threadsafe(slots.release)
+            except RuntimeError:
+                pass  # loop already closed at shutdown
+
+        future.add_done_callback(release)
+        result = asyncio.wrap_future(future)
+        # Retrieved here too, so a task finishing after its caller gave up logs nothing.
+        result.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            # shield: timing out or being cancelled stops the wait, never the task.
+            return await asyncio.wait_for(asyncio.shield(result), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError as exc:
+            self.timeouts += 1
+            self._recycle(pool)
+            raise PdfTimeoutError(f"PDF text extraction exceeded {self.timeout_seconds:g}s") from exc
+        except BrokenProcessPool:
+            # A worker died, or another task's timeout recycled the pool under this one.
+            self._recycle(pool)
+            raise
+
+    async def _run(self, call: Tuple[Any, ...]) -> Any:
+        """Run call on a worker, retrying once if the pool broke under it."""
+        try:
+            return await self._run_once(call)
+        except BrokenProcessPool:
+            self.retries += 1
+            return await self._run_once(call)
+
+    async def iter_pages(self, pdf_bytes: bytes, info: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Yield non-empty page texts in order as their page ranges finish.
+
+        The first task returns the page count with the first pages; the
+        remaining ranges are then queued together and run in parallel as
+        workers free up. info, when given, receives pages, pagesRead and
+        truncated once the page count is known.
+        """
+        self.documents += 1
+        pages, head = await self._run((read_pdf_head, pdf_bytes, min(self.pages_per_task, self.max_pages)))
+        limit = min(pages, self.max_pages)
+        if info is not None:
+            info.update({"pages": pages, "pagesRead": limit, "truncated": pages > limit})
+        rest = [
+            asyncio.ensure_future(self._run((read_pdf_pages, pdf_bytes, start, stop)))
+            for start, stop in self._ranges(len(head), limit)
+        ]
+        try:
+            for text in head:
+                if text:
+                    yield text
+            for task in rest:
+                for text in await task:
+                    if text:
+                        yield text
+        finally:
+            # Ranges nobody will read: stop waiting for them (their tasks still finish).
+            for task in rest:
+                task.cancel()
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def extract(self, pdf_bytes: bytes) -> Tuple[str, Dict[str, Any]]:
+        """Return (text, info) where info has pages, pagesRead and truncated."""
+        info: Dict[str, Any] = {}
+        texts = [text async for text in self.iter_pages(pdf_bytes, info)]
+        return "\n\n".join(texts), info
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "timeoutSeconds": self.timeout_seconds,
+            "maxPages": self.max_pages,
+            "pagesPerTask": self.pages_per_task,
+            "documents": self.documents,
+            "timeouts": self.timeouts,
+            "busy": self.busy,
+            "recycles": self.recycles,
+            "retries": self.retries,
+        }
@@ -0,0 +1,346 @@
+"""
+profiling.py — Opt-in wall-clock sampling profiles of individual requests.
+
+A profiled request gets a RequestProfile in a ContextVar, and one sampler
+thread records stacks for every active profile each interval:
+
+- Worker threads are registered with the profile while they run an
+  instrumented stage (Metrics.stage, via stage_hook) and sampled then.
+- The event-loop thread is shared by every request, so it is never
+  registered. It is sampled only while one of this request's tasks is the
+  loop's current task: the task that entered the middleware, or a child
+  task that entered a stage. Loop time outside a named stage is labelled
+  "handler".
+
+Sampling rather than cProfile keeps concurrent profiled requests and work
+spread over executor threads safe (cProfile allows one active profiler per
+process on Python 3.12+), and costs nothing for unprofiled requests.
+
+Finished profiles slower than the threshold (or explicitly requested) are
+written as speedscope JSON (https://www.speedscope.app) to a directory, off
+the event loop; the most recent ones are kept and listed by
+Profiler.recent().
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+_Frame = Tuple[str, str, int]
+_current: "contextvars.ContextVar[Optional[RequestProfile]]" = contextvars.ContextVar(
+    "request_profile", default=None
+)
+
+
+class RequestProfile:
+    """Stack samples for one request, keyed by (stage, frames root -> leaf)."""
+
+    def __init__(self, profile_id: str, method: str, path: str) -> None:
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.started = time.time()
+        self.samples: "Counter[Tuple[str, Tuple[_Frame, ...]]]" = Counter()
+        # worker thread id -> stack of stage names active on that thread for this request
+        self.threads: Dict[int, List[str]] = {}
+        # event loop running the request, its thread, and this request's tasks -> active stages
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread: Optional[int] = None
+        self.tasks: Dict["asyncio.Task[Any]", List[str]] = {}
+        self.lock = threading.Lock()
+
+    def attach(self, loop: asyncio.AbstractEventLoop, task: "asyncio.Task[Any]") -> None:
+        """Sample the loop thread whenever task (the request's own) is running on it."""
+        self.loop = loop
+        self.loop_thread = threading.get_ident()
+        with self.lock:
+            self.tasks.setdefault(task, [])
+
+    def enter(self, stage: str, task: "Optional[asyncio.Task[Any]]" = None) -> None:
+        with self.lock:
+            if task is not None:
+                self.tasks.setdefault(task, []).append(stage)
+            else:
+                self.threads.setdefault(threading.get_ident(), []).append(stage)
+
+    def exit(self, task: "Optional[asyncio.Task[Any]]" = None) -> None:
+        with self.lock:
+            if task is not None:
+                stages = self.tasks.get(task)
+                if stages:
+                    stages.pop()
+                return
+            ident = threading.get_ident()
+            stages = self.threads.get(ident)
+            if stages:
+                stages.pop()
+                if not stages:
+                    del self.threads[ident]
+
+    def add_sample(self, stage: str, stack: Tuple[_Frame, ...]) -> None:
+        with self.lock:
+            self.samples[(stage, stack)] += 1
+
+    def snapshot(self) -> "Counter[Tuple[str, Tuple[_Frame, ...]]]":
+        """Copy of the samples so far; the sampler may still be adding to them."""
+        with self.lock:
+            return Counter(self.samples)
+
+    def sampled_threads(self) -> List[Tuple[int, str]]:
+        """(thread id, stage) pairs to sample now."""
+        with self.lock:
+            threads = [(ident, stages[0]) for ident, stages in self.threads.items()]
+            if self.loop is not None and self.loop_thread is not None:
+                stages = self.tasks.get(asyncio.current_task(self.loop))  # type: ignore[arg-type]
+                if stages is not None:
+                    threads.append((self.loop_thread, stages[0] if stages else "handler"))
+        return threads
+
+
+def _stack(frame: Any) -> Tuple[_Frame, ...]:
+    frames: List[_Frame] = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    frames.reverse()
+    return tuple(frames)
+
+
+class Profiler:
+    """Decides which requests to profile, samples them, and stores the results."""
+
+    def __init__(
+        self,
+        directory: Path,
+        sample_rate: float = 0.0,
+        interval_ms: float = 5.0,
+        slow_ms: float = 1000.0,
+        keep: int = 50,
+    ) -> None:
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.interval = max(0.001, interval_ms / 1000.0)
+        self.slow_ms = slow_ms
+        self.keep = max(1, keep)
+        self.profiled = 0
+        self.written = 0
+        self._active: Dict[str, RequestProfile] = {}
+        self._recent: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._sampler: Optional[threading.Thread] = None
+
+    # -- sampling ----------------------------------------------------------
+    def _run_sampler(self) -> None:
+        while True:
+            with self._lock:
+                active = list(self._active.values())
+                if not active:
+                    self._sampler = None
+                    return
+            frames = sys._current_frames()
+            for profile in active:
+                for ident, stage in profile.sampled_threads():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        profile.add_sample(stage, _stack(frame))
+            del frames
+            time.sleep(self.interval)
+
+    def should_profile(self, forced: bool) -> bool:
+        return forced or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    @contextlib.contextmanager
+    def profile(self, method: str, path: str) -> Iterator[RequestProfile]:
+        """Profile the enclosed request; registered stages are sampled."""
+        profile = RequestProfile(uuid.uuid4().hex[:16], method, path)
+        with contextlib.suppress(RuntimeError):
+            task = asyncio.current_task()
+            if task is not None:
+                profile.attach(asyncio.get_running_loop(), task)
+        token = _current.set(profile)
+        with self._lock:
+            self._active[profile.id] = profile
+            self.profiled += 1
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run_sampler, name="profiler", daemon=True)
+                self._sampler.start()
+        try:
+            yield profile
+        finally:
+            _current.reset(token)
+            with self._lock:
+                self._active.pop(profile.id, None)
+
+    # -- results -----------------------------------------------------------
+    def finish(self, profile: RequestProfile, route: str, status: int, duration_ms: float, forced: bool) -> None:
+        """Write the profile if it was requested explicitly or ran slower than slow_ms."""
+        if not forced and duration_ms < self.slow_ms:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        filename = f"{int(profile.started)}-{profile.id}.speedscope.json"
+        samples = profile.snapshot()
+        document = self._speedscope(samples, f"{profile.method} {profile.path}", duration_ms)
+        (self.directory / filename).write_text(json.dumps(document, separators=(",", ":")), encoding="utf-8")
+
+        entry = {
+            "id": profile.id,
+            "method": profile.method,
+            "path": profile.path,
+            "route": route,
+            "status": status,
+            "durationMs": round(duration_ms, 1),
+            "samples": sum(samples.values()),
+            "forced": forced,
+            "createdAt": profile.started,
+            "file": filename,
+        }
+        with self._lock:
+            self._recent.append(entry)
+            self.written += 1
+            doomed = []
+            while len(self._recent) > self.keep:
+                doomed.append(self._recent.popleft()["file"])
+        for name in doomed:
+            with contextlib.suppress(OSError):
+                (self.directory / name).unlink()
+
+    def _speedscope(
+        self, profile_samples: "Counter[Tuple[str, Tuple[_Frame, ...]]]", name: str, duration_ms: float
+    ) -> Dict[str, Any]:
+        frames: List[Dict[str, Any]] = []
+        index: Dict[Any, int] = {}
+
+        def frame_id(key: Any, entry: Dict[str, Any]) -> int:
+            if key not in index:
+                index[key] = len(frames)
+                frames.append(entry)
+            return index[key]
+
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        interval_ms = self.interval * 1000
+        for (stage, stack), count in profile_samples.most_common():
+            root = frame_id(("stage", stage), {"name": f"[stage] {stage}"})
+            ids = [frame_id(f, {"name": f[0], "file": f[1], "line": f[2]}) for f in stack]
+            samples.append([root] + ids)
+            weights.append(count * interval_ms)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "aiia-langextract-backend",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": max(duration_ms, sum(weights)),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """Kept profiles, slowest first."""
+        with self._lock:
+            entries = list(self._recent)
+        return sorted(entries, key=lambda e: e["durationMs"], reverse=True)
+
+    def path_for(self, profile_id: str) -> Optional[Path]:
+        with self._lock:
+            for entry in self._recent:
+                if entry["id"] == profile_id:
+                    return self.directory / entry["file"]
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sampleRate": self.sample_rate,
+            "intervalMs": self.interval * 1000,
+            "slowMs": self.slow_ms,
+            "keep": self.keep,
+            "profiled": self.profiled,
+            "written": self.written,
+            "active": len(self._active),
+        }
+
+
+@contextlib.contextmanager
+def stage_hook(stage: str) -> Iterator[None]:
+    """Attribute the block to stage in the request's profile (Metrics stage hook).
+
+    A worker thread is registered for the block; on the event loop the
+    current task is, since the loop thread also runs other requests.
+    """
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        task = None
+    else:
+        task = asyncio.current_task()
+        if task is None:
+            # A loop callback outside any task: nothing to attribute it to.
+            yield
+            return
+    profile.enter(stage, task)
+    try:
+        yield
+    finally:
+        profile.exit(task)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware: profile requests sent with the trigger header, or a
+    random sample of them; the profile id is returned in X-Profile-Id."""
+
+    def __init__(self, app: Any, profiler: Profiler, header: str = "x-profile") -> None:
+        self.app = app
+        self.profiler = profiler
+        self.header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        forced = any(
+            name == self.header and value.strip() not in (b"", b"0", b"false", b"no")
+            for name, value in scope.get("headers", [])
+        )
+        if not self.profiler.should_profile(forced):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+        with self.profiler.profile(scope.get("method", ""), scope.get("path", "")) as profile:
+
+            async def send_with_id(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    status["code"] = message["status"]
+                    headers = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode("latin-1"))]
+                    message = dict(message, headers=headers)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                duration_ms = (time.perf_counter() - started) * 1000
+                # Serializing and writing the profile stays off the event loop.
+                await asyncio.to_thread(self.profiler.finish, profile, route, status["code"], duration_ms, forced)
@@ -0,0 +1,192 @@
+"""
+providers.py — Application-scoped upstream clients.
+
+One ProviderPool is created per process and started at FastAPI startup. It
+owns a keep-alive httpx connection pool (sync + async) and a single genai
+client built on top of it, so /embed and every lx.extract call reuse warm
+TLS connections instead of building a fresh client per request.
+
+Gemini lx.extract calls get the pool through language_model_params
+(http_options, which langextract's Gemini provider hands to the genai.Client
+it builds). That is only done once the provider registered for the model id
+is confirmed to declare http_options in its constructor, since a provider
+that does not would ignore it; stats()["providersPooled"] shows the result.
+"""
+
+from __future__ import annotations
+
+import inspect
+import threading
+from typing import Any, Dict, Optional
+
+try:
+    import httpx
+    _HAS_HTTPX = True
+except ImportError:
+    httpx = None  # type: ignore
+    _HAS_HTTPX = False
+
+try:
+    from google import genai as _genai
+    from google.genai import types as _genai_types
+    _HAS_GENAI = True
+except ImportError:
+    _genai = None  # type: ignore
+    _genai_types = None  # type: ignore
+    _HAS_GENAI = False
+
+try:
+    import langextract as lx
+    _HAS_LX = True
+except ImportError:
+    lx = None  # type: ignore
+    _HAS_LX = False
+
+
+def _is_gemini(model_id: str) -> bool:
+    return str(model_id or "").lower().startswith("gemini")
+
+
+def _provider_takes_http_options(model_id: str) -> bool:
+    """True if the langextract provider registered for model_id accepts http_options."""
+    if not _HAS_LX:
+        return False
+    try:
+        from langextract import providers as lx_providers
+        lx_providers.load_builtins_once()
+        lx_providers.load_plugins_once()
+        provider = lx_providers.router.resolve(model_id)
+        return "http_options" in inspect.signature(provider.__init__).parameters
+    except Exception:  # noqa: BLE001 — older langextract without the provider registry
+        return False
+
+
+def _pool_connections(client: Any) -> Optional[Dict[str, int]]:
+    """Best-effort open/idle connection counts from an httpx client's pool."""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if connections is None:
+        return None
+    idle = sum(1 for conn in connections if getattr(conn, "is_idle", lambda: False)())
+    return {"open": len(connections), "idle": idle}
+
+
+class ProviderPool:
+    """Shared genai client and HTTP connection pool for the app's lifetime."""
+
+    def __init__(
+        self,
+        api_key: str,
+        max_connections: int = 32,
+        max_keepalive: int = 16,
+        keepalive_expiry: float = 60.0,
+        timeout: float = 120.0,
+    ) -> None:
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.requests_sent = 0
+        self.extract_calls = 0
+        self._lock = threading.Lock()
+        self._started = False
+        self._http: Any = None
+        self._ahttp: Any = None
+        self._http_options: Any = None
+        self._genai: Any = None
+        # model id -> whether its provider takes http_options (see _provider_takes_http_options)
+        self._pooled_models: Dict[str, bool] = {}
+
+    # -- lifecycle ---------------------------------------------------------
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            if _HAS_HTTPX:
+                limits = httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_expiry,
+                )
+                timeout = httpx.Timeout(self.timeout)
+                self._http = httpx.Client(
+                    limits=limits, timeout=timeout, event_hooks={"request": [self._count_request]}
+                )
+                self._ahttp = httpx.AsyncClient(
+                    limits=limits, timeout=timeout, event_hooks={"request": [self._acount_request]}
+                )
+            if _HAS_GENAI and self.api_key:
+                self._http_options = self._build_http_options()
+                if self._http_options is not None:
+                    self._genai = _genai.Client(api_key=self.api_key, http_options=self._http_options)
+                else:
+                    self._genai = _genai.Client(api_key=self.api_key)
+
+    def _build_http_options(self) -> Any:
+        if self._http is None:
+            return None
+        try:
+            return _genai_types.HttpOptions(httpx_client=self._http, httpx_async_client=self._ahttp)
+        except Exception:  # noqa: BLE001 — older google-genai without custom httpx clients
+            return None
+
+    async def aclose(self) -> None:
+        with self._lock:
+            http, ahttp = self._http, self._ahttp
+            self._http = self._ahttp = self._http_options = self._genai = None
+            self._started = False
+        if ahttp is not None:
+            await ahttp.aclose()
+        if http is not None:
+            http.close()
+
+    # -- accessors ---------------------------------------------------------
+    @property
+    def genai(self) -> Any:
+        """The shared genai client (started lazily if startup hooks did not run)."""
+        if not self._started:
+            self.start()
+        return self._genai
+
+    def language_model_params(self, model_id: str) -> Dict[str, Any]:
+        """Extra lx.extract provider kwargs routing Gemini calls through the pool."""
+        if not self._started:
+            self.start()
+        if self._http_options is None or not _is_gemini(model_id):
+            return {}
+        pooled = self._pooled_models.get(model_id)
+        if pooled is None:
+            pooled = self._pooled_models[model_id] = _provider_takes_http_options(model_id)
+        return {"http_options": self._http_options} if pooled else {}
+
+    def extract(self, **kwargs: Any) -> Any:
+        """lx.extract with the shared connection pool wired into the provider."""
+        params = dict(kwargs.pop("language_model_params", None) or {})
+        params.update(self.language_model_params(kwargs.get("model_id", "")))
+        with self._lock:
+            self.extract_calls += 1
+        return lx.extract(language_model_params=params or None, **kwargs)
+
+    # -- stats -------------------------------------------------------------
+    def _count_request(self, _request: Any) -> None:
+        with self._lock:
+            self.requests_sent += 1
+
+    async def _acount_request(self, request: Any) -> None:
+        self._count_request(request)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "started": self._started,
+            "pooled": self._http_options is not None,
+            "providersPooled": dict(self._pooled_models),
+            "maxConnections": self.max_connections,
+            "maxKeepalive": self.max_keepalive,
+            "keepaliveExpirySeconds": self.keepalive_expiry,
+            "requestsSent": self.requests_sent,
+            "extractCalls": self.extract_calls,
+            "sync": _pool_connections(self._http) if self._http is not None else None,
+            "async": _pool_connections(self._ahttp) if self._ahttp is not None else None,
+        }
@@ -0,0 +1,276 @@
+"""
+router.py — Health-aware ordering of extraction model candidates.
+
+ModelRouter keeps a rolling window of outcomes and latencies per model and a
+circuit breaker per model. Callers ask it to order their candidate list
+before walking it and report every attempt back, so a model that is down or
+rate-limited stops costing each request a failing round trip:
+
+  closed     normal; the model keeps its configured position unless its
+             recent success rate has dropped, in which case it moves behind
+             the healthy candidates, or a later candidate answers more than
+             slow_factor times faster (median latency divided by success
+             rate), in which case that one moves ahead of it
+  open       tripped by consecutive failures; skipped until its cooldown
+             expires
+  half-open  cooldown expired; one probe request is let through, success
+             closes the breaker, failure reopens it with a doubled cooldown
+
+A rate-limit (429 / quota) response does not count towards the breaker:
+the model is skipped for a short backoff instead, starting at
+rate_limit_backoff seconds and doubling with each consecutive 429 up to
+cooldown_seconds, and reset by the next success.
+
+If every candidate is open or backing off the configured order is returned
+unchanged, so a request is never refused by the router alone. Kept free of app state so the
+vendor extract_resume module can be handed the same instance.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from .admission import Overloaded
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+_RATE_LIMIT_MARKERS = ("429", "resource_exhausted", "rate limit", "rate_limit", "quota")
+
+
+def is_rate_limited(error: Any) -> bool:
+    """True for a 429 / quota response, by status attribute or message."""
+    for attr in ("code", "status_code", "status"):
+        if getattr(error, attr, None) == 429:
+            return True
+    message = str(error or "").lower()
+    return any(marker in message for marker in _RATE_LIMIT_MARKERS)
+
+
+def _percentile(ordered: List[float], pct: float) -> Optional[float]:
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class _ModelHealth:
+    def __init__(self, window: int) -> None:
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.successes = 0
+        self.failures = 0
+        self.rate_limited = 0
+        self.consecutive_failures = 0
+        self.opens = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.cooldown = 0.0
+        self.limited_until = 0.0
+        self.backoff = 0.0
+        self.probe_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def success_rate(self) -> Optional[float]:
+        if not self.outcomes:
+            return None
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def score(self, min_samples: int) -> Optional[float]:
+        """Expected seconds per successful answer (median latency / success rate)."""
+        if len(self.latencies) < min_samples:
+            return None
+        median = sorted(self.latencies)[len(self.latencies) // 2]
+        return median / max(0.05, self.success_rate() or 0.0)
+
+
+class ModelRouter:
+    """Per-model health tracking and circuit breakers shared across requests."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 30.0,
+        max_cooldown_seconds: float = 600.0,
+        window: int = 100,
+        min_success_rate: float = 0.5,
+        min_samples: int = 5,
+        slow_factor: float = 2.0,
+        rate_limit_backoff: float = 5.0,
+        clock: Any = time.monotonic,
+    ) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = max(0.0, cooldown_seconds)
+        self.max_cooldown_seconds = max(self.cooldown_seconds, max_cooldown_seconds)
+        self.window = max(1, window)
+        self.min_success_rate = min_success_rate
+        self.min_samples = max(1, min_samples)
+        self.slow_factor = max(1.0, slow_factor)
+        self.rate_limit_backoff = max(0.0, rate_limit_backoff)
+        self.skipped = 0
+        self._clock = clock
+        self._models: Dict[str, _ModelHealth] = {}
+        self._lock = threading.Lock()
+
+    def _health(self, model_id: str) -> _ModelHealth:
+        health = self._models.get(model_id)
+        if health is None:
+            health = self._models[model_id] = _ModelHealth(self.window)
+        return health
+
+    def _state(self, health: _ModelHealth, now: float) -> str:
+        if health.state == OPEN and now - health.opened_at >= health.cooldown:
+            health.state = HALF_OPEN
+            health.probe_at = None
+        return health.state
+
+    def _trip(self, health: _ModelHealth, now: float) -> None:
+        if health.state == CLOSED:
+            health.cooldown = self.cooldown_seconds
+        else:
+            health.cooldown = min(self.max_cooldown_seconds, max(self.cooldown_seconds, health.cooldown * 2))
+        health.state = OPEN
+        health.opened_at = now
+        health.probe_at = None
+        health.opens += 1
+
+    def _by_latency(self, model_ids: List[str]) -> List[str]:
+        """Configured order, except that a model more than slow_factor times
+        faster than one ahead of it moves in front of that one."""
+        ordered: List[str] = []
+        for model_id in model_ids:
+            score = self._models[model_id].score(self.min_samples)
+            position = len(ordered)
+            if score is not None:
+                for i, earlier in enumerate(ordered):
+                    earlier_score = self._models[earlier].score(self.min_samples)
+                    if earlier_score is not None and score * self.slow_factor < earlier_score:
+                        position = i
+                        break
+            ordered.insert(position, model_id)
+        return ordered
+
+    # -- routing -----------------------------------------------------------
+    def order(self, candidates: Sequence[str]) -> List[str]:
+        """Candidates to try, healthiest first; open breakers and models
+        backing off after a rate limit are left out."""
+        now = self._clock()
+        healthy: List[str] = []
+        degraded: List[str] = []
+        with self._lock:
+            for model_id in candidates:
+                health = self._health(model_id)
+                state = self._state(health, now)
+                if state == OPEN or now < health.limited_until:
+                    continue
+                if state == HALF_OPEN:
+                    # One probe per cooldown period; an unanswered probe is retried later.
+                    if health.probe_at is not None and now - health.probe_at < max(health.cooldown, 1.0):
+                        continue
+                    health.probe_at = now
+                    healthy.append(model_id)
+                    continue
+                rate = health.success_rate()
+                if rate is not None and len(health.outcomes) >= self.min_samples and rate < self.min_success_rate:
+                    degraded.append(model_id)
+                else:
+                    healthy.append(model_id)
+            ordered = self._by_latency(healthy) + degraded
+            if not ordered:
+                return list(candidates)
+            self.skipped += len(candidates) - len(ordered)
+        return ordered
+
+    def record(self, model_id: str, seconds: float, error: Any = None) -> None:
+        """Report one attempt: its duration and the exception (None on success).
+
+        Overloaded errors are ignored: the call was shed by local admission
+        control before reaching the model, which says nothing about its health.
+        """
+        if isinstance(error, Overloaded):
+            return
+        now = self._clock()
+        with self._lock:
+            health = self._health(model_id)
+            state = self._state(health, now)
+            if error is None:
+                health.outcomes.append(True)
+                health.successes += 1
+                health.consecutive_failures = 0
+                health.latencies.append(seconds)
+                health.backoff = 0.0
+                if state != CLOSED:
+                    health.state = CLOSED
+                    health.probe_at = None
+                return
+
+            health.last_error = str(error)[:300]
+            if is_rate_limited(error):
+                # Quota, not health: back off briefly instead of tripping the breaker.
+                health.rate_limited += 1
+                health.backoff = min(
+                    max(self.cooldown_seconds, self.rate_limit_backoff),
+                    health.backoff * 2 if health.backoff else self.rate_limit_backoff,
+                )
+                health.limited_until = now + health.backoff
+                if state == HALF_OPEN:
+                    health.probe_at = None
+                return
+
+            health.outcomes.append(False)
+            health.failures += 1
+            health.consecutive_failures += 1
+            if state == HALF_OPEN or health.consecutive_failures >= self.failure_threshold:
+                if state != OPEN:
+                    self._trip(health, now)
+
+    # -- reporting ---------------------------------------------------------
+    def latency_percentile(self, model_id: str, pct: float) -> Optional[float]:
+        """Seconds at the given percentile of recent successful calls, if any."""
+        with self._lock:
+            health = self._models.get(model_id)
+            ordered = sorted(health.latencies) if health is not None else []
+        return _percentile(ordered, pct)
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        models: Dict[str, Any] = {}
+        with self._lock:
+            for model_id, health in self._models.items():
+                state = self._state(health, now)
+                ordered = sorted(health.latencies)
+                rate = health.success_rate()
+                p50, p95, p99 = (_percentile(ordered, pct) for pct in (50, 95, 99))
+                models[model_id] = {
+                    "state": state,
+                    "successes": health.successes,
+                    "failures": health.failures,
+                    "rateLimited": health.rate_limited,
+                    "consecutiveFailures": health.consecutive_failures,
+                    "successRate": round(rate, 3) if rate is not None else None,
+                    "p50Ms": round(p50 * 1000) if p50 is not None else None,
+                    "p95Ms": round(p95 * 1000) if p95 is not None else None,
+                    "p99Ms": round(p99 * 1000) if p99 is not None else None,
+                    "opens": health.opens,
+                    "cooldownRemainingSeconds": (
+                        round(max(0.0, health.opened_at + health.cooldown - now), 1) if state == OPEN else 0.0
+                    ),
+                    "rateLimitBackoffRemainingSeconds": round(max(0.0, health.limited_until - now), 1),
+                    "lastError": health.last_error,
+                }
+            skipped = self.skipped
+        return {
+            "failureThreshold": self.failure_threshold,
+            "cooldownSeconds": self.cooldown_seconds,
+            "maxCooldownSeconds": self.max_cooldown_seconds,
+            "window": self.window,
+            "minSuccessRate": self.min_success_rate,
+            "slowFactor": self.slow_factor,
+            "rateLimitBackoffSeconds": self.rate_limit_backoff,
+            "skipped": skipped,
+            "models": models,
+        }
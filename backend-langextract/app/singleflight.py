@@ -0,0 +1,64 @@
+"""
+singleflight.py — Coalescing of identical in-flight async work.
+
+Duplicate requests from the extension (several tabs, retries after a
+timeout, options and popup both rebuilding) used to start one upstream call
+each. SingleFlight keys work on a content hash: the first caller for a key
+starts the work, later callers with the same key await that same future
+until it settles, then the key is forgotten, so results are never served
+stale; caching stays the job of the SQLite caches.
+
+Waiters await through asyncio.shield, so a caller that times out or
+disconnects does not cancel the work for the others. Results are shared
+objects: callers must copy before mutating. Must be used from one event
+loop (the app's).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class SingleFlight:
+    """At most one in-flight awaitable per key; concurrent callers share it."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, "asyncio.Future[Any]"] = {}
+        self.leaders = 0
+        self.joined = 0
+
+    def _forget(self, key: str, future: "asyncio.Future[Any]") -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            future.exception()  # mark retrieved; each caller re-raises on its own
+
+    def _track(self, key: str, future: "asyncio.Future[Any]") -> None:
+        self._calls[key] = future
+        self.leaders += 1
+        future.add_done_callback(lambda done: self._forget(key, done))
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await factory() for key, or the call already in flight for it."""
+        future = self.join(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._track(key, future)
+        return await asyncio.shield(future)
+
+    def join(self, key: str) -> Optional["asyncio.Future[Any]"]:
+        """The in-flight future for key, if any (await it through shield)."""
+        future = self._calls.get(key)
+        if future is not None:
+            self.joined += 1
+        return future
+
+    def lead(self, key: str) -> "asyncio.Future[Any]":
+        """Register a future for key that the caller must settle (result, exception or cancel)."""
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        self._track(key, future)
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        return {"inFlight": len(self._calls), "leaders": self.leaders, "joined": self.joined}
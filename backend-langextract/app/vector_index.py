@@ -0,0 +1,392 @@
+"""
+vector_index.py — In-process vector indexes for server-side retrieval.
+
+Each (user, bank) pair owns a VectorIndex: a contiguous float32 matrix of
+L2-normalized rows plus parallel id / metadata lists. Cosine similarity is
+then a single matrix product, and top-k uses argpartition so a query costs
+O(n) instead of a full sort.
+
+Indexes can be persisted as a binary .npy matrix (float32, float16 or int8)
+plus a JSON sidecar. Saved matrices are opened with mmap_mode="r", so every
+worker process searches the same page-cached copy; a mapped index is only
+copied into private memory when it is next modified.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    _HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore
+    _HAS_NUMPY = False
+
+_NAME_RE = re.compile(r"^[A-Za-z0-9_.\-]{1,64}$")
+STORAGE_DTYPES = ("float32", "float16", "int8")
+# int8 storage keeps one float32 scale per row (max |component| / 127).
+_INT8_MAX = 127.0
+# Rows decoded per step when scoring a float16/int8 matrix.
+_SCORE_BLOCK = 65536
+_META_FILE = "meta.json"
+
+
+def valid_name(name: str) -> bool:
+    return bool(_NAME_RE.match(str(name or "")))
+
+
+def _normalize_rows(matrix: Any) -> Any:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    if np.any(norms == 0):
+        raise ValueError("Zero-length vectors cannot be indexed")
+    return matrix / norms
+
+
+class VectorIndex:
+    """Growable matrix of unit vectors with O(1) upsert/delete by id."""
+
+    def __init__(self, dim: int, capacity: int = 64, storage_dtype: str = "float32") -> None:
+        if not _HAS_NUMPY:
+            raise RuntimeError("numpy is not installed. Run: pip install numpy")
+        if storage_dtype not in STORAGE_DTYPES:
+            raise ValueError(f"storage_dtype must be one of {STORAGE_DTYPES}")
+        self.dim = int(dim)
+        self.storage_dtype = storage_dtype
+        self.generation = 0
+        self._matrix = np.empty((max(1, capacity), self.dim), dtype=np.float32)
+        self._mapped = False  # True while _matrix is a read-only memmap in storage dtype
+        self._scales: Any = None  # per-row scales of a mapped int8 matrix
+        self._ids: List[str] = []
+        self._meta: List[Dict[str, Any]] = []
+        self._pos: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _as_matrix(self, vectors: Any) -> Any:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if matrix.ndim != 2 or matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got shape {tuple(matrix.shape)}")
+        return matrix
+
+    def _decode(self, rows: Any, start: int = 0) -> Any:
+        if rows.dtype == np.int8:
+            scales = self._scales[start: start + rows.shape[0]]
+            return rows.astype(np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+        return rows.astype(np.float32, copy=False)
+
+    def _encode(self, rows: Any) -> Tuple[Any, Any]:
+        """Rows in storage dtype, plus per-row scales for int8 (else None)."""
+        if self.storage_dtype != "int8":
+            return rows.astype(self.storage_dtype), None
+        peaks = np.abs(rows).max(axis=1) if rows.shape[0] else np.empty(0, dtype=np.float32)
+        scales = np.where(peaks > 0, peaks / _INT8_MAX, 1.0).astype(np.float32)
+        quantized = np.clip(np.rint(rows / scales[:, None]), -127, 127).astype(np.int8)
+        return quantized, scales
+
+    def _ensure_owned(self) -> None:
+        """Copy a mapped matrix into a private, writable float32 buffer."""
+        if not self._mapped:
+            return
+        count = len(self._ids)
+        owned = np.empty((max(64, count), self.dim), dtype=np.float32)
+        owned[:count] = self._decode(self._matrix[:count])
+        self._matrix = owned
+        self._scales = None
+        self._mapped = False
+
+    def _scores(self, queries: Any, count: int) -> Any:
+        rows = self._matrix[:count]
+        if rows.dtype == np.float32:
+            return queries @ rows.T
+        # Decode float16/int8 storage block by block to bound temporary memory.
+        scores = np.empty((queries.shape[0], count), dtype=np.float32)
+        for start in range(0, count, _SCORE_BLOCK):
+            block = self._decode(rows[start: start + _SCORE_BLOCK], start)
+            scores[:, start: start + block.shape[0]] = queries @ block.T
+        return scores
+
+    def _reserve(self, needed: int) -> None:
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        grown = np.empty((capacity, self.dim), dtype=np.float32)
+        grown[: len(self._ids)] = self._matrix[: len(self._ids)]
+        self._matrix = grown
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        vectors: Any,
+        metadata: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    ) -> Tuple[int, int]:
+        """Insert or replace rows. Returns (inserted, updated)."""
+        matrix = _normalize_rows(self._as_matrix(vectors))
+        if len(ids) != matrix.shape[0]:
+            raise ValueError("ids and vectors must have the same length")
+        metas = list(metadata) if metadata is not None else [None] * len(ids)
+        if len(metas) != len(ids):
+            raise ValueError("metadata must match ids in length")
+
+        inserted = updated = 0
+        with self._lock:
+            self._ensure_owned()
+            self._reserve(len(self._ids) + len(ids))
+            for row, (item_id, meta) in enumerate(zip(ids, metas)):
+                item_id = str(item_id)
+                pos = self._pos.get(item_id)
+                if pos is None:
+                    pos = len(self._ids)
+                    self._pos[item_id] = pos
+                    self._ids.append(item_id)
+                    self._meta.append(dict(meta or {}))
+                    inserted += 1
+                else:
+                    self._meta[pos] = dict(meta or {})
+                    updated += 1
+                self._matrix[pos] = matrix[row]
+        return inserted, updated
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """Remove rows by id, filling each hole with the last row."""
+        removed = 0
+        with self._lock:
+            if self._mapped and not any(str(item_id) in self._pos for item_id in ids):
+                return 0
+            self._ensure_owned()
+            for item_id in ids:
+                pos = self._pos.pop(str(item_id), None)
+                if pos is None:
+                    continue
+                last = len(self._ids) - 1
+                if pos != last:
+                    moved_id = self._ids[last]
+                    self._matrix[pos] = self._matrix[last]
+                    self._ids[pos] = moved_id
+                    self._meta[pos] = self._meta[last]
+                    self._pos[moved_id] = pos
+                self._ids.pop()
+                self._meta.pop()
+                removed += 1
+        return removed
+
+    def search(self, queries: Any, k: int) -> List[List[Dict[str, Any]]]:
+        """Top-k cosine matches for each query row, best first."""
+        matrix = _normalize_rows(self._as_matrix(queries))
+        with self._lock:
+            count = len(self._ids)
+            if count == 0 or k <= 0:
+                return [[] for _ in range(matrix.shape[0])]
+            k = min(int(k), count)
+            scores = self._scores(matrix, count)
+            if k < count:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                top = np.broadcast_to(np.arange(count), (matrix.shape[0], count))
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            return [
+                [
+                    {"id": self._ids[pos], "score": float(score), "metadata": self._meta[pos]}
+                    for pos, score in zip(row_ids.tolist(), row_scores.tolist())
+                ]
+                for row_ids, row_scores in zip(top, top_scores)
+            ]
+
+    # -- persistence -------------------------------------------------------
+    def save(self, directory: Path) -> None:
+        """Write the matrix and sidecar atomically, then re-open as a memmap.
+
+        Each save writes a new generation-numbered .npy file and swaps
+        meta.json to point at it, so readers never see a half-written pair.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            count = len(self._ids)
+            generation = self.generation + 1
+            vectors_name = f"vectors.{generation}.npy"
+            scales_name = f"scales.{generation}.npy"
+            encoded, scales = self._encode(self._decode(self._matrix[:count]))
+
+            written = [(vectors_name, encoded)]
+            if scales is not None:
+                written.append((scales_name, scales))
+            for name, array in written:
+                tmp = directory / (name + ".tmp")
+                with open(tmp, "wb") as fh:
+                    np.save(fh, array)
+                os.replace(tmp, directory / name)
+
+            sidecar = {
+                "version": 1,
+                "generation": generation,
+                "vectors": vectors_name,
+                "scales": scales_name if scales is not None else None,
+                "dtype": self.storage_dtype,
+                "dim": self.dim,
+                "count": count,
+                "ids": self._ids,
+                "metadata": self._meta,
+            }
+            tmp_meta = directory / (_META_FILE + ".tmp")
+            tmp_meta.write_text(json.dumps(sidecar, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp_meta, directory / _META_FILE)
+
+            current = {name for name, _ in written}
+            for stale in [*directory.glob("vectors.*.npy"), *directory.glob("scales.*.npy")]:
+                if stale.name not in current:
+                    # Processes still mapping the old file keep their view until they reload.
+                    stale.unlink(missing_ok=True)
+
+            self.generation = generation
+            self._matrix = np.load(directory / vectors_name, mmap_mode="r")
+            self._scales = np.load(directory / scales_name, mmap_mode="r") if scales is not None else None
+            self._mapped = True
+
+    @classmethod
+    def load(cls, directory: Path) -> "VectorIndex":
+        """Open a saved index; the matrix stays memory-mapped until modified."""
+        directory = Path(directory)
+        sidecar = json.loads((directory / _META_FILE).read_text(encoding="utf-8"))
+        index = cls(int(sidecar["dim"]), capacity=1, storage_dtype=sidecar.get("dtype", "float32"))
+        matrix = np.load(directory / sidecar["vectors"], mmap_mode="r")
+        ids = [str(item_id) for item_id in sidecar.get("ids", [])]
+        if matrix.shape != (len(ids), index.dim):
+            raise ValueError(f"Corrupt index at {directory}: matrix {matrix.shape} vs {len(ids)} ids")
+        index._matrix = matrix
+        if sidecar.get("scales"):
+            index._scales = np.load(directory / sidecar["scales"], mmap_mode="r")
+        index._mapped = True
+        index._ids = ids
+        index._meta = list(sidecar.get("metadata") or [{} for _ in ids])
+        index._pos = {item_id: pos for pos, item_id in enumerate(ids)}
+        index.generation = int(sidecar.get("generation", 0))
+        return index
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "count": len(self._ids),
+                "dimension": self.dim,
+                "capacity": int(self._matrix.shape[0]),
+                "dtype": self.storage_dtype,
+                "mapped": self._mapped,
+                "generation": self.generation,
+            }
+
+
+class IndexRegistry:
+    """Named indexes per (user, bank), optionally persisted under a root directory.
+
+    With a root, indexes are loaded lazily from disk and reloaded when another
+    worker has saved a newer generation (detected via the sidecar's mtime).
+    Concurrent writers to the same bank from different processes are last
+    writer wins.
+    """
+
+    def __init__(self, root: Optional[Path] = None, storage_dtype: str = "float32") -> None:
+        if storage_dtype not in STORAGE_DTYPES:
+            raise ValueError(f"storage_dtype must be one of {STORAGE_DTYPES}")
+        self.root = Path(root) if root is not None else None
+        self.storage_dtype = storage_dtype
+        self._indexes: Dict[Tuple[str, str], VectorIndex] = {}
+        self._mtimes: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def _dir(self, user: str, bank: str) -> Path:
+        return self.root / user / bank  # type: ignore[operator]
+
+    def _sidecar_mtime(self, user: str, bank: str) -> Optional[int]:
+        try:
+            return (self._dir(user, bank) / _META_FILE).stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh_locked(self, user: str, bank: str) -> Optional[VectorIndex]:
+        key = (user, bank)
+        index = self._indexes.get(key)
+        if self.root is None:
+            return index
+        mtime = self._sidecar_mtime(user, bank)
+        if mtime is None:
+            if key in self._mtimes:
+                # Saved before, now gone: another worker dropped it.
+                self._indexes.pop(key, None)
+                self._mtimes.pop(key, None)
+                return None
+            return index
+        if index is None or self._mtimes.get(key) != mtime:
+            index = VectorIndex.load(self._dir(user, bank))
+            self._indexes[key] = index
+            self._mtimes[key] = mtime
+        return index
+
+    def get(self, user: str, bank: str) -> Optional[VectorIndex]:
+        with self._lock:
+            return self._refresh_locked(user, bank)
+
+    def get_or_create(self, user: str, bank: str, dim: int) -> VectorIndex:
+        with self._lock:
+            index = self._refresh_locked(user, bank)
+            if index is None:
+                index = VectorIndex(dim, storage_dtype=self.storage_dtype)
+                self._indexes[(user, bank)] = index
+            elif index.dim != dim:
+                raise ValueError(f"Index {user}/{bank} has dimension {index.dim}, got {dim}")
+            return index
+
+    def persist(self, user: str, bank: str) -> None:
+        """Save a bank to disk (no-op without a root)."""
+        if self.root is None:
+            return
+        with self._lock:
+            index = self._indexes.get((user, bank))
+            if index is None:
+                return
+            index.save(self._dir(user, bank))
+            mtime = self._sidecar_mtime(user, bank)
+            if mtime is not None:
+                self._mtimes[(user, bank)] = mtime
+
+    def drop(self, user: str, bank: str) -> bool:
+        with self._lock:
+            existed = self._refresh_locked(user, bank) is not None
+            self._indexes.pop((user, bank), None)
+            self._mtimes.pop((user, bank), None)
+            if self.root is not None and self._dir(user, bank).exists():
+                shutil.rmtree(self._dir(user, bank), ignore_errors=True)
+        return existed
+
+    def banks(self, user: str) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            names = {bank for (owner, bank) in self._indexes if owner == user}
+            if self.root is not None and (self.root / user).is_dir():
+                names.update(p.parent.name for p in (self.root / user).glob(f"*/{_META_FILE}"))
+            owned = {bank: self._refresh_locked(user, bank) for bank in names}
+        return {bank: index.stats() for bank, index in sorted(owned.items()) if index is not None}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            indexes = list(self._indexes.values())
+        return {
+            "indexes": len(indexes),
+            "vectors": sum(len(index) for index in indexes),
+            "persistent": self.root is not None,
+            "storageDtype": self.storage_dtype,
+        }
@@ -0,0 +1,384 @@
+"""
+_legacy_heuristics.py — Frozen copy of the heuristic CV parser before app/normalize.py.
+
+Kept only as the "before" side of bench_normalize.py; do not import from app code.
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.dedup import NearDuplicateIndex  # noqa: E402
+
+ROLE_KEYWORDS = (
+    "engineer",
+    "researcher",
+    "intern",
+    "assistant",
+    "lead",
+    "developer",
+    "manager",
+    "analyst",
+    "designer",
+    "captain",
+    "founder",
+)
+MONTH_PATTERN = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?"
+DATE_RANGE_RE = re.compile(
+    rf"({MONTH_PATTERN}\s*\d{{4}}(?:\s*-\s*(?:{MONTH_PATTERN}\s*\d{{4}}|Present))?)",
+    re.IGNORECASE,
+)
+# Matches CV section headers that appear mid-line (not at line start)
+_CV_SECTION_RE = re.compile(
+    r"(?<=[^\n])\s+"
+    r"(Technical\s+Projects|Technical\s+Skills|Work\s+Experience|Professional\s+Experience"
+    r"|Education|Experience|Projects|Skills)"
+    r"(?=\s+[A-Za-z0-9])",
+    re.IGNORECASE,
+)
+
+
+def _normalize_text(text: str) -> str:
+    value = str(text or "")
+    value = value.replace("\u2013", "-").replace("\u2014", "-").replace("\ufffd", " ")
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def _canonical_key(text: str) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9\s]", " ", text.lower())).strip()
+
+
+def _dedup_items(items: List[str], max_items: int) -> List[str]:
+    seen_keys = NearDuplicateIndex()
+    output: List[str] = []
+
+    for item in items:
+        cleaned = _normalize_text(item).lstrip("- ").strip()
+        if len(cleaned) < 18:
+            continue
+
+        key = _canonical_key(cleaned)
+        if not key:
+            continue
+
+        if not seen_keys.add(key):
+            continue
+
+        output.append(cleaned)
+        if len(output) >= max_items:
+            break
+
+    return output
+
+
+def _to_lines_with_flags(text: str) -> List[Dict[str, Any]]:
+    source = str(text or "").replace("\r", "\n")
+    source = source.replace("â€¢", "\nâ€¢ ")
+    source = source.replace("â—", "\nâ€¢ ")
+    source = re.sub(r"\s{2,}", " ", source)
+    rows: List[Dict[str, Any]] = []
+
+    for raw in source.split("\n"):
+        if not raw or not raw.strip():
+            continue
+        stripped = raw.strip()
+        is_bullet = bool(re.match(r"^[\-\*â€¢]\s+", stripped))
+        cleaned = re.sub(r"^[\-\*â€¢â—Â·\?]+\s*", "", stripped).strip()
+        if not cleaned:
+            continue
+        rows.append({"text": cleaned, "is_bullet": is_bullet})
+
+    return rows
+
+
+def _section_from_line(line: str) -> Tuple[Optional[str], str]:
+    value = str(line or "").strip()
+    lowered = value.lower().strip(":")
+    mapping = [
+        ("technical projects", "projects"),
+        ("projects", "projects"),
+        ("work experience", "experience"),
+        ("professional experience", "experience"),
+        ("experience", "experience"),
+        ("education", "education"),
+        ("technical skills", "skills"),
+        ("skills", "skills"),
+    ]
+
+    for key, section in mapping:
+        if lowered == key:
+            return section, ""
+        if lowered.startswith(key + " "):
+            remainder = value[len(key):].strip(" :-")
+            return section, remainder
+
+    return None, value
+
+
+def _has_date_token(text: str) -> bool:
+    source = str(text or "")
+    return bool(DATE_RANGE_RE.search(source) or re.search(r"\b(19|20)\d{2}\b", source))
+
+
+def _looks_like_project_header(line: str) -> bool:
+    value = str(line or "").strip()
+    if "|" not in value or len(value) < 12:
+        return False
+    lowered = value.lower()
+    if lowered.startswith("languages"):
+        return False
+    if ("@" in lowered) or ("linkedin.com" in lowered) or ("github.com" in lowered):
+        return False
+    if re.search(r"\+\d{7,}", value):
+        return False
+    left, right = value.split("|", 1)
+    if len(left.strip()) < 4 or len(right.strip()) < 4:
+        return False
+    if not ("," in right or DATE_RANGE_RE.search(right)):
+        return False
+    return True
+
+
+def _parse_project_header(line: str) -> Dict[str, str]:
+    value = str(line or "").strip()
+    left, right = value.split("|", 1)
+    title = left.strip(" :-")
+    right_part = right.strip()
+
+    date_match = DATE_RANGE_RE.search(right_part)
+    dates = date_match.group(1).strip() if date_match else ""
+    tools = right_part.replace(dates, "").strip(" |-")
+
+    return {
+        "kind": "project",
+        "title": title,
+        "dates": dates,
+        "tools": tools,
+        "details": [],
+    }
+
+
+def _looks_like_experience_header(line: str) -> bool:
+    value = str(line or "").strip()
+    if len(value) < 8:
+        return False
+    if value.endswith(".") and len(value.split()) > 14:
+        return False
+    lowered = value.lower()
+    has_role_word = any(word in lowered for word in ROLE_KEYWORDS)
+    has_separator = (" - " in value) or (" â€“ " in value)
+    if has_role_word or has_separator:
+        return True
+    if _has_date_token(value) and ("team" in lowered or "lab" in lowered or "society" in lowered):
+        return True
+    return False
+
+
+def _strip_dates_for_key(text: str) -> str:
+    value = DATE_RANGE_RE.sub(" ", str(text or ""))
+    value = re.sub(r"\b(19|20)\d{2}\b", " ", value)
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def _shorten(text: str, max_chars: int = 220) -> str:
+    value = _normalize_text(text)
+    if len(value) <= max_chars:
+        return value
+    return value[: max_chars - 3].rstrip() + "..."
+
+
+def _build_project_bullet(entry: Dict[str, Any]) -> str:
+    title = _shorten(entry.get("title", ""), 140)
+    tools = _shorten(entry.get("tools", ""), 170)
+    dates = _shorten(entry.get("dates", ""), 60)
+    details = [d for d in entry.get("details", []) if d]
+    highlights = details[:3]
+
+    parts = [f"Project: {title}"]
+    if dates:
+        parts.append(f"Dates: {dates}")
+    if tools:
+        parts.append(f"Tools: {tools}")
+    if highlights:
+        parts.append("Highlights: " + " | ".join(_shorten(x, 170) for x in highlights))
+    return "; ".join(parts)
+
+
+def _build_experience_bullet(entry: Dict[str, Any]) -> str:
+    title = _shorten(entry.get("title", ""), 180)
+    details = [d for d in entry.get("details", []) if d]
+    highlights = details[:3]
+
+    parts = [f"Experience: {title}"]
+    if highlights:
+        parts.append("Highlights: " + " | ".join(_shorten(x, 170) for x in highlights))
+    return "; ".join(parts)
+
+
+def _build_education_bullet(entry: Dict[str, Any]) -> str:
+    title = _shorten(entry.get("title", ""), 180)
+    details = [d for d in entry.get("details", []) if d]
+    highlights = details[:2]
+
+    parts = [f"Education: {title}"]
+    if highlights:
+        parts.append("Details: " + " | ".join(_shorten(x, 170) for x in highlights))
+    return "; ".join(parts)
+
+
+def _dedup_fact_entries(items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    kept: List[Dict[str, Any]] = []
+    seen_keys = NearDuplicateIndex()
+    dropped = 0
+
+    for item in items:
+        key = _canonical_key(item.get("dedup_key", ""))
+        if not key:
+            key = _canonical_key(item.get("bullet", ""))
+        if not key:
+            continue
+
+        if not seen_keys.add(key):
+            dropped += 1
+            continue
+
+        kept.append(item)
+
+    return kept, dropped
+
+
+def _preprocess_cv_text(text: str) -> str:
+    # Inject newlines before section headers embedded mid-line
+    # e.g. "...Control 2. Education University College London..." → split at "Education"
+    result = _CV_SECTION_RE.sub(r"\n\1", text)
+    # Merge dates broken across lines: "Oct.\n2025 - Present" → "Oct. 2025 - Present"
+    result = re.sub(r"(?<=\w)\.\n(\d{4})", r". \1", result)
+    result = re.sub(
+        r"\n(" + MONTH_PATTERN + r"\s*\d{4})",
+        r" \1",
+        result,
+        flags=re.IGNORECASE,
+    )
+    return result
+
+
+def _extract_structured_fact_entries(text: str) -> Tuple[List[str], Dict[str, Any]]:
+    lines = _to_lines_with_flags(_preprocess_cv_text(text))
+    if not lines:
+        return [], {"duplicatesDropped": 0, "parsedEntries": 0}
+
+    section: Optional[str] = None
+    current: Optional[Dict[str, Any]] = None
+    entries: List[Dict[str, Any]] = []
+
+    def flush_current() -> None:
+        nonlocal current
+        if not current:
+            return
+
+        details = [_normalize_text(d) for d in current.get("details", []) if _normalize_text(d)]
+        cleaned_details = []
+        for detail in details:
+            lowered = detail.lower()
+            if lowered in {"experience", "projects", "technical projects", "education", "skills", "technical skills"}:
+                continue
+            cleaned_details.append(detail)
+        current["details"] = cleaned_details
+
+        if current.get("kind") == "project":
+            bullet = _build_project_bullet(current)
+            dedup_key = _strip_dates_for_key(current.get("title", "") + " " + current.get("tools", ""))
+        elif current.get("kind") == "education":
+            bullet = _build_education_bullet(current)
+            dedup_key = _strip_dates_for_key(current.get("title", ""))
+        else:
+            bullet = _build_experience_bullet(current)
+            dedup_key = _strip_dates_for_key(current.get("title", ""))
+
+        if bullet and len(bullet) >= 22:
+            entries.append({"bullet": bullet, "dedup_key": dedup_key})
+
+        current = None
+
+    i = 0
+    while i < len(lines):
+        row = lines[i]
+        line = row["text"]
+        is_bullet = bool(row["is_bullet"])
+        section_candidate, remainder = _section_from_line(line)
+        if section_candidate:
+            flush_current()
+            section = section_candidate
+            line = remainder
+            is_bullet = False
+            if not line:
+                i += 1
+                continue
+
+        if section == "projects":
+            if _looks_like_project_header(line):
+                flush_current()
+                current = _parse_project_header(line)
+            elif current is not None:
+                current.setdefault("details", []).append(line)
+        elif section == "education":
+            if not is_bullet and _has_date_token(line) and not _looks_like_project_header(line):
+                flush_current()
+                current = {"kind": "education", "title": line, "details": []}
+            elif current is not None:
+                current.setdefault("details", []).append(line)
+        elif section == "experience":
+            if not is_bullet and _looks_like_experience_header(line):
+                flush_current()
+                header = line
+                if i + 1 < len(lines):
+                    nxt = lines[i + 1]
+                    nxt_text = nxt["text"]
+                    if (not nxt["is_bullet"]) and _has_date_token(nxt_text) and not _has_date_token(header):
+                        header = header + " | " + nxt_text
+                        i += 1
+                current = {"kind": "experience", "title": header, "details": []}
+            elif current is not None:
+                current.setdefault("details", []).append(line)
+        elif section is None:
+            if _looks_like_project_header(line):
+                flush_current()
+                current = _parse_project_header(line)
+                section = "projects"
+            elif not is_bullet and _looks_like_experience_header(line):
+                flush_current()
+                current = {"kind": "experience", "title": line, "details": []}
+                section = "experience"
+            elif current is not None:
+                current.setdefault("details", []).append(line)
+
+        i += 1
+
+    flush_current()
+    deduped_entries, dropped = _dedup_fact_entries(entries)
+    bullets = [item["bullet"] for item in deduped_entries]
+    return bullets, {"duplicatesDropped": dropped, "parsedEntries": len(entries)}
+
+
+def _heuristic_fallback(text: str, lane: str, max_items: int = 60) -> List[str]:
+    source = str(text or "").replace("\r", "\n").strip()
+    if not source:
+        return []
+
+    lines = [line.strip() for line in re.split(r"\n+", source) if line.strip()]
+    if len(lines) < 8:
+        lines = [s.strip() for s in re.split(r"(?<=[.!?])\s+", source) if s.strip()]
+
+    if lane == "voice":
+        lines = ["Voice sample: " + x for x in lines]
+    elif lane == "company":
+        lines = ["Company signal: " + x for x in lines]
+    else:
+        lines = ["Experience: " + x for x in lines]
+
+    return _dedup_items(lines, max_items)
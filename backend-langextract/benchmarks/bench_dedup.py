@@ -0,0 +1,124 @@
+"""
+bench_dedup.py — Pairwise near-duplicate scan vs. the MinHash/LSH index.
+
+Run from backend-langextract/:
+
+    python benchmarks/bench_dedup.py [--items 10000] [--dup-rate 0.3] [--no-legacy]
+
+Generates synthetic resume bullets, a fraction of which are reworded copies
+of earlier ones, and dedups them with both implementations. Reports wall
+time, Jaccard comparisons, and whether both kept the same positions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.dedup import NearDuplicateIndex  # noqa: E402
+
+_VERBS = "built designed led shipped migrated optimized automated launched scaled refactored".split()
+_NOUNS = (
+    "pipeline service platform dashboard api scheduler cache crawler model "
+    "cluster warehouse gateway parser compiler indexer frontend backend"
+).split()
+_TECH = "python rust golang kafka spark postgres redis kubernetes terraform react pytorch airflow".split()
+_FILLER = "across teams for customers in production with monitoring using tests reducing latency cost".split()
+
+
+def _canonical_key(text: str) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9\s]", " ", text.lower())).strip()
+
+
+def _token_set(text: str) -> set:
+    lowered = _canonical_key(text)
+    return {t for t in lowered.split(" ") if len(t) > 2}
+
+
+def _is_near_duplicate(a: str, b: str) -> bool:
+    a_set = _token_set(a)
+    b_set = _token_set(b)
+    if not a_set or not b_set:
+        return False
+    overlap = len(a_set & b_set)
+    union = len(a_set | b_set)
+    if not union:
+        return False
+    score = overlap / union
+    return score >= 0.86
+
+
+def legacy_dedup(keys: List[str]) -> List[int]:
+    """The quadratic scan _dedup_items used before app.dedup existed."""
+    seen: List[str] = []
+    kept: List[int] = []
+    for pos, key in enumerate(keys):
+        if any(key == k or _is_near_duplicate(key, k) for k in seen):
+            continue
+        seen.append(key)
+        kept.append(pos)
+    return kept
+
+
+def lsh_dedup(keys: List[str]) -> List[int]:
+    index = NearDuplicateIndex()
+    kept = [pos for pos, key in enumerate(keys) if index.add(key)]
+    lsh_dedup.comparisons = index.comparisons  # type: ignore[attr-defined]
+    return kept
+
+
+def synthetic_bullets(count: int, dup_rate: float, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    bullets: List[str] = []
+    for i in range(count):
+        if bullets and rng.random() < dup_rate:
+            words = rng.choice(bullets).split(" ")
+            # Casing/punctuation changes or one swapped word keep Jaccard high.
+            if rng.random() < 0.5:
+                words = [w.upper() if rng.random() < 0.2 else w for w in words] + ["."]
+            else:
+                words[rng.randrange(len(words))] = rng.choice(_FILLER)
+            bullets.append(" ".join(words))
+            continue
+        words = [rng.choice(_VERBS), "a", rng.choice(_NOUNS), rng.choice(_NOUNS)]
+        words += rng.sample(_TECH, 3) + rng.sample(_FILLER, 6)
+        words.append(f"project{i}")
+        words.append(f"{rng.randint(5, 95)}percent")
+        bullets.append(" ".join(words))
+    return bullets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--dup-rate", type=float, default=0.3)
+    parser.add_argument("--no-legacy", action="store_true", help="skip the quadratic baseline")
+    args = parser.parse_args()
+
+    keys = [_canonical_key(b) for b in synthetic_bullets(args.items, args.dup_rate)]
+    print(f"items={len(keys)} dup_rate={args.dup_rate}")
+
+    start = time.perf_counter()
+    lsh_kept = lsh_dedup(keys)
+    lsh_seconds = time.perf_counter() - start
+    print(f"minhash/lsh: {lsh_seconds:8.3f}s  kept={len(lsh_kept)}  comparisons={lsh_dedup.comparisons}")
+
+    if args.no_legacy:
+        return
+
+    start = time.perf_counter()
+    legacy_kept = legacy_dedup(keys)
+    legacy_seconds = time.perf_counter() - start
+    print(f"pairwise:    {legacy_seconds:8.3f}s  kept={len(legacy_kept)}")
+    print(f"speedup:     {legacy_seconds / max(lsh_seconds, 1e-9):8.1f}x  identical={lsh_kept == legacy_kept}")
+
+
+if __name__ == "__main__":
+    main()
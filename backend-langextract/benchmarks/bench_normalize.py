@@ -0,0 +1,91 @@
+"""
+bench_normalize.py — Per-CV heuristic parsing time before and after app/normalize.py.
+
+Run from backend-langextract/ (needs the app's requirements installed):
+
+    python benchmarks/bench_normalize.py [--cvs 200] [--roles 8] [--repeat 15]
+
+"before" is the frozen parser in _legacy_heuristics.py; "after" is the live
+one in app.cv_parser / app.main. Both run the structured fact parser and the heuristic lane
+fallback over the same synthetic CVs, and their outputs are compared.
+"cold" clears the per-line memo before each pass; "warm" re-parses CVs the
+process has already seen. Both sides share app.dedup, so the numbers isolate
+normalization and parsing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("CACHE_PATH", os.path.join(tempfile.mkdtemp(), "bench.sqlite3"))
+os.environ.setdefault("INDEX_PERSIST", "0")
+
+import _legacy_heuristics as legacy  # noqa: E402
+from corpus import synthetic_cv  # noqa: E402
+from app import cv_parser, main, normalize  # noqa: E402
+
+
+def _stages(parse_facts: Callable[[str], object], module) -> Dict[str, Callable[[str], object]]:
+    return {
+        "facts": parse_facts,
+        "fallback": lambda cv: module._heuristic_fallback(cv, "facts", 72),
+    }
+
+
+def _clear_memo() -> None:
+    normalize._analyze.cache_clear()
+    normalize.key_tokens.cache_clear()
+    normalize.canonical_key.cache_clear()
+
+
+def _ms_per_cv(fn: Callable[[str], object], cvs: List[str], clear: bool) -> float:
+    if clear:
+        _clear_memo()
+    start = time.perf_counter()
+    for cv in cvs:
+        fn(cv)
+    return (time.perf_counter() - start) * 1000 / len(cvs)
+
+
+def main_() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cvs", type=int, default=200)
+    parser.add_argument("--roles", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    cvs = [synthetic_cv(rng, args.roles) for _ in range(args.cvs)]
+    before = _stages(legacy._extract_structured_fact_entries, legacy)
+    after = _stages(cv_parser.extract_fact_entries, main)
+
+    mismatches = sum(1 for cv in cvs for stage in before if before[stage](cv) != after[stage](cv))
+    print(f"cvs={len(cvs)} avg_chars={sum(map(len, cvs)) // len(cvs)} output_mismatches={mismatches}")
+
+    gc.disable()
+    for stage in before:
+        samples: Dict[str, List[float]] = {"before": [], "after (cold)": [], "after (warm)": []}
+        # Interleave the variants so machine noise hits all of them alike.
+        for _ in range(args.repeat):
+            samples["before"].append(_ms_per_cv(before[stage], cvs, clear=True))
+            samples["after (cold)"].append(_ms_per_cv(after[stage], cvs, clear=True))
+            samples["after (warm)"].append(_ms_per_cv(after[stage], cvs, clear=False))
+        base = statistics.median(samples["before"])
+        for label, values in samples.items():
+            median = statistics.median(values)
+            print(f"{stage:<9} {label:<13} median {median:7.3f} ms/CV  best {min(values):7.3f}  x{base / median:5.2f}")
+    gc.enable()
+
+
+if __name__ == "__main__":
+    main_()
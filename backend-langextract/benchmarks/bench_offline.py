@@ -0,0 +1,250 @@
+"""
+bench_offline.py — Throughput, latency and memory of the extraction and embed paths, offline.
+
+Run from backend-langextract/ (needs the app's requirements installed, but no
+API key or network):
+
+    python benchmarks/bench_offline.py [--targets lanes,resume,embed]
+        [--concurrency 1,4,16,64,256] [--latency-ms 40] [--failure-rate 0.02]
+
+The upstream providers are replaced by fake_providers.FakeProviders, so the
+numbers measure the server itself (routing, hedging, coalescing, caches,
+thread pools, dedup, serialization) against a model with a known latency
+distribution and error rate. Targets:
+
+  lanes   POST /extract-structured-lanes (three _extract_with_langextract lanes)
+  resume  main._extract_resume_shared, i.e. extract_from_text (or the
+          section-incremental variant) as the PDF endpoints run it after parsing
+  embed   POST /embed with --embed-texts bullets per request
+
+Each concurrency level runs closed-loop: that many clients each send
+requests back to back over the ASGI app in-process until the level's
+request count is reached. Every request carries a freshly generated CV of
+random size, so caches and coalescing only help where inputs repeat inside
+one request. Reported per level: completed requests/s, p50/p95/p99 latency,
+non-200 responses (429s included: each simulated client has its own peer
+address, so the admission limits apply per client as in production),
+fake upstream calls per request, RSS after the level
+and, with --tracemalloc, the peak Python heap during it (tracing slows
+everything down, so compare heap numbers only with each other).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("CACHE_PATH", os.path.join(tempfile.mkdtemp(), "bench.sqlite3"))
+os.environ.setdefault("INDEX_PERSIST", "0")
+# Any non-empty key enables the model paths; the fake providers ignore it.
+os.environ.setdefault("LANGEXTRACT_API_KEY", "offline-benchmark")
+
+import httpx  # noqa: E402
+
+from corpus import cv_corpus, synthetic_bullets, synthetic_job_post, synthetic_writing_sample  # noqa: E402
+from fake_providers import FakeEmbedder, FakeLLM, FakeProviders, LatencyModel, install  # noqa: E402
+from app import main  # noqa: E402
+from app.router import _percentile  # noqa: E402
+
+_Request = Callable[[httpx.AsyncClient], Awaitable[int]]
+
+
+def _rss_mb() -> Optional[float]:
+    """Current resident set size (Linux), else None."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as fh:
+            pages = int(fh.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _make_requests(target: str, count: int, rng: random.Random, args: argparse.Namespace) -> List[_Request]:
+    cvs = cv_corpus(rng, count, args.min_roles, args.max_roles)
+
+    if target == "lanes":
+        def lanes(cv: str, voice: str, company: str) -> _Request:
+            async def send(client: httpx.AsyncClient) -> int:
+                body = {"factText": cv, "voiceText": voice, "companyText": company}
+                return (await client.post("/extract-structured-lanes", json=body)).status_code
+            return send
+
+        return [lanes(cv, synthetic_writing_sample(rng), synthetic_job_post(rng)) for cv in cvs]
+
+    if target == "resume":
+        def resume(cv: str) -> _Request:
+            async def send(_client: httpx.AsyncClient) -> int:
+                result = await main._extract_resume_shared(cv)
+                return 200 if result.get("ok") else 502
+            return send
+
+        return [resume(cv) for cv in cvs]
+
+    def embed(texts: List[str]) -> _Request:
+        async def send(client: httpx.AsyncClient) -> int:
+            body = {"texts": texts, "encoding": args.embed_encoding}
+            return (await client.post("/embed", json=body)).status_code
+        return send
+
+    return [embed(synthetic_bullets(rng, args.embed_texts)) for _ in range(count)]
+
+
+_CLIENT_NUMBERS = itertools.count(1)
+
+
+def _client() -> httpx.AsyncClient:
+    # A peer address per simulated client, so per-client rate limits apply as in production.
+    n = next(_CLIENT_NUMBERS)
+    transport = httpx.ASGITransport(app=main.app, client=(f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}", 40000))
+    return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None)
+
+
+async def _run_level(requests: List[_Request], concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    failures = 0
+    pending = iter(requests)
+
+    async def worker() -> None:
+        nonlocal failures
+        async with _client() as client:
+            for send in pending:
+                started = time.perf_counter()
+                try:
+                    status = await send(client)
+                except Exception:  # noqa: BLE001
+                    status = 0
+                latencies.append(time.perf_counter() - started)
+                if status != 200:
+                    failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "failed": failures,
+        "wallSeconds": round(wall, 3),
+        "throughput": round((len(ordered) - failures) / wall, 2) if wall > 0 else None,
+        "p50Ms": round(_percentile(ordered, 50) * 1000, 1),
+        "p95Ms": round(_percentile(ordered, 95) * 1000, 1),
+        "p99Ms": round(_percentile(ordered, 99) * 1000, 1),
+    }
+
+
+async def _bench(args: argparse.Namespace, providers: FakeProviders) -> List[Dict[str, Any]]:
+    rng = random.Random(args.seed)
+    rows: List[Dict[str, Any]] = []
+    for target in args.targets:
+        # Warm imports, regexes and thread pools outside the measurements.
+        async with _client() as client:
+            for send in _make_requests(target, 2, rng, args):
+                await send(client)
+        for concurrency in args.concurrency:
+            count = max(args.min_requests, concurrency * args.requests_per_client)
+            requests = _make_requests(target, count, rng, args)
+            calls_before = providers.llm.calls + providers.embedder.calls
+            if args.tracemalloc:
+                tracemalloc.reset_peak()
+            row = {"target": target, "concurrency": concurrency}
+            row.update(await _run_level(requests, concurrency))
+            calls = providers.llm.calls + providers.embedder.calls - calls_before
+            row["upstreamPerRequest"] = round(calls / max(1, row["requests"]), 2)
+            rss = _rss_mb()
+            row["rssMb"] = round(rss, 1) if rss is not None else None
+            row["heapPeakMb"] = (
+                round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1) if args.tracemalloc else None
+            )
+            rows.append(row)
+            _print_row(row)
+    return rows
+
+
+_COLUMNS = (
+    ("target", "{:<7}"), ("concurrency", "{:>5}"), ("requests", "{:>6}"), ("failed", "{:>5}"),
+    ("throughput", "{:>8}"), ("p50Ms", "{:>9}"), ("p95Ms", "{:>9}"), ("p99Ms", "{:>9}"),
+    ("upstreamPerRequest", "{:>6}"), ("rssMb", "{:>7}"), ("heapPeakMb", "{:>7}"),
+)
+_HEADERS = ("target", "conc", "reqs", "fail", "req/s", "p50 ms", "p95 ms", "p99 ms", "up/req", "rss MB", "heap MB")
+
+
+def _print_row(row: Dict[str, Any]) -> None:
+    cells = [fmt.format("-" if row[key] is None else row[key]) for key, fmt in _COLUMNS]
+    print("  ".join(cells), flush=True)
+
+
+def _csv_ints(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def main_() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--targets", default="lanes,resume,embed")
+    parser.add_argument("--concurrency", type=_csv_ints, default=[1, 4, 16, 64, 256])
+    parser.add_argument("--requests-per-client", type=int, default=2)
+    parser.add_argument("--min-requests", type=int, default=16)
+    parser.add_argument("--min-roles", type=int, default=2)
+    parser.add_argument("--max-roles", type=int, default=16)
+    parser.add_argument("--embed-texts", type=int, default=32)
+    parser.add_argument("--embed-encoding", default="json")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="fake lx.extract base latency")
+    parser.add_argument("--per-kchar-ms", type=float, default=10.0, help="extra fake latency per 1000 input chars")
+    parser.add_argument("--embed-latency-ms", type=float, default=15.0)
+    parser.add_argument("--jitter", type=float, default=0.3, help="lognormal sigma applied to every latency")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of calls failing with a 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of calls failing with a 429")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--tracemalloc", action="store_true")
+    parser.add_argument("--json", type=Path, help="also write the rows to this file")
+    args = parser.parse_args()
+    args.targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    unknown = set(args.targets) - {"lanes", "resume", "embed"}
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(sorted(unknown))}")
+
+    def latency(base_ms: float, per_kchar_ms: float, seed: int) -> LatencyModel:
+        return LatencyModel(
+            base_ms, per_kchar_ms, args.jitter, args.failure_rate, args.rate_limit_rate, seed=seed,
+        )
+
+    providers = FakeProviders(
+        FakeLLM(latency(args.latency_ms, args.per_kchar_ms, args.seed)),
+        FakeEmbedder(latency(args.embed_latency_ms, 0.0, args.seed + 1)),
+    )
+    install(main, providers)
+
+    print(
+        f"fake llm {args.latency_ms:g}ms + {args.per_kchar_ms:g}ms/kchar, embed {args.embed_latency_ms:g}ms, "
+        f"jitter {args.jitter:g}, failures {args.failure_rate:g}, 429s {args.rate_limit_rate:g}; "
+        f"router={'on' if main._ROUTER else 'off'} hedging={'on' if main._HEDGER else 'off'} "
+        f"coalescing={'on' if main._LANE_FLIGHTS else 'off'}"
+    )
+    print("  ".join(fmt.format(h) for h, (_, fmt) in zip(_HEADERS, _COLUMNS)))
+    if args.tracemalloc:
+        tracemalloc.start()
+    rows = asyncio.run(_bench(args, providers))
+    print(f"peak rss {_peak_rss_mb():.1f} MB")
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,95 @@
+"""
+corpus.py — Synthetic CVs, writing samples, job posts and bullets for the benchmarks.
+
+Everything is generated from a seeded random.Random, so a given seed always
+yields the same corpus. CV size is controlled by the number of roles (each
+adds a heading, dates and 2-5 bullets, plus a project every second role).
+"""
+
+from __future__ import annotations
+
+import random
+from typing import List
+
+_BULLET = "\xe2€\xa2"
+_ROLES = ["Software Engineer", "Research Intern", "Data Analyst", "Team Lead", "ML Engineer", "Founder"]
+_ORGS = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Vandelay Industries"]
+_TOOLS = ["Python", "Rust", "React", "PostgreSQL", "Kafka", "PyTorch", "Docker", "AWS", "Go", "Redis"]
+_VERBS = ["Built", "Designed", "Led", "Shipped", "Migrated", "Optimized", "Automated", "Scaled"]
+_THINGS = ["a billing pipeline", "the search service", "an ETL platform", "a mobile app", "the model server"]
+_MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+_OPENERS = ["Honestly,", "In short,", "What excites me is that", "I like to think", "Put simply,", "For me,"]
+_VALUES = ["ownership", "fast feedback loops", "boring technology", "clear writing", "measurable impact"]
+_PRODUCTS = ["payments API", "developer platform", "search ranking", "fraud detection", "mobile checkout"]
+
+
+def _dates(rng: random.Random) -> str:
+    year = rng.randint(2015, 2024)
+    end = "Present" if rng.random() < 0.2 else f"{rng.choice(_MONTHS)} {year + rng.randint(0, 2)}"
+    return f"{rng.choice(_MONTHS)} {year} - {end}"
+
+
+def _detail(rng: random.Random) -> str:
+    return (
+        f"{rng.choice(_VERBS)} {rng.choice(_THINGS)} with {rng.choice(_TOOLS)} and {rng.choice(_TOOLS)}, "
+        f"cutting latency by {rng.randint(5, 80)}% for {rng.randint(2, 900)}k users"
+    )
+
+
+def synthetic_cv(rng: random.Random, roles: int) -> str:
+    out: List[str] = ["Jane Doe", "jane@example.com | +447700900123 | github.com/jdoe", ""]
+    out.append("Education")
+    out.append(f"University College London  BSc Computer Science  {_dates(rng)}")
+    out.append(f"{_BULLET} First class honours, modules in {rng.choice(_TOOLS)} and distributed systems")
+    out.append("Work Experience")
+    for _ in range(roles):
+        out.append(f"{rng.choice(_ROLES)} - {rng.choice(_ORGS)}")
+        out.append(_dates(rng))
+        for _ in range(rng.randint(2, 5)):
+            out.append(f"{_BULLET} {_detail(rng)}")
+    out.append("Technical Projects")
+    for n in range(max(2, roles // 2)):
+        tools = ", ".join(rng.sample(_TOOLS, 3))
+        out.append(f"Project {n} {rng.choice(_THINGS).title()} | {tools} {_dates(rng)}")
+        for _ in range(rng.randint(1, 3)):
+            out.append(f"- {_detail(rng)}")
+    out.append("Technical Skills")
+    out.append("Languages: " + ", ".join(_TOOLS))
+    return "\n".join(out)
+
+
+def cv_corpus(rng: random.Random, count: int, min_roles: int = 2, max_roles: int = 16) -> List[str]:
+    """count CVs with a uniformly drawn number of roles, i.e. of varying length."""
+    return [synthetic_cv(rng, rng.randint(min_roles, max(min_roles, max_roles))) for _ in range(count)]
+
+
+def synthetic_writing_sample(rng: random.Random, paragraphs: int = 3) -> str:
+    """A cover-letter style text for the voice lane."""
+    out: List[str] = []
+    for _ in range(paragraphs):
+        sentences = [
+            f"{rng.choice(_OPENERS)} I care about {rng.choice(_VALUES)} more than {rng.choice(_VALUES)}.",
+            f"{rng.choice(_VERBS)} {rng.choice(_THINGS)} taught me to keep things small and measurable.",
+            f"I usually reach for {rng.choice(_TOOLS)} first, then prove it with numbers.",
+        ]
+        rng.shuffle(sentences)
+        out.append(" ".join(sentences))
+    return "\n\n".join(out)
+
+
+def synthetic_job_post(rng: random.Random, requirements: int = 6) -> str:
+    """A job advert for the company lane."""
+    out = [
+        f"{rng.choice(_ORGS)} — {rng.choice(_ROLES)} Intern",
+        f"We are building the {rng.choice(_PRODUCTS)} used by {rng.randint(1, 90)} million people.",
+        "What you will do:",
+    ]
+    for _ in range(requirements):
+        out.append(f"- Work on {rng.choice(_THINGS)} using {rng.choice(_TOOLS)} with a focus on {rng.choice(_VALUES)}")
+    out.append(f"We value {rng.choice(_VALUES)} and {rng.choice(_VALUES)}.")
+    return "\n".join(out)
+
+
+def synthetic_bullets(rng: random.Random, count: int) -> List[str]:
+    """Short CV bullets, e.g. texts to embed."""
+    return [_detail(rng) for _ in range(count)]
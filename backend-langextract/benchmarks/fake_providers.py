@@ -0,0 +1,183 @@
+"""
+fake_providers.py — Local stand-ins for lx.extract and the genai embedding client.
+
+FakeProviders has the surface of app.providers.ProviderPool that the app
+uses (extract(**kwargs), .genai, stats()), so install() can swap it in for
+main._PROVIDERS and every extraction and embedding request is served
+locally, with no API key or network.
+
+Outputs are deterministic functions of the input: each input line long
+enough to be a fact becomes one extraction, classed from the classes the
+prompt asks for; each text embeds to a fixed unit vector seeded from its
+hash. Latency and failures are random but seeded: a call sleeps for a
+lognormal time around base + per-kchar cost, and fails with a 503 or a 429
+at the configured rates, so the router, hedger and embed retries see the
+same kinds of errors they would upstream.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Extraction classes the app's prompts ask for, in the order they are assigned.
+_CLASSES = (
+    "contact", "education", "experience", "project", "skill",
+    "tone", "voice_pattern", "product_priority", "engineering_goal",
+)
+_DEFAULT_CLASSES = ("experience", "project", "education")
+_MIN_LINE_CHARS = 20
+_IMPACT_RE = re.compile(r"\d+(?:\.\d+)?\s*%|\d+k users")
+
+
+class FakeUpstreamError(Exception):
+    """An injected upstream failure; carries the HTTP status in .code like genai's APIError."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class LatencyModel:
+    """Seeded latency and failure draws shared by the fake LLM and embedder."""
+
+    def __init__(
+        self,
+        base_ms: float,
+        per_kchar_ms: float = 0.0,
+        jitter: float = 0.3,
+        failure_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.base_ms = base_ms
+        self.per_kchar_ms = per_kchar_ms
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self, chars: int) -> float:
+        """Seconds for a call over chars of input; raises FakeUpstreamError if the call should fail."""
+        with self._lock:
+            noise = self._rng.lognormvariate(0.0, self.jitter) if self.jitter > 0 else 1.0
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            raise FakeUpstreamError(429, "RESOURCE_EXHAUSTED (injected)")
+        if roll < self.rate_limit_rate + self.failure_rate:
+            raise FakeUpstreamError(503, "UNAVAILABLE (injected)")
+        return max(0.0, (self.base_ms + self.per_kchar_ms * chars / 1000.0) * noise / 1000.0)
+
+
+class FakeLLM:
+    """Deterministic lx.extract: one extraction per substantive input line."""
+
+    def __init__(self, latency: LatencyModel, max_extractions: int = 40) -> None:
+        self.latency = latency
+        self.max_extractions = max_extractions
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def extract(self, **kwargs: Any) -> Any:
+        with self._lock:
+            self.calls += 1
+        source = str(kwargs.get("text_or_documents") or "")
+        prompt = str(kwargs.get("prompt_description") or "")
+        delay = self.latency.draw(len(source))
+        time.sleep(delay)
+
+        classes = [c for c in _CLASSES if re.search(rf"\b{c}\b", prompt)] or list(_DEFAULT_CLASSES)
+        extractions = []
+        for line in source.splitlines():
+            text = line.strip(" \t-*\xe2€\xa2")
+            if len(text) < _MIN_LINE_CHARS:
+                continue
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+            attributes: Dict[str, Any] = {}
+            impact = _IMPACT_RE.search(text)
+            if impact:
+                attributes["impact"] = impact.group(0)
+            extractions.append(SimpleNamespace(
+                extraction_class=classes[digest[0] % len(classes)],
+                extraction_text=text,
+                attributes=attributes,
+            ))
+            if len(extractions) >= self.max_extractions:
+                break
+        return SimpleNamespace(extractions=extractions)
+
+
+class _Models:
+    def __init__(self, embedder: "FakeEmbedder") -> None:
+        self._embedder = embedder
+
+    async def embed_content(self, model: str, contents: List[str], config: Any = None) -> Any:
+        return await self._embedder.embed(contents, config)
+
+
+class FakeEmbedder:
+    """Deterministic genai client: only ``client.aio.models.embed_content`` is provided."""
+
+    def __init__(self, latency: LatencyModel, dimension: int = 768) -> None:
+        self.latency = latency
+        self.dimension = dimension
+        self.calls = 0
+        self.aio = SimpleNamespace(models=_Models(self))
+
+    def vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+        values = np.random.default_rng(seed).standard_normal(self.dimension)
+        return (values / math.sqrt(float(values @ values))).tolist()
+
+    async def embed(self, contents: List[str], config: Any = None) -> Any:
+        self.calls += 1  # event loop only
+        dimension = getattr(config, "output_dimensionality", None) or self.dimension
+        await asyncio.sleep(self.latency.draw(sum(len(text) for text in contents)))
+        vectors = [self.vector(text)[:dimension] for text in contents]
+        return SimpleNamespace(embeddings=[SimpleNamespace(values=v) for v in vectors])
+
+
+class FakeProviders:
+    """Drop-in for ProviderPool backed by FakeLLM and FakeEmbedder."""
+
+    def __init__(self, llm: FakeLLM, embedder: FakeEmbedder) -> None:
+        self.llm = llm
+        self.embedder = embedder
+
+    def start(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+    @property
+    def genai(self) -> Any:
+        return self.embedder
+
+    def extract(self, **kwargs: Any) -> Any:
+        return self.llm.extract(**kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"fake": True, "extractCalls": self.llm.calls, "embedCalls": self.embedder.calls}
+
+
+def install(main: Any, providers: FakeProviders, genai_types: Optional[Any] = None) -> None:
+    """Route the app's extraction and embedding calls to providers.
+
+    main is the app.main module. Without google-genai installed, a minimal
+    stand-in for genai.types (EmbedContentConfig only) is installed too.
+    """
+    main._PROVIDERS = providers
+    if not main._HAS_GENAI:
+        main._genai_types = genai_types or SimpleNamespace(EmbedContentConfig=lambda **kw: SimpleNamespace(**kw))
+        main._HAS_GENAI = True
@@ -4,15 +4,28 @@ extract_resume.py — Resume extraction module using LangExtract (Google Gemini)
 Public API:
   group_extractions(extractions) -> dict   (used by vendor_main.py)
   extract_from_text(text, api_key) -> dict (used by the FastAPI backend)
+  extract_sections_incremental(sections, api_key, cache) -> dict
+                                           (section-level re-extraction with a result cache)
+  split_into_chunks(text, max_chars, overlap_chars) -> list
+                                           (boundary-aware chunking for oversized inputs)
+  walk_candidates(candidates, attempt, router, hedger) -> tuple
+                                           (model fallback walk, shared with the lane extractor)
 """
 
 from __future__ import annotations
 
+import contextvars
+import hashlib
+import logging
 import re
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import langextract as lx
 
+logger = logging.getLogger(__name__)
+
 # ---------------------------------------------------------------------------
 # Model candidates (Google Gemini via AI Studio key)
 # ---------------------------------------------------------------------------
@@ -23,6 +36,12 @@ DEFAULT_MODEL_CANDIDATES: List[str] = [
 ]
 
 MAX_INPUT_CHARS = 40_000
+# Inputs above MAX_INPUT_CHARS are split into overlapping chunks extracted in parallel.
+CHUNK_OVERLAP_CHARS = 1_000
+MAX_CHUNKS = 12
+# Threads shared by every chunked extraction in the process.
+CHUNK_WORKERS = 4
+_CHUNK_POOL = ThreadPoolExecutor(max_workers=CHUNK_WORKERS, thread_name_prefix="resume-chunk")
 
 # ---------------------------------------------------------------------------
 # Extraction prompt — comprehensive resume parser with structured output
@@ -204,6 +223,77 @@ def group_extractions(extractions: List[Any]) -> Dict[str, Any]:
     return result
 
 
+# ---------------------------------------------------------------------------
+# split_into_chunks — boundary-aware splitting for inputs above MAX_INPUT_CHARS
+# ---------------------------------------------------------------------------
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _split_units(text: str, max_chars: int) -> List[str]:
+    """Break text into pieces no longer than max_chars, preferring the
+    coarsest boundary available: paragraphs, then lines, then sentences."""
+    units: List[str] = []
+    for paragraph in _PARAGRAPH_SPLIT_RE.split(text):
+        if len(paragraph) <= max_chars:
+            units.append(paragraph)
+            continue
+        for line in paragraph.split("\n"):
+            if len(line) <= max_chars:
+                units.append(line)
+                continue
+            for sentence in _SENTENCE_SPLIT_RE.split(line):
+                while len(sentence) > max_chars:
+                    units.append(sentence[:max_chars])
+                    sentence = sentence[max_chars:]
+                units.append(sentence)
+    return [u for u in units if u.strip()]
+
+
+def split_into_chunks(text: str, max_chars: int, overlap_chars: int = CHUNK_OVERLAP_CHARS) -> List[str]:
+    """Split text into chunks of at most max_chars on paragraph/line boundaries.
+
+    Each chunk after the first repeats up to overlap_chars of whole trailing
+    pieces from the previous chunk, so entries straddling a seam appear intact
+    in at least one chunk; when the last piece alone is longer than that, its
+    final overlap_chars characters (from a word boundary) are repeated instead.
+    Text that fits in one chunk is returned unchanged.
+    """
+    source = str(text or "").strip()
+    if len(source) <= max_chars:
+        return [source] if source else []
+
+    overlap_chars = max(0, min(overlap_chars, max_chars // 4))
+    units = _split_units(source, max_chars - overlap_chars)
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+
+    for unit in units:
+        if current and size + len(unit) + 1 > max_chars:
+            chunks.append("\n".join(current))
+            carried: List[str] = []
+            carried_size = 0
+            for prev in reversed(current):
+                if carried_size + len(prev) + 1 > overlap_chars:
+                    break
+                carried.insert(0, prev)
+                carried_size += len(prev) + 1
+            if not carried and overlap_chars:
+                tail = current[-1][-(overlap_chars - 1):]
+                space = tail.find(" ")
+                tail = (tail[space + 1:] if 0 <= space < len(tail) // 2 else tail).strip()
+                if tail:
+                    carried, carried_size = [tail], len(tail) + 1
+            current, size = carried, carried_size
+        current.append(unit)
+        size += len(unit) + 1
+
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
 # ---------------------------------------------------------------------------
 # extract_from_text — main extraction pipeline called by the API backend
 # ---------------------------------------------------------------------------
@@ -213,13 +303,150 @@ def _safe_get(obj: Any, name: str, default: Any = None) -> Any:
     return getattr(obj, name, default)
 
 
+def _extraction_to_dict(item: Any) -> Dict[str, Any]:
+    attributes = _safe_get(item, "attributes", {}) or {}
+    return {
+        "extraction_class": str(_safe_get(item, "extraction_class", "") or ""),
+        "extraction_text": str(_safe_get(item, "extraction_text", "") or ""),
+        "attributes": dict(attributes) if isinstance(attributes, dict) else {},
+    }
+
+
+def walk_candidates(
+    candidates: Sequence[str],
+    attempt: Any,
+    router: Optional[Any] = None,
+    hedger: Optional[Any] = None,
+    passthrough: Tuple[type, ...] = (),
+) -> Tuple[Any, Optional[str], Optional[str]]:
+    """Call attempt(model_id) until one succeeds; return (result | None, model, last_error).
+
+    router: optional object with ``order(candidates)`` and
+    ``record(model_id, seconds, error)`` (the backend's ModelRouter); it
+    reorders the candidates by health and is told the outcome of each call.
+    hedger: optional object with ``run(candidates, attempt)`` (the backend's
+    Hedger) that replaces the sequential walk with hedged calls; it does its
+    own ordering and reporting.
+    passthrough: exception types raised to the caller instead of moving on to
+    the next candidate, e.g. the backend's Overloaded when its own admission
+    control sheds the call.
+    """
+    if hedger is not None:
+        return hedger.run(candidates, attempt, passthrough)
+
+    last_error: Optional[str] = None
+    for model_id in (router.order(candidates) if router is not None else candidates):
+        started = time.perf_counter()
+        try:
+            result = attempt(model_id)
+        except passthrough:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            if router is not None:
+                router.record(model_id, time.perf_counter() - started, exc)
+            last_error = str(exc)
+            continue
+        if router is not None:
+            router.record(model_id, time.perf_counter() - started)
+        return result, model_id, None
+
+    return None, None, last_error
+
+
+def _run_extraction(
+    source: str,
+    api_key: str,
+    candidates: Sequence[str],
+    provider: Optional[Any],
+    router: Optional[Any] = None,
+    hedger: Optional[Any] = None,
+    passthrough: Tuple[type, ...] = (),
+) -> Tuple[Optional[List[Any]], Optional[str], Optional[str]]:
+    """Walk the model candidates (see walk_candidates); return (extractions | None, model, last_error)."""
+    run_extract = provider.extract if provider is not None else lx.extract
+
+    def attempt(model_id: str) -> Any:
+        return run_extract(
+            text_or_documents=source,
+            prompt_description=RESUME_EXTRACTION_PROMPT,
+            examples=RESUME_EXAMPLES,
+            model_id=model_id,
+            api_key=api_key,
+            fence_output=True,
+        )
+
+    result, model_id, last_error = walk_candidates(candidates, attempt, router, hedger, passthrough)
+    if model_id is None:
+        return None, None, last_error
+    return list(_safe_get(result, "extractions", []) or []), model_id, None
+
+
+def _dedup_extractions(items: List[Any]) -> List[Any]:
+    """Drop repeats of the same (class, text) — e.g. entries seen in two
+    overlapping chunks — keeping the first occurrence."""
+    seen = set()
+    kept: List[Any] = []
+    for item in items:
+        text = re.sub(r"[^a-z0-9]+", " ", str(_safe_get(item, "extraction_text", "") or "").lower()).strip()
+        key = (str(_safe_get(item, "extraction_class", "") or ""), text)
+        if text and key in seen:
+            continue
+        seen.add(key)
+        kept.append(item)
+    return kept
+
+
+def _run_chunked_extraction(
+    chunks: Sequence[str],
+    api_key: str,
+    candidates: Sequence[str],
+    provider: Optional[Any],
+    router: Optional[Any] = None,
+    hedger: Optional[Any] = None,
+    passthrough: Tuple[type, ...] = (),
+) -> Tuple[Optional[List[Any]], Optional[str], Optional[str]]:
+    """Extract chunks in parallel and merge them in order; None if all failed."""
+    if len(chunks) == 1:
+        return _run_extraction(chunks[0], api_key, candidates, provider, router, hedger, passthrough)
+
+    # Each chunk runs in a copy of the caller's context, so context-local
+    # state set by the caller (e.g. per-request timings) reaches the provider.
+    outcomes = list(_CHUNK_POOL.map(
+        lambda chunk, ctx: ctx.run(
+            _run_extraction, chunk, api_key, candidates, provider, router, hedger, passthrough
+        ),
+        chunks,
+        [contextvars.copy_context() for _ in chunks],
+    ))
+
+    merged = [item for extractions, _, _ in outcomes if extractions for item in extractions]
+    models = [model_id for extractions, model_id, _ in outcomes if extractions is not None]
+    errors = [error for extractions, _, error in outcomes if extractions is None and error]
+    if not models:
+        return None, None, errors[-1] if errors else None
+    error = f"{len(errors)} of {len(chunks)} chunks failed: {errors[-1]}" if errors else None
+    return _dedup_extractions(merged), models[0], error
+
+
 def extract_from_text(
     text: str,
     api_key: str,
     model_candidates: Optional[List[str]] = None,
+    provider: Optional[Any] = None,
+    router: Optional[Any] = None,
+    hedger: Optional[Any] = None,
+    passthrough: Tuple[type, ...] = (),
 ) -> Dict[str, Any]:
     """Run LangExtract on resume text and return structured grouped JSON.
 
+    provider: optional object with an ``extract(**kwargs)`` method wrapping
+    lx.extract (e.g. the backend's pooled ProviderPool); defaults to lx.extract.
+    router / hedger / passthrough: optional health-aware routing, hedged
+    calls and errors to raise rather than fall back on (see walk_candidates).
+    Text longer than MAX_INPUT_CHARS is split with split_into_chunks and the
+    chunks are extracted in parallel. Chunks past MAX_CHUNKS are not
+    extracted; "truncated" and "dropped_chunks" report it.
+
     Returns a dict:
       {
         "ok": bool,
@@ -227,47 +454,194 @@ def extract_from_text(
         "error": str | None,
         "grouped": { ...grouped by class... },
         "raw_count": int,
+        "chunks": int,
+        "truncated": bool,
+        "dropped_chunks": int,
       }
     """
     source = str(text or "").strip()
-    if len(source) > MAX_INPUT_CHARS:
-        source = source[:MAX_INPUT_CHARS]
 
     if not source:
-        return {"ok": False, "model": None, "error": "Empty text", "grouped": {}, "raw_count": 0}
-
+        return {
+            "ok": False, "model": None, "error": "Empty text", "grouped": {}, "raw_count": 0, "chunks": 0,
+            "truncated": False, "dropped_chunks": 0,
+        }
+
+    chunks = split_into_chunks(source, MAX_INPUT_CHARS)
+    dropped = max(0, len(chunks) - MAX_CHUNKS)
+    chunks = chunks[:MAX_CHUNKS]
     candidates = model_candidates or DEFAULT_MODEL_CANDIDATES
-    last_error: Optional[str] = None
+    raw_extractions, model_id, last_error = _run_chunked_extraction(
+        chunks, api_key, candidates, provider, router, hedger, passthrough
+    )
 
-    for model_id in candidates:
-        try:
-            result = lx.extract(
-                text_or_documents=source,
-                prompt_description=RESUME_EXTRACTION_PROMPT,
-                examples=RESUME_EXAMPLES,
-                model_id=model_id,
-                api_key=api_key,
-                fence_output=True,
-            )
-
-            raw_extractions = _safe_get(result, "extractions", []) or []
-
-            grouped = group_extractions(raw_extractions)
-            return {
-                "ok": True,
-                "model": model_id,
-                "error": None,
-                "grouped": grouped,
-                "raw_count": len(raw_extractions),
-            }
-        except Exception as exc:  # noqa: BLE001
-            last_error = str(exc)
-            continue
+    if raw_extractions is None:
+        return {
+            "ok": False,
+            "model": None,
+            "error": last_error,
+            "grouped": {},
+            "raw_count": 0,
+            "chunks": len(chunks),
+            "truncated": bool(dropped),
+            "dropped_chunks": dropped,
+        }
 
     return {
-        "ok": False,
-        "model": None,
+        "ok": True,
+        "model": model_id,
         "error": last_error,
-        "grouped": {},
-        "raw_count": 0,
+        "grouped": group_extractions(raw_extractions),
+        "raw_count": len(raw_extractions),
+        "chunks": len(chunks),
+        "truncated": bool(dropped),
+        "dropped_chunks": dropped,
+    }
+
+
+# ---------------------------------------------------------------------------
+# extract_sections_incremental — only re-extract sections that changed
+# ---------------------------------------------------------------------------
+# Bump when the prompt, examples or extraction post-processing change.
+SECTION_CACHE_VERSION = "1"
+# Sections shorter than this are merged into a neighbouring section.
+MIN_SECTION_CHARS = 20
+
+
+def _section_key(section_text: str, candidates: Sequence[str]) -> str:
+    lines = section_text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    normalized = "\n".join(re.sub(r"[ \t]+", " ", line).strip() for line in lines).strip()
+    digest = hashlib.sha256()
+    for part in (SECTION_CACHE_VERSION, RESUME_EXTRACTION_PROMPT, ",".join(candidates), normalized):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def _merge_short_sections(sections: Sequence[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Fold sections under MIN_SECTION_CHARS (e.g. a one-line skills list)
+    into the previous section, or the next one when there is no previous."""
+    merged: List[List[str]] = []
+    leading = ""
+    for name, body in sections:
+        body = str(body or "").strip()
+        if not body:
+            continue
+        if leading:
+            body, leading = f"{leading}\n{body}", ""
+        if len(body) >= MIN_SECTION_CHARS:
+            merged.append([name, body])
+        elif merged:
+            merged[-1][1] += "\n" + body
+        else:
+            leading = body
+    if leading:
+        # Every section was short: extract what there is as one section.
+        merged.append([sections[0][0], leading])
+    return [(name, body) for name, body in merged]
+
+
+def _cache_get(cache: Any, key: str) -> Any:
+    if cache is None:
+        return None
+    try:
+        return cache.get_json(key)
+    except Exception:  # noqa: BLE001
+        logger.warning("section cache read failed; extracting uncached", exc_info=True)
+        return None
+
+
+def _cache_put(cache: Any, key: str, value: Dict[str, Any]) -> None:
+    if cache is None:
+        return
+    try:
+        cache.put_json(key, value)
+    except Exception:  # noqa: BLE001
+        logger.warning("section cache write failed", exc_info=True)
+
+
+def extract_sections_incremental(
+    sections: Sequence[Tuple[str, str]],
+    api_key: str,
+    cache: Any,
+    model_candidates: Optional[List[str]] = None,
+    provider: Optional[Any] = None,
+    max_workers: int = 4,
+    router: Optional[Any] = None,
+    hedger: Optional[Any] = None,
+    passthrough: Tuple[type, ...] = (),
+) -> Dict[str, Any]:
+    """Extract a resume section by section, reusing cached results.
+
+    sections: ordered (name, text) pairs, e.g. from the backend's CV section
+    splitter. Each section is fingerprinted; sections seen before are served
+    from ``cache`` (any object with get_json/put_json) and only new or edited
+    sections go to the model, in parallel. The per-section extractions are
+    merged in document order and grouped as in extract_from_text.
+    Sections under MIN_SECTION_CHARS are merged into a neighbour rather than
+    sent alone. A cache that fails to read or write is logged and bypassed.
+
+    Parts past MAX_CHUNKS * 2 are not extracted; they are counted in
+    sections["skipped"] and "dropped_chunks" and set "truncated".
+
+    Returns the extract_from_text dict plus
+      "sections": {"total": int, "reused": int, "extracted": int, "failed": int, "skipped": int}
+    """
+    candidates = model_candidates or DEFAULT_MODEL_CANDIDATES
+    usable: List[Tuple[str, str]] = []
+    for name, body in _merge_short_sections(sections):
+        # Oversized sections become several overlapping parts, each cached on its own.
+        parts = split_into_chunks(body, MAX_INPUT_CHARS)
+        usable.extend((name if len(parts) == 1 else f"{name}#{n + 1}", part) for n, part in enumerate(parts))
+    skipped = max(0, len(usable) - MAX_CHUNKS * 2)
+    usable = usable[: MAX_CHUNKS * 2]
+    if not usable:
+        return {"ok": False, "model": None, "error": "Empty text", "grouped": {}, "raw_count": 0,
+                "chunks": 0, "truncated": False, "dropped_chunks": 0,
+                "sections": {"total": 0, "reused": 0, "extracted": 0, "failed": 0, "skipped": 0}}
+
+    keys = [_section_key(body, candidates) for _, body in usable]
+    results: List[Optional[List[Dict[str, Any]]]] = [None] * len(usable)
+    models: List[Optional[str]] = [None] * len(usable)
+    for i, key in enumerate(keys):
+        cached = _cache_get(cache, key)
+        if isinstance(cached, dict) and isinstance(cached.get("extractions"), list):
+            results[i] = cached["extractions"]
+            models[i] = cached.get("model")
+    reused = sum(1 for r in results if r is not None)
+    pending = [i for i, r in enumerate(results) if r is None]
+
+    errors: List[str] = []
+    if pending:
+        def run(i: int) -> Tuple[int, Optional[List[Any]], Optional[str], Optional[str]]:
+            return (i, *_run_extraction(usable[i][1], api_key, candidates, provider, router, hedger, passthrough))
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as pool:
+            contexts = [contextvars.copy_context() for _ in pending]
+            for i, extractions, model_id, error in pool.map(lambda i, ctx: ctx.run(run, i), pending, contexts):
+                if extractions is None:
+                    errors.append(f"{usable[i][0]}: {error}")
+                    continue
+                results[i] = [_extraction_to_dict(item) for item in extractions]
+                models[i] = model_id
+                _cache_put(cache, keys[i], {"extractions": results[i], "model": model_id})
+
+    merged = _dedup_extractions([item for section in results if section for item in section])
+    ok = any(r is not None for r in results)
+    return {
+        "ok": ok,
+        "model": next((m for m in models if m), None),
+        "error": "; ".join(errors) if errors else None,
+        "grouped": group_extractions(merged) if ok else {},
+        "raw_count": len(merged),
+        "chunks": len(usable),
+        "truncated": bool(skipped),
+        "dropped_chunks": skipped,
+        "sections": {
+            "total": len(usable),
+            "reused": reused,
+            "extracted": len(pending) - len(errors),
+            "failed": len(errors),
+            "skipped": skipped,
+        },
     }